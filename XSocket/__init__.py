@@ -1,3 +1,14 @@
+from XSocket.buffer import BufferPool, get_buffer_pool
 from XSocket.client import Client
-from XSocket.server import Server
-from XSocket.util import OPCode
+from XSocket.channel import Channel
+from XSocket.cluster import Cluster, ClusterStats, WorkerStats
+from XSocket.compression import DeflateContext, DeflateOptions
+from XSocket.loop import (available_event_loops, get_event_loop_name,
+                          install_event_loop)
+from XSocket.metrics import Counter, Gauge, Histogram, Metrics, serve_metrics
+from XSocket.pool import ClientPool
+from XSocket.server import BroadcastResult, Server
+from XSocket.stream import MessageStream
+from XSocket.tracing import (OpenTelemetryTracer, RecordingTracer, Span,
+                             Tracer)
+from XSocket.util import LoadBalancing, OPCode, SlowConsumerPolicy
@@ -0,0 +1,261 @@
+from argparse import ArgumentParser
+from asyncio import (Queue, gather, get_running_loop, run, sleep,
+                     wait_for)
+from concurrent.futures import ProcessPoolExecutor
+from json import dump
+from math import ceil
+from multiprocessing import get_context
+from statistics import median
+from time import perf_counter, perf_counter_ns
+from XSocket.client import Client
+from XSocket.loop import available_event_loops, install_event_loop
+from XSocket.protocol.inet.net import IPAddressInfo
+from XSocket.protocol.inet.xtcp import XTCPListener, XTCPTransportListener
+from XSocket.server import Server
+
+__all__ = [
+    "main"
+]
+
+_LISTENERS = {
+    "socket": XTCPListener,
+    "transport": XTCPTransportListener
+}
+
+
+def _percentile(values: list[float], fraction: float) -> float:
+    """
+    Gets a percentile of sorted values by the nearest rank.
+
+    :param values: Sorted values
+    :param fraction: Percentile between 0 and 1
+    :return: Value or 0 if there are no values
+    """
+    if not values:
+        return 0.0
+    return values[max(0, ceil(fraction * len(values)) - 1)]
+
+
+async def _serve(listener: str, port: int, workers: int) -> Server:
+    """
+    Starts a Server that echoes every message.
+
+    :param listener: Name of the listener type
+    :param port: Port to listen on
+    :param workers: The number of worker loops of the Server
+    :return: Server
+    """
+    server = Server(_LISTENERS[listener](IPAddressInfo("127.0.0.1", port)),
+                    workers=workers)
+
+    async def on_accept(_, e):
+        async def on_message(sender, m):
+            await sender.send(m.data)
+        e.client.event.on_message += on_message
+    server.event.on_accept += on_accept
+    await server.run()
+    return server
+
+
+async def _connect(listener: str, port: int, count: int
+                   ) -> tuple[list[tuple[Client, Queue]], float]:
+    """
+    Connects clients one after another.
+
+    :param listener: Name of the listener type
+    :param port: Port of the Server
+    :param count: The number of clients
+    :return: Clients with the queues of their messages, Seconds taken
+    """
+    loop = get_running_loop()
+    clients = []
+    start = perf_counter()
+    for _ in range(count):
+        client = Client(_LISTENERS[listener](
+            IPAddressInfo("127.0.0.1", port)))
+        opened = loop.create_future()
+        messages = Queue()
+
+        async def on_open(_, __, opened=opened):
+            opened.set_result(None)
+
+        async def on_message(_, m, messages=messages):
+            messages.put_nowait(m.data)
+        client.event.on_open += on_open
+        client.event.on_message += on_message
+        await client.run()
+        await opened
+        clients.append((client, messages))
+    return clients, perf_counter() - start
+
+
+async def _load(listener: str, port: int, count: int, size: int,
+                duration: float) -> dict:
+    """
+    Connects clients that each send a message and wait for its echo
+    in a loop until the duration elapsed.
+
+    :param listener: Name of the listener type
+    :param port: Port of the Server
+    :param count: The number of clients
+    :param size: Message size
+    :param duration: Seconds to send messages for
+    :return: Counts and round trip latencies in seconds
+    """
+    clients, setup = await _connect(listener, port, count)
+    payload = bytes(size)
+    latencies = []
+    deadline = perf_counter() + duration
+
+    async def drive(client: Client, messages: Queue):
+        while perf_counter() < deadline:
+            start = perf_counter_ns()
+            await client.send(payload)
+            await messages.get()
+            latencies.append((perf_counter_ns() - start) / 1e9)
+
+    start = perf_counter()
+    await gather(*[drive(client, messages) for client, messages in clients])
+    elapsed = perf_counter() - start
+    await gather(*[client.close() for client, _ in clients])
+    return {"connections": count, "setup": setup, "elapsed": elapsed,
+            "latencies": latencies}
+
+
+def _load_process(listener: str, port: int, count: int, size: int,
+                  duration: float, event_loop: str) -> dict:
+    """
+    Runs _load in a worker process.
+    """
+    install_event_loop(event_loop)
+    return run(_load(listener, port, count, size, duration))
+
+
+async def _broadcast(server: Server, listener: str, port: int, count: int,
+                     size: int, rounds: int) -> list[float]:
+    """
+    Measures the time from a broadcast until every client received it.
+
+    :param server: Server to broadcast from
+    :param listener: Name of the listener type
+    :param port: Port of the Server
+    :param count: The number of clients
+    :param size: Message size
+    :param rounds: The number of broadcasts
+    :return: Seconds of each broadcast
+    """
+    clients, _ = await _connect(listener, port, count)
+    while server.connections < count:
+        await sleep(0.01)
+    payload = bytes(size)
+    timings = []
+    for _ in range(rounds):
+        start = perf_counter()
+        await server.broadcast(payload)
+        await wait_for(gather(*[messages.get() for _, messages in clients]),
+                       30)
+        timings.append(perf_counter() - start)
+    await gather(*[client.close() for client, _ in clients])
+    return timings
+
+
+async def _bench(args) -> dict:
+    server = await _serve(args.listener, args.port, args.workers)
+    report = {"event_loop": args.event_loop, "listener": args.listener,
+              "clients": args.clients * args.processes,
+              "processes": args.processes, "workers": args.workers,
+              "duration": args.duration, "sizes": []}
+    loop = get_running_loop()
+    executor = ProcessPoolExecutor(args.processes, get_context("spawn")) \
+        if args.processes > 1 else None
+    try:
+        for size in args.sizes:
+            if executor:
+                results = await gather(*[loop.run_in_executor(
+                    executor, _load_process, args.listener, args.port,
+                    args.clients, size, args.duration, args.event_loop)
+                    for _ in range(args.processes)])
+            else:
+                results = [await _load(args.listener, args.port,
+                                       args.clients, size, args.duration)]
+            latencies = sorted(latency for result in results
+                               for latency in result["latencies"])
+            elapsed = max(result["elapsed"] for result in results)
+            setup = max(result["setup"] for result in results)
+            broadcasts = sorted(await _broadcast(
+                server, args.listener, args.port, args.clients, size,
+                args.broadcasts))
+            report["sizes"].append({
+                "size": size,
+                "messages_per_second": len(latencies) / elapsed,
+                "bytes_per_second": len(latencies) * size * 2 / elapsed,
+                "latency_p50": _percentile(latencies, 0.5),
+                "latency_p99": _percentile(latencies, 0.99),
+                "latency_p999": _percentile(latencies, 0.999),
+                "connections_per_second": report["clients"] / setup,
+                "broadcast_median": median(broadcasts),
+                "broadcast_p99": _percentile(broadcasts, 0.99)
+            })
+    finally:
+        if executor:
+            executor.shutdown()
+        await server.close()
+    return report
+
+
+def _print(report: dict):
+    print(f"{report['event_loop']} loop, {report['listener']} listener, "
+          f"{report['clients']} clients in {report['processes']} "
+          f"process(es), {report['workers']} worker loop(s)")
+    print(f"{'size':>10}{'msg/s':>12}{'MiB/s':>10}{'p50 ms':>10}"
+          f"{'p99 ms':>10}{'p999 ms':>10}{'conn/s':>10}{'bcast ms':>10}")
+    for result in report["sizes"]:
+        print(f"{result['size']:>10}"
+              f"{result['messages_per_second']:>12.0f}"
+              f"{result['bytes_per_second'] / 2 ** 20:>10.1f}"
+              f"{result['latency_p50'] * 1e3:>10.3f}"
+              f"{result['latency_p99'] * 1e3:>10.3f}"
+              f"{result['latency_p999'] * 1e3:>10.3f}"
+              f"{result['connections_per_second']:>10.0f}"
+              f"{result['broadcast_median'] * 1e3:>10.3f}")
+
+
+def main(argv: list[str] | None = None):
+    """
+    Drives an echo Server with Clients over loopback and reports
+    throughput, round trip latency, connection setup rate
+    and broadcast fan-out time.
+
+    :param argv: Command line arguments
+    """
+    parser = ArgumentParser(prog="python -m XSocket.bench",
+                            description=main.__doc__.split(":param")[0])
+    parser.add_argument("--clients", type=int, default=16,
+                        help="clients per process")
+    parser.add_argument("--processes", type=int, default=1,
+                        help="processes running clients")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="worker loops of the server")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[64],
+                        help="message sizes in bytes")
+    parser.add_argument("--duration", type=float, default=5.0,
+                        help="seconds of load per message size")
+    parser.add_argument("--broadcasts", type=int, default=100,
+                        help="broadcasts per message size")
+    parser.add_argument("--listener", choices=[*_LISTENERS],
+                        default="socket")
+    parser.add_argument("--event-loop", choices=available_event_loops(),
+                        default="asyncio")
+    parser.add_argument("--port", type=int, default=8500)
+    parser.add_argument("--json", help="file to write the report to")
+    args = parser.parse_args(argv)
+    install_event_loop(args.event_loop)
+    report = run(_bench(args))
+    _print(report)
+    if args.json:
+        with open(args.json, "w") as file:
+            dump(report, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
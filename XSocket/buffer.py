@@ -0,0 +1,94 @@
+from XSocket.exception import InvalidParameterException
+
+__all__ = [
+    "BufferPool",
+    "get_buffer_pool"
+]
+
+
+class BufferPool:
+    """
+    Reuses bytearrays of power of two size classes.
+    Safe to share between threads, since a list pop and append
+    are atomic, but the counters are then approximate.
+    """
+
+    def __init__(self, min_size: int = 4096, max_size: int = 16777216,
+                 capacity: int = 64):
+        """
+        Reuses bytearrays of power of two size classes.
+
+        :param min_size: Size of the smallest class
+        :param max_size: Size of the largest class, larger buffers
+                         are allocated and dropped every time
+        :param capacity: The number of free buffers kept per class
+        """
+        if not 0 < min_size <= max_size:
+            raise InvalidParameterException(
+                "The sizes must satisfy 0 < min_size <= max_size.")
+        self._min_size: int = 1 << (min_size - 1).bit_length()
+        self._max_size: int = max_size
+        self._capacity: int = capacity
+        self._free: dict[int, list[bytearray]] = {}
+        self._hits: int = 0
+        self._misses: int = 0
+
+    @property
+    def hits(self) -> int:
+        """
+        Gets the number of buffers acquired from the pool.
+
+        :return: int
+        """
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        """
+        Gets the number of buffers that had to be allocated.
+
+        :return: int
+        """
+        return self._misses
+
+    def acquire(self, size: int) -> bytearray:
+        """
+        Gets a buffer of at least the size.
+
+        :param size: The minimum number of bytes
+        :return: Buffer, its length is the size class
+        """
+        size = max(self._min_size, 1 << (size - 1).bit_length())
+        try:
+            buffer = self._free[size].pop()
+        except (KeyError, IndexError):
+            self._misses += 1
+            return bytearray(size)
+        self._hits += 1
+        return buffer
+
+    def release(self, buffer: bytearray):
+        """
+        Returns a buffer to the pool.
+        The buffer must not be used after it is released.
+
+        :param buffer: Buffer acquired from the pool
+        """
+        size = len(buffer)
+        if size > self._max_size or size & (size - 1):
+            return
+        free = self._free.setdefault(size, [])
+        if len(free) < self._capacity:
+            free.append(buffer)
+
+
+_pool = BufferPool()
+
+
+def get_buffer_pool() -> BufferPool:
+    """
+    Gets the buffer pool shared across connections.
+
+    :return: BufferPool
+    """
+    return _pool
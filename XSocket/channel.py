@@ -0,0 +1,340 @@
+from asyncio import Event, Lock, Task, create_task, sleep
+from collections import deque
+from enum import IntEnum
+from struct import Struct
+from typing import Any
+from pyeventlib import EventHandler
+from XSocket.core.handle import IHandle
+from XSocket.events import (OnChannelEventArgs,
+                            OnCloseEventArgs,
+                            OnMessageEventArgs,
+                            OnErrorEventArgs)
+from XSocket.exception import (ChannelClosedException,
+                               InvalidParameterException)
+from XSocket.util import OPCode
+
+__all__ = [
+    "Channel",
+    "ChannelEventWrapper",
+    "ChannelFrame",
+    "CHANNEL_HEADER",
+    "CHANNEL_WINDOW",
+    "WINDOW",
+    "CHUNK_SIZE"
+]
+
+CHANNEL_HEADER = Struct("!IB")
+CHANNEL_WINDOW = Struct("!I")
+WINDOW = 262144
+CHUNK_SIZE = 16384
+
+
+class ChannelFrame(IntEnum):
+    """
+    Kinds of the frames of a channel, following the channel id.
+    """
+    Data = 0x0
+    More = 0x1
+    Open = 0x2
+    Close = 0x3
+    Window = 0x4
+
+
+class ChannelEventWrapper:
+    """
+    Represents the method that will handle an events.
+    """
+    def __init__(self):
+        self.on_close: EventHandler = EventHandler()
+        self.on_message: EventHandler = EventHandler()
+        self.on_error: EventHandler = EventHandler()
+
+
+class Channel:
+    """
+    Provides a logical connection multiplexed over the connection
+    of a Client, with its own flow-control window.
+
+    Messages are sent in chunks, so a large message on one channel
+    does not hold back the messages of the others. The peer may only
+    send as many bytes as it was granted; the grant is renewed as
+    on_message handlers finish, so a slow channel stops its sender
+    without stalling the connection.
+    """
+    def __init__(self, client: Any, handle: IHandle, channel_id: int,
+                 window: int = WINDOW, chunk_size: int = CHUNK_SIZE,
+                 credit: int = 0, accepted: bool = False):
+        """
+        Provides a logical connection multiplexed over the connection
+        of a Client. Use Client.open_channel to create one.
+
+        :param client: Client the channel belongs to
+        :param handle: Connected Handle of the Client
+        :param channel_id: Id of the channel, unique per connection
+        :param window: The maximum number of bytes the peer may send
+                       before on_message handlers consume them
+        :param chunk_size: The maximum number of bytes per frame
+        :param credit: Bytes the peer already allows to be sent
+        :param accepted: Whether the peer opened the channel
+        """
+        if not 0 < window <= 0xFFFFFFFF or chunk_size < 1:
+            raise InvalidParameterException(
+                "The window must be between 1 and 2 ** 32 - 1 "
+                "and the chunk size must be positive.")
+        self._client: Any = client
+        self._handle: IHandle = handle
+        self._channel_id: int = channel_id
+        self._window: int = window
+        self._chunk_size: int = chunk_size
+        self._credit: int = credit
+        self._granted: Event = Event()
+        self._sending: Lock = Lock()
+        self._fragments: list[bytearray] = []
+        self._partial: int = 0
+        self._inbound: deque[tuple[bytearray, int]] = deque()
+        self._arrived: Event = Event()
+        self._consumed: int = 0
+        self._waiting: bool = False
+        self._closed: bool = False
+        self._remote_closed: bool = False
+        self._controls: set[Task] = set()
+        self._event: ChannelEventWrapper = ChannelEventWrapper()
+        self._task: Task = create_task(self._handler(accepted))
+
+    @property
+    def client(self) -> Any:
+        """
+        Gets the Client the channel is multiplexed over.
+
+        :return: Client
+        """
+        return self._client
+
+    @property
+    def channel_id(self) -> int:
+        """
+        Gets the id of the channel, odd if the connecting side
+        opened it and even otherwise.
+
+        :return: int
+        """
+        return self._channel_id
+
+    @property
+    def window(self) -> int:
+        """
+        Gets the maximum number of bytes the peer may send
+        before on_message handlers consume them.
+
+        :return: int
+        """
+        return self._window
+
+    @property
+    def chunk_size(self) -> int:
+        """
+        Gets the maximum number of bytes sent per frame.
+
+        :return: int
+        """
+        return self._chunk_size
+
+    @property
+    def credit(self) -> int:
+        """
+        Gets the number of bytes that can be sent
+        before the peer grants more.
+
+        :return: int
+        """
+        return self._credit
+
+    @property
+    def closed(self) -> bool:
+        """
+        Gets a value indicating whether Channel has been closed.
+
+        :return: bool
+        """
+        return self._closed
+
+    @property
+    def event(self) -> ChannelEventWrapper:
+        """
+        Represents the method that will handle an events.
+
+        :return: ChannelEventWrapper
+        """
+        return self._event
+
+    async def send(self, data: bytes | bytearray | memoryview):
+        """
+        Sends a message over the channel. Waits while the peer
+        has not granted enough of its window.
+
+        :param data: Data to send
+        """
+        if self._closed:
+            raise ChannelClosedException()
+        view = memoryview(data).cast("B")
+        async with self._sending:
+            offset = 0
+            while True:
+                while self._credit <= 0 and offset < len(view):
+                    if self._closed:
+                        raise ChannelClosedException()
+                    self._granted.clear()
+                    await self._granted.wait()
+                if self._closed:
+                    raise ChannelClosedException()
+                size = min(len(view) - offset, self._credit,
+                           self._chunk_size)
+                final = offset + size == len(view)
+                self._credit -= size
+                await self._handle.send(
+                    CHANNEL_HEADER.pack(
+                        self._channel_id,
+                        ChannelFrame.Data if final else ChannelFrame.More) +
+                    view[offset:offset + size], OPCode.Channel)
+                if final:
+                    return
+                offset += size
+                await sleep(0)
+
+    async def send_string(self, string: str, encoding: str = "UTF-8"):
+        """
+        Sends a string over the channel.
+
+        :param string: String to send
+        :param encoding: Encoding of the string
+        """
+        await self.send(string.encode(encoding))
+
+    async def close(self):
+        """
+        Closes the channel once the messages being sent are sent.
+        The connection stays open.
+        """
+        if self._closed:
+            return
+        async with self._sending:
+            if self._closed:
+                return
+            self._closed = True
+            self._granted.set()
+            await self._send_control(ChannelFrame.Close)
+
+    def _receive(self, kind: int, data: bytearray):
+        """
+        Handles a frame of the peer.
+
+        :param kind: ChannelFrame of the frame
+        :param data: Frame including the channel header
+        """
+        if kind == ChannelFrame.Window:
+            if len(data) >= CHANNEL_HEADER.size + CHANNEL_WINDOW.size:
+                self._credit += CHANNEL_WINDOW.unpack_from(
+                    data, CHANNEL_HEADER.size)[0]
+                self._granted.set()
+        elif kind == ChannelFrame.Close:
+            self._remote_closed = True
+            self._arrived.set()
+            if not self._closed:
+                self._closed = True
+                self._granted.set()
+                self._control(ChannelFrame.Close)
+        elif kind in (ChannelFrame.Data, ChannelFrame.More):
+            if self._remote_closed:
+                return
+            del data[:CHANNEL_HEADER.size]
+            if kind == ChannelFrame.More:
+                self._fragments.append(data)
+                self._partial += len(data)
+                self._replenish()
+                return
+            size = self._partial + len(data)
+            if self._fragments:
+                self._fragments.append(data)
+                data = bytearray().join(self._fragments)
+                self._fragments.clear()
+            self._inbound.append((data, size))
+            self._partial = 0
+            self._arrived.set()
+
+    def _abandon(self):
+        """
+        Closes the channel because the connection was closed.
+        """
+        self._closed = True
+        self._remote_closed = True
+        self._granted.set()
+        self._arrived.set()
+
+    def _replenish(self):
+        """
+        Grants the peer the bytes consumed since the last grant once they
+        reach half of the window. While no message is waiting for the
+        handlers, the fragments of an incomplete message count as consumed,
+        so messages larger than the window can arrive.
+        """
+        if self._waiting:
+            self._consumed += self._partial
+            self._partial = 0
+        if self._consumed >= max(1, self._window // 2) and \
+                not self._remote_closed:
+            self._control(ChannelFrame.Window, self._consumed)
+            self._consumed = 0
+
+    def _control(self, kind: ChannelFrame, value: int | None = None):
+        """
+        Sends a control frame without waiting for it.
+
+        :param kind: ChannelFrame of the frame
+        :param value: Window increment
+        """
+        task = create_task(self._send_control(kind, value))
+        self._controls.add(task)
+        task.add_done_callback(self._controls.discard)
+
+    async def _send_control(self, kind: ChannelFrame,
+                            value: int | None = None):
+        """
+        Sends a control frame, ignoring a closed connection.
+
+        :param kind: ChannelFrame of the frame
+        :param value: Window increment or the window of an Open frame
+        """
+        frame = CHANNEL_HEADER.pack(self._channel_id, kind)
+        if value is not None:
+            frame += CHANNEL_WINDOW.pack(value)
+        try:
+            await self._handle.send(frame, OPCode.Channel)
+        except Exception:
+            pass
+
+    async def _handler(self, accepted: bool):
+        try:
+            if accepted:
+                self._control(ChannelFrame.Window, self._window)
+                await self._client.event.on_channel(
+                    self._client, OnChannelEventArgs(self))
+            while True:
+                while not self._inbound:
+                    if self._remote_closed:
+                        return
+                    self._waiting = True
+                    self._replenish()
+                    self._arrived.clear()
+                    await self._arrived.wait()
+                    self._waiting = False
+                data, size = self._inbound.popleft()
+                try:
+                    await self.event.on_message(
+                        self, OnMessageEventArgs([data]))
+                except Exception as e:
+                    await self.event.on_error(self, OnErrorEventArgs(e))
+                self._consumed += size
+                self._replenish()
+        finally:
+            self._client._forget(self)
+            await self.event.on_close(self, OnCloseEventArgs())
@@ -1,21 +1,38 @@
-from asyncio import Task, create_task
-from pyeventlib import EventHandler
+from asyncio import (Future, Task, create_task, gather, get_running_loop,
+                     wait, wait_for)
+from os import PathLike
+from struct import Struct
+from time import perf_counter
+from typing import (AsyncIterable, Awaitable, BinaryIO, Callable, Iterable,
+                    Sequence)
+from pyeventlib import EventArgs, EventHandler
+from XSocket.channel import (Channel, ChannelFrame, CHANNEL_HEADER,
+                             CHANNEL_WINDOW, CHUNK_SIZE, WINDOW)
 from XSocket.core.handle import IHandle
 from XSocket.core.listener import IListener
 from XSocket.core.net import AddressFamily, AddressInfo
 from XSocket.events import (OnOpenEventArgs,
                             OnCloseEventArgs,
                             OnMessageEventArgs,
+                            OnStreamEventArgs,
                             OnErrorEventArgs)
 from XSocket.exception import (InvalidOperationException,
-                               ClientClosedException)
+                               InvalidParameterException,
+                               ClientClosedException,
+                               RequestFailedException)
+from XSocket.metrics import Metrics
 from XSocket.protocol.protocol import ProtocolType
+from XSocket.stream import MessageStream
+from XSocket.tracing import Tracer, next_connection_id
 from XSocket.util import OPCode, OperationControl
 
 __all__ = [
     "Client"
 ]
 
+_REQUEST = Struct("!I")
+_RESPONSE = Struct("!IB")
+
 
 class ClientEventWrapper:
     """
@@ -25,6 +42,8 @@ class ClientEventWrapper:
         self.on_open: EventHandler = EventHandler()
         self.on_close: EventHandler = EventHandler()
         self.on_message: EventHandler = EventHandler()
+        self.on_stream: EventHandler = EventHandler()
+        self.on_channel: EventHandler = EventHandler()
         self.on_error: EventHandler = EventHandler()
 
 
@@ -32,13 +51,56 @@ class Client:
     """
     Provides client connections for network services.
     """
-    def __init__(self, initializer: IListener | IHandle):
+    def __init__(self, initializer: IListener | IHandle,
+                 streaming: bool = False, batch_size: int = 1,
+                 batch_latency: float = 0, metrics: bool = False,
+                 tracer: Tracer | None = None,
+                 request_handler: Callable[
+                     ["Client", bytearray],
+                     Awaitable[bytes | bytearray | memoryview | None]] |
+                 None = None):
+        """
+        Provides client connections for network services.
+
+        :param initializer: Listener to connect or connected Handle
+        :param streaming: Whether to deliver fragmented messages as streams
+        :param batch_size: The maximum number of messages delivered
+                           by one on_message event
+        :param batch_latency: Seconds to wait for more messages
+                              before delivering an incomplete batch
+        :param metrics: Whether to record the metrics of the connection
+        :param tracer: Tracer to report the timed stages of the connection to
+        :param request_handler: Answers the requests of the peer,
+                                see request_handler
+        """
+        if batch_size < 1 or batch_latency < 0:
+            raise InvalidParameterException(
+                "The batch size must be positive "
+                "and the latency must not be negative.")
+        self._streaming: bool = streaming
+        self._batch_size: int = batch_size
+        self._batch_latency: float = batch_latency
+        self._receiving: Task | None = None
+        self._metrics: Metrics | None = Metrics() if metrics else None
+        self._closing: bool = False
+        self._tracer: Tracer | None = tracer
+        self._connection_id: int = next_connection_id()
+        self._request_handler: Callable[
+            [Client, bytearray],
+            Awaitable[bytes | bytearray | memoryview | None]] | None = \
+            request_handler
+        self._requests: dict[int, Future] = {}
+        self._next_request: int = 0
+        self._responding: set[Task] = set()
+        self._channels: dict[int, Channel] = {}
+        self._next_channel: int = 0
         self._listener: IListener | None = None
         self._handle: IHandle | None = None
         if isinstance(initializer, IListener):
             self._listener = initializer
         elif isinstance(initializer, IHandle):
             self._handle = initializer
+            self._attach()
         self._task: Task | None = None
         self._running: bool = False
         self._closed: bool = False
@@ -62,6 +124,134 @@ class Client:
         """
         return self._closed
 
+    @property
+    def streaming(self) -> bool:
+        """
+        Gets a value indicating whether fragmented messages are delivered
+        through on_stream as they arrive instead of through on_message.
+
+        :return: bool
+        """
+        return self._streaming
+
+    @property
+    def batch_size(self) -> int:
+        """
+        Gets the maximum number of messages delivered
+        by one on_message event.
+
+        :return: int
+        """
+        return self._batch_size
+
+    @property
+    def batch_latency(self) -> float:
+        """
+        Gets the seconds to wait for more messages
+        before delivering an incomplete batch.
+
+        :return: float
+        """
+        return self._batch_latency
+
+    @property
+    def metrics(self) -> Metrics | None:
+        """
+        Gets the metrics of the connection.
+
+        :return: Metrics or None if disabled
+        """
+        return self._metrics
+
+    @property
+    def tracer(self) -> Tracer | None:
+        """
+        Gets the tracer the timed stages of the connection are reported to.
+
+        :return: Tracer or None if disabled
+        """
+        return self._tracer
+
+    @property
+    def connection_id(self) -> int:
+        """
+        Gets the id identifying the connection in spans.
+
+        :return: int
+        """
+        return self._connection_id
+
+    @property
+    def request_handler(self) -> Callable[
+            ["Client", bytearray],
+            Awaitable[bytes | bytearray | memoryview | None]] | None:
+        """
+        Gets the coroutine function answering the requests of the peer.
+        It is called with the Client and the request data, and returns
+        the response data. Requests are answered concurrently, so
+        responses may be sent in a different order than the requests.
+
+        :return: Request handler or None
+        """
+        return self._request_handler
+
+    @request_handler.setter
+    def request_handler(self, handler: Callable[
+            ["Client", bytearray],
+            Awaitable[bytes | bytearray | memoryview | None]] | None):
+        """
+        Sets the coroutine function answering the requests of the peer.
+
+        :param handler: Request handler or None
+        """
+        self._request_handler = handler
+
+    @property
+    def pending_requests(self) -> int:
+        """
+        Gets the number of requests waiting for their response.
+
+        :return: int
+        """
+        return len(self._requests)
+
+    @property
+    def rtt(self) -> float | None:
+        """
+        Gets the smoothed round trip time in seconds, measured by the pings
+        sent every heartbeat interval of the options or by ping.
+
+        :return: float or None if no pong has been received
+        """
+        return self._handle.rtt if self._handle else None
+
+    @property
+    def rtt_variance(self) -> float | None:
+        """
+        Gets the smoothed variation of the round trip time in seconds.
+
+        :return: float or None if no pong has been received
+        """
+        return self._handle.rtt_variance if self._handle else None
+
+    @property
+    def min_rtt(self) -> float | None:
+        """
+        Gets the smallest round trip time in seconds.
+
+        :return: float or None if no pong has been received
+        """
+        return self._handle.min_rtt if self._handle else None
+
+    @property
+    def channels(self) -> list[Channel]:
+        """
+        Gets the open channels multiplexed over the connection.
+
+        :return: list[Channel]
+        """
+        return [*self._channels.values()]
+
     @property
     def local_address(self) -> AddressInfo:
         """
@@ -130,43 +320,416 @@ class Client:
         """
         if not self._running or self._closed:
             return
+        self._closing = True
         await self._handle.close()
         await self._task
         self._closed = True
         self._running = False
 
+    async def abort(self):
+        """
+        Close the connection immediately, discarding queued data.
+        """
+        if not self._running or self._closed:
+            return
+        self._closing = True
+        self._handle.abort()
+        await self._task
+        self._closed = True
+        self._running = False
+
     async def _handler(self):
         if not self._handle:
             self._handle = await self._listener.connect()
+            self._attach()
             await self.event.on_open(self, OnOpenEventArgs())
+        metrics = self._metrics
+        if metrics is not None:
+            metrics.connections.set(1)
+        observed = metrics is not None or self._tracer is not None
+        reason = "remote"
         while not self._closed:
             try:
-                data = [await self._handle.receive()]
-                await self.event.on_message(self, OnMessageEventArgs(data))
+                data = await self._receive()
+                if self._handle.opcode != OPCode.Data:
+                    self._route(data)
+                    continue
+                if isinstance(data, MessageStream):
+                    args = OnStreamEventArgs(data)
+                    if observed:
+                        await self._dispatch(self.event.on_stream, args, [])
+                    else:
+                        await self.event.on_stream(self, args)
+                    await data.discard()
+                    continue
+                batch = [data]
+                if self._batch_size > 1:
+                    await self._collect(batch)
+                if observed:
+                    await self._dispatch(self.event.on_message,
+                                         OnMessageEventArgs(batch), batch)
+                else:
+                    await self.event.on_message(
+                        self, OnMessageEventArgs(batch))
             except OperationControl:
                 pass
             except ConnectionError:
                 break
             except Exception as e:
+                reason = "error"
                 await self.event.on_error(self, OnErrorEventArgs(e))
                 break
+        if self._receiving:
+            task, self._receiving = self._receiving, None
+            task.cancel()
+            await gather(task, return_exceptions=True)
+        for future in self._requests.values():
+            if not future.done():
+                future.set_exception(ClientClosedException())
+        for task in [*self._responding]:
+            task.cancel()
+        for channel in [*self._channels.values()]:
+            channel._abandon()
+        if metrics is not None:
+            if reason == "remote" and self._closing:
+                reason = "local"
+            elif reason == "remote" and self._handle.timed_out:
+                reason = "timeout"
+            metrics.closes[reason].inc()
+            metrics.connections.set(0)
         await self.event.on_close(self, OnCloseEventArgs())
 
-    async def send(self, data: bytes | bytearray):
+    def _attach(self):
+        """
+        Attaches the metrics and the tracer to the Handle.
+        """
+        self._handle.metrics = self._metrics
+        if self._tracer is not None:
+            self._handle.set_tracer(self._tracer, self._connection_id)
+
+    async def _dispatch(self, handler: EventHandler, args: EventArgs,
+                        batch: list[bytearray]):
+        """
+        Fires a message event, recording the messages in the metrics
+        and timing the handlers.
+
+        :param handler: on_message or on_stream
+        :param args: Arguments of the event
+        :param batch: Messages delivered, empty for a stream
+        """
+        metrics = self._metrics
+        if metrics is not None:
+            metrics.messages_received.inc(len(batch) or 1)
+            for data in batch:
+                metrics.received_size.observe(len(data))
+        start = perf_counter()
+        if self._tracer is None:
+            await handler(self, args)
+        else:
+            with self._tracer.span("xsocket.dispatch", self._connection_id,
+                                   {"messages": len(batch) or 1,
+                                    "stream": not batch}):
+                await handler(self, args)
+        if metrics is not None:
+            metrics.handler_time.observe(perf_counter() - start)
+
+    async def _receive(self) -> bytearray | MessageStream:
+        """
+        Receives the next message, picking up a receive
+        left pending by the previous batch.
+
+        :return: Received data or MessageStream
+        """
+        if self._receiving:
+            task, self._receiving = self._receiving, None
+            return await task
+        return await self._handle.receive(self._streaming)
+
+    async def _collect(self, batch: list[bytearray]):
+        """
+        Adds the messages already buffered by the Handle to the batch,
+        then waits up to the batch latency for more.
+
+        :param batch: Messages to deliver
+        """
+        loop = get_running_loop()
+        deadline = loop.time() + self._batch_latency
+        while len(batch) < self._batch_size:
+            data = self._handle.receive_nowait(self._streaming)
+            if data is None:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    return
+                task = self._receiving = create_task(
+                    self._handle.receive(self._streaming))
+                await wait((task,), timeout=timeout)
+                if not task.done() or task.cancelled() or \
+                        task.exception() or \
+                        isinstance(task.result(), MessageStream):
+                    return
+                data, self._receiving = task.result(), None
+            if self._handle.opcode != OPCode.Data:
+                self._route(data)
+                continue
+            batch.append(data)
+
+    def _route(self, data: bytearray):
+        """
+        Handles a request, a response or a channel frame of the peer
+        instead of delivering it to on_message.
+
+        :param data: Received data
+        """
+        opcode = self._handle.opcode
+        if opcode == OPCode.Request and len(data) >= _REQUEST.size:
+            task = create_task(self._respond(data))
+            self._responding.add(task)
+            task.add_done_callback(self._responding.discard)
+        elif opcode == OPCode.Channel and len(data) >= CHANNEL_HEADER.size:
+            channel_id, kind = CHANNEL_HEADER.unpack_from(data)
+            channel = self._channels.get(channel_id)
+            if channel is not None:
+                channel._receive(kind, data)
+            elif kind == ChannelFrame.Open and len(data) >= \
+                    CHANNEL_HEADER.size + CHANNEL_WINDOW.size:
+                credit, = CHANNEL_WINDOW.unpack_from(data, CHANNEL_HEADER.size)
+                self._channels[channel_id] = Channel(
+                    self, self._handle, channel_id, credit=credit,
+                    accepted=True)
+        elif opcode == OPCode.Response and len(data) >= _RESPONSE.size:
+            correlation_id, failed = _RESPONSE.unpack_from(data)
+            future = self._requests.pop(correlation_id, None)
+            if future is None or future.done():
+                return
+            if failed:
+                future.set_exception(RequestFailedException(
+                    data[_RESPONSE.size:].decode("UTF-8", "replace")))
+            else:
+                future.set_result(data[_RESPONSE.size:])
+
+    async def _respond(self, data: bytearray):
+        """
+        Answers a request of the peer with the result of the request
+        handler, or with the error it raised.
+
+        :param data: Correlation id and data of the request
+        """
+        correlation_id, = _REQUEST.unpack_from(data)
+        try:
+            if self._request_handler is None:
+                raise InvalidOperationException("No request handler is set.")
+            result = await self._request_handler(
+                self, data[_REQUEST.size:]) or b""
+            response = _RESPONSE.pack(correlation_id, 0) + result
+        except Exception as e:
+            response = _RESPONSE.pack(correlation_id, 1) + \
+                (str(e) or type(e).__name__).encode("UTF-8")
+        try:
+            await self._handle.send(response, OPCode.Response)
+        except Exception:
+            pass
+
+    async def request(self, data: bytes | bytearray | memoryview,
+                      timeout: float | None = None) -> bytearray:
+        """
+        Sends a request and waits for the response of the peer's
+        request handler. Many requests can be in flight at once
+        on one connection; each is matched to its response
+        by a correlation id.
+
+        :param data: Data of the request
+        :param timeout: Seconds to wait, raises TimeoutError when exceeded
+        :return: Data of the response
+        """
+        if not self._running or self._closed or self._task.done():
+            raise ClientClosedException()
+        correlation_id = self._next_request
+        while correlation_id in self._requests:
+            correlation_id = (correlation_id + 1) & 0xFFFFFFFF
+        self._next_request = (correlation_id + 1) & 0xFFFFFFFF
+        future = get_running_loop().create_future()
+        self._requests[correlation_id] = future
+        try:
+            await self._handle.send(_REQUEST.pack(correlation_id) + data,
+                                    OPCode.Request)
+            return await wait_for(future, timeout)
+        finally:
+            self._requests.pop(correlation_id, None)
+
+    def ping(self):
+        """
+        Sends a ping, updating the round trip time when the pong arrives.
+        """
+        if not self._running or self._closed or self._handle is None:
+            raise ClientClosedException()
+        self._handle.ping()
+
+    async def open_channel(self, window: int = WINDOW,
+                           chunk_size: int = CHUNK_SIZE) -> Channel:
+        """
+        Opens a channel multiplexed over the connection. The peer is
+        notified through its on_channel event, and messages sent over
+        the channel are delivered to the on_message event of its Channel.
+
+        :param window: The maximum number of bytes the peer may send
+                       before on_message handlers consume them
+        :param chunk_size: The maximum number of bytes sent per frame
+        :return: Channel
+        """
+        if not self._running or self._closed or self._task.done() or \
+                self._handle is None:
+            raise ClientClosedException()
+        channel_id = self._next_channel | (self._listener is not None)
+        while channel_id in self._channels:
+            channel_id = (channel_id + 2) & 0xFFFFFFFF
+        self._next_channel = (channel_id + 2) & 0xFFFFFFFE
+        channel = Channel(self, self._handle, channel_id, window, chunk_size)
+        self._channels[channel_id] = channel
+        await channel._send_control(ChannelFrame.Open, window)
+        return channel
+
+    def _forget(self, channel: Channel):
+        """
+        Removes a channel closed by both sides.
+
+        :param channel: Channel
+        """
+        if self._channels.get(channel.channel_id) is channel:
+            del self._channels[channel.channel_id]
+
+    async def send(self, data: bytes | bytearray | memoryview,
+                   flush: bool = False):
         """
         Send data to server.
 
+        The data is queued without being copied, so a bytearray or a
+        memoryview must not be modified until it is flushed.
+
         :param data: Data to send
+        :param flush: Whether to wait until the data is written to the socket
+        """
+        if not self._running or self._closed:
+            raise ClientClosedException()
+        if self._metrics is None and self._tracer is None:
+            await self._handle.send(data, OPCode.Data, flush)
+            return
+        start = perf_counter()
+        if self._tracer is None:
+            await self._handle.send(data, OPCode.Data, flush)
+        else:
+            with self._tracer.span("xsocket.send", self._connection_id,
+                                   {"bytes": len(data)}):
+                await self._handle.send(data, OPCode.Data, flush)
+        if self._metrics is None:
+            return
+        self._metrics.send_latency.observe(perf_counter() - start)
+        self._metrics.messages_sent.inc()
+        self._metrics.sent_size.observe(len(data))
+
+    async def send_stream(self, source: AsyncIterable[bytes | bytearray] |
+                          Iterable[bytes | bytearray] | BinaryIO,
+                          chunk_size: int = 65535, flush: bool = False):
+        """
+        Send data read from an iterator or a file object to server
+        chunk by chunk, so the whole message is never held in memory.
+
+        :param source: Iterator of chunks or binary file object
+        :param chunk_size: The number of bytes to read from a file at once
+        :param flush: Whether to wait until the data is written to the socket
+        """
+        if not self._running or self._closed:
+            raise ClientClosedException()
+        await self._handle.send_stream(source, OPCode.Data, chunk_size, flush)
+        if self._metrics is not None:
+            self._metrics.messages_sent.inc()
+
+    async def send_file(self, file: str | PathLike | int | BinaryIO,
+                        offset: int = 0, count: int | None = None):
+        """
+        Send a part of a file to server with sendfile,
+        so the file data never enters Python memory.
+
+        :param file: Path, file descriptor or binary file object
+        :param offset: Offset of the first byte to send
+        :param count: The number of bytes to send, defaults to the rest
+        """
+        if not self._running or self._closed:
+            raise ClientClosedException()
+        await self._handle.send_file(file, offset, count, OPCode.Data)
+        if self._metrics is not None:
+            self._metrics.messages_sent.inc()
+
+    def get_write_buffer_size(self) -> int:
+        """
+        Gets the number of bytes queued and not yet written.
+
+        :return: Size of the write buffer
+        """
+        if not self._handle:
+            return 0
+        return self._handle.get_write_buffer_size()
+
+    def get_write_buffer_limits(self) -> tuple[int, int]:
+        """
+        Gets the high and low watermarks of the write buffer.
+
+        :return: High watermark, Low watermark
+        """
+        if not self._handle:
+            raise InvalidOperationException("Client is not connected.")
+        return self._handle.get_write_buffer_limits()
+
+    def set_write_buffer_limits(self, high: int | None = None,
+                                low: int | None = None):
+        """
+        Sets the high and low watermarks of the write buffer.
+
+        :param high: High watermark
+        :param low: Low watermark
+        """
+        if not self._handle:
+            raise InvalidOperationException("Client is not connected.")
+        self._handle.set_write_buffer_limits(high, low)
+
+    async def drain(self):
+        """
+        Waits until the write buffer drains to the low watermark
+        if it is above the high watermark.
+        """
+        if not self._running or self._closed:
+            raise ClientClosedException()
+        await self._handle.drain()
+
+    def pack(self, data: bytes | memoryview) -> list[bytes | memoryview]:
+        """
+        Encodes data into packets that can be written with write_packets.
+
+        :param data: Data to encode
+        :return: Buffers of the packets
+        """
+        if not self._handle:
+            raise InvalidOperationException("Client is not connected.")
+        return self._handle.encode(data, OPCode.Data)
+
+    def write_packets(self, packets: Sequence[bytes | memoryview]):
+        """
+        Queues packets encoded by pack without waiting.
+
+        :param packets: Buffers of the packets to send
         """
         if not self._running or self._closed:
             raise ClientClosedException()
-        await self._handle.send(data, OPCode.Data)
+        self._handle.write_packets(packets)
+        if self._metrics is not None:
+            self._metrics.messages_sent.inc()
 
-    async def send_string(self, string: str, encoding: str = "UTF-8"):
+    async def send_string(self, string: str, encoding: str = "UTF-8",
+                          flush: bool = False):
         """
         Send string to server.
 
         :param string: String to send
         :param encoding: String encoding
+        :param flush: Whether to wait until the data is written to the socket
         """
-        await self.send(string.encode(encoding))
+        await self.send(string.encode(encoding), flush)
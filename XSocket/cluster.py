@@ -0,0 +1,390 @@
+from asyncio import (Task, create_task, gather, get_running_loop, run,
+                     sleep)
+from inspect import isawaitable
+from multiprocessing import get_context
+from multiprocessing.connection import Connection
+from os import cpu_count, getpid
+from typing import Awaitable, Callable
+from XSocket.exception import (InvalidOperationException,
+                               InvalidParameterException)
+from XSocket.loop import install_event_loop
+from XSocket.server import Server
+
+__all__ = [
+    "WorkerStats",
+    "ClusterStats",
+    "Cluster"
+]
+
+
+class WorkerStats:
+    """
+    Contains the last statistics reported by a worker process.
+    """
+
+    def __init__(self, index: int, pid: int, connections: int,
+                 accepted: int):
+        self._index: int = index
+        self._pid: int = pid
+        self._connections: int = connections
+        self._accepted: int = accepted
+
+    @property
+    def index(self) -> int:
+        """
+        Gets the index of the worker.
+
+        :return: int
+        """
+        return self._index
+
+    @property
+    def pid(self) -> int:
+        """
+        Gets the process id of the worker.
+
+        :return: int
+        """
+        return self._pid
+
+    @property
+    def connections(self) -> int:
+        """
+        Gets the number of clients connected to the worker.
+
+        :return: int
+        """
+        return self._connections
+
+    @property
+    def accepted(self) -> int:
+        """
+        Gets the number of clients the worker process accepted.
+
+        :return: int
+        """
+        return self._accepted
+
+
+class ClusterStats:
+    """
+    Contains the statistics of every worker and their totals.
+    """
+
+    def __init__(self, workers: list[WorkerStats], restarts: int):
+        self._workers: list[WorkerStats] = workers
+        self._restarts: int = restarts
+
+    @property
+    def workers(self) -> list[WorkerStats]:
+        """
+        Gets the statistics of each worker.
+
+        :return: list[WorkerStats]
+        """
+        return self._workers
+
+    @property
+    def connections(self) -> int:
+        """
+        Gets the number of clients connected to all workers.
+
+        :return: int
+        """
+        return sum(worker.connections for worker in self._workers)
+
+    @property
+    def accepted(self) -> int:
+        """
+        Gets the number of clients accepted by all workers.
+        Clients accepted by a worker that died are not counted.
+
+        :return: int
+        """
+        return sum(worker.accepted for worker in self._workers)
+
+    @property
+    def restarts(self) -> int:
+        """
+        Gets the number of workers restarted after they died.
+
+        :return: int
+        """
+        return self._restarts
+
+
+class Cluster:
+    """
+    Runs a Server in each of several worker processes
+    whose listeners share one address with SO_REUSEPORT.
+    """
+
+    def __init__(self, factory: Callable[[], Server | Awaitable[Server]],
+                 workers: int | None = None, restart: bool = True,
+                 interval: float = 1.0, start_method: str = "spawn",
+                 event_loop: str | None = None,
+                 restart_delay: float = 1.0,
+                 max_restart_delay: float = 60.0,
+                 max_restarts: int | None = 10):
+        """
+        Runs a Server in each of several worker processes
+        whose listeners share one address with SO_REUSEPORT.
+
+        The factory is called in every worker and must create a Server
+        whose listener is created with reuse_port=True. With the spawn
+        start method it must be a module level function, and the program
+        must start the cluster under an if __name__ == "__main__" guard.
+
+        :param factory: Creates the Server of a worker
+        :param workers: The number of workers, defaults to the CPU count
+        :param restart: Whether to restart workers that died
+        :param interval: Seconds between supervision and stats reports
+        :param start_method: multiprocessing start method
+        :param event_loop: Event loop the workers install,
+                           see install_event_loop
+        :param restart_delay: Seconds before a worker that died
+                              is restarted, doubled for each time
+                              it died again
+        :param max_restart_delay: The maximum restart delay. A worker
+                                  that ran this long before it died
+                                  starts over with the restart delay
+        :param max_restarts: The number of times in a row a worker
+                             is restarted before it is left dead,
+                             or None for no limit
+        """
+        if workers is None:
+            workers = cpu_count() or 1
+        if workers < 1 or interval <= 0:
+            raise InvalidParameterException(
+                "The number of workers and the interval must be positive.")
+        if not 0 < restart_delay <= max_restart_delay or \
+                max_restarts is not None and max_restarts < 0:
+            raise InvalidParameterException(
+                "The restart delay must be positive and at most the "
+                "maximum, and the maximum restarts must not be negative.")
+        self._factory: Callable[[], Server | Awaitable[Server]] = factory
+        self._workers: int = workers
+        self._restart: bool = restart
+        self._interval: float = interval
+        self._event_loop: str | None = event_loop
+        self._restart_delay: float = restart_delay
+        self._max_restart_delay: float = max_restart_delay
+        self._max_restarts: int | None = max_restarts
+        self._context = get_context(start_method)
+        self._processes: list = []
+        self._pipes: list[Connection] = []
+        self._reports: dict[int, WorkerStats] = {}
+        self._restarts: int = 0
+        self._started: list[float] = []
+        self._failures: list[int] = []
+        self._due: list[float | None] = []
+        self._task: Task | None = None
+        self._running: bool = False
+        self._closed: bool = False
+
+    @property
+    def running(self) -> bool:
+        """
+        Gets a value indicating whether Cluster is running.
+
+        :return: bool
+        """
+        return self._running
+
+    @property
+    def closed(self) -> bool:
+        """
+        Gets a value indicating whether Cluster has been closed.
+
+        :return: bool
+        """
+        return self._closed
+
+    @property
+    def workers(self) -> int:
+        """
+        Gets the number of worker processes.
+
+        :return: int
+        """
+        return self._workers
+
+    @property
+    def alive(self) -> int:
+        """
+        Gets the number of worker processes alive.
+
+        :return: int
+        """
+        return sum(process.is_alive() for process in self._processes)
+
+    @property
+    def stats(self) -> ClusterStats:
+        """
+        Gets the statistics last reported by the workers.
+
+        :return: ClusterStats
+        """
+        self._collect()
+        return ClusterStats([self._reports[index]
+                             for index in sorted(self._reports)],
+                            self._restarts)
+
+    async def run(self):
+        """
+        Starts the worker processes and supervises them.
+        """
+        if self._closed:
+            raise InvalidOperationException("Cluster has been closed.")
+        if self._running:
+            return
+        self._running = True
+        for index in range(self._workers):
+            self._processes.append(None)
+            self._pipes.append(None)
+            self._started.append(0.0)
+            self._failures.append(0)
+            self._due.append(None)
+            self._spawn(index)
+        self._task = create_task(self._supervise())
+
+    async def close(self, timeout: float = 5.0):
+        """
+        Closes the servers of all workers and waits for them to exit.
+        Workers still running after the timeout are terminated.
+
+        :param timeout: Seconds to wait for each worker
+        """
+        if not self._running or self._closed:
+            return
+        self._closed = True
+        self._task.cancel()
+        await gather(self._task, return_exceptions=True)
+        for pipe in self._pipes:
+            try:
+                pipe.send(None)
+            except OSError:
+                pass
+        loop = get_running_loop()
+        await gather(*[loop.run_in_executor(None, process.join, timeout)
+                       for process in self._processes])
+        for process in self._processes:
+            if process.is_alive():
+                process.terminate()
+                process.join()
+        self._collect()
+        for pipe in self._pipes:
+            pipe.close()
+        self._running = False
+
+    def _spawn(self, index: int):
+        """
+        Starts a worker process connected by its own pipe, so a worker
+        that dies cannot leave a lock shared with the others held.
+
+        :param index: Index of the worker
+        """
+        pipe, child = self._context.Pipe()
+        process = self._context.Process(
+            target=_work, daemon=True,
+            args=(self._factory, index, child, self._interval,
+                  self._event_loop))
+        process.start()
+        child.close()
+        self._processes[index] = process
+        self._pipes[index] = pipe
+        self._started[index] = get_running_loop().time()
+
+    async def _supervise(self):
+        """
+        Collects the stats and restarts workers that died, after a delay
+        that grows while they keep dying.
+        """
+        loop = get_running_loop()
+        while True:
+            await sleep(self._interval)
+            self._collect()
+            if not self._restart:
+                continue
+            now = loop.time()
+            for index, process in enumerate(self._processes):
+                if process.is_alive():
+                    continue
+                if self._due[index] is None:
+                    self._due[index] = self._schedule(index, now)
+                    process.join()
+                    self._pipes[index].close()
+                    self._reports.pop(index, None)
+                if now >= self._due[index]:
+                    self._due[index] = None
+                    self._spawn(index)
+                    self._restarts += 1
+
+    def _schedule(self, index: int, now: float) -> float:
+        """
+        Decides when a worker that died is restarted.
+
+        :param index: Index of the worker
+        :param now: Current time of the event loop
+        :return: Time of the restart, infinity if it is left dead
+        """
+        if now - self._started[index] >= self._max_restart_delay:
+            self._failures[index] = 0
+        failures = self._failures[index]
+        if self._max_restarts is not None and \
+                failures >= self._max_restarts:
+            return float("inf")
+        self._failures[index] += 1
+        return now + min(self._max_restart_delay,
+                         self._restart_delay * 2 ** min(failures, 32))
+
+    def _collect(self):
+        """
+        Takes the reports the workers sent since the last collection.
+        """
+        for pipe in self._pipes:
+            try:
+                while pipe.poll():
+                    report = pipe.recv()
+                    self._reports[report[0]] = WorkerStats(*report)
+            except (EOFError, OSError):
+                pass
+
+
+def _work(factory: Callable[[], Server | Awaitable[Server]], index: int,
+          pipe: Connection, interval: float, event_loop: str | None):
+    """
+    Runs the Server of a worker process until the cluster closes.
+
+    :param factory: Creates the Server of the worker
+    :param index: Index of the worker
+    :param pipe: Pipe to the cluster, carries the reports to it
+                 and the stop request from it
+    :param interval: Seconds between stats reports
+    :param event_loop: Event loop to install
+    """
+    if event_loop:
+        install_event_loop(event_loop)
+    run(_serve(factory, index, pipe, interval))
+
+
+async def _serve(factory: Callable[[], Server | Awaitable[Server]],
+                 index: int, pipe: Connection, interval: float):
+    server = factory()
+    if isawaitable(server):
+        server = await server
+    if not getattr(server._listener, "reuse_port", False):
+        raise InvalidOperationException(
+            "The listener of a cluster worker must be created "
+            "with reuse_port=True.")
+    await server.run()
+    loop = get_running_loop()
+    pid = getpid()
+    try:
+        while True:
+            pipe.send((index, pid, server.connections, server.accepted))
+            if await loop.run_in_executor(None, pipe.poll, interval):
+                break
+    except (EOFError, OSError):
+        pass
+    await server.close()
@@ -0,0 +1,113 @@
+from zlib import (DEFLATED, MAX_WBITS, Z_DEFAULT_COMPRESSION, Z_SYNC_FLUSH,
+                  compressobj, decompressobj)
+from XSocket.exception import InvalidParameterException
+
+__all__ = [
+    "DeflateOptions",
+    "DeflateContext"
+]
+
+
+class DeflateOptions:
+    """
+    Specifies the settings of the per-message deflate extension.
+    """
+
+    def __init__(self, level: int = Z_DEFAULT_COMPRESSION,
+                 threshold: int = 1024, executor_threshold: int = 1048576):
+        """
+        Specifies the settings of the per-message deflate extension.
+
+        :param level: Compression level from 0 to 9, or -1 for the default
+        :param threshold: Messages smaller than this are sent uncompressed
+        :param executor_threshold: Messages of at least this size
+                                   are compressed in the default executor
+        """
+        if not -1 <= level <= 9:
+            raise InvalidParameterException(
+                "The level must be between -1 and 9.")
+        if threshold < 0 or executor_threshold < 0:
+            raise InvalidParameterException(
+                "The thresholds must not be negative.")
+        self._level: int = level
+        self._threshold: int = threshold
+        self._executor_threshold: int = executor_threshold
+
+    @property
+    def level(self) -> int:
+        """
+        Gets the compression level.
+
+        :return: int
+        """
+        return self._level
+
+    @property
+    def threshold(self) -> int:
+        """
+        Gets the size below which messages are sent uncompressed.
+
+        :return: int
+        """
+        return self._threshold
+
+    @property
+    def executor_threshold(self) -> int:
+        """
+        Gets the size from which messages are compressed in the executor.
+
+        :return: int
+        """
+        return self._executor_threshold
+
+
+class DeflateContext:
+    """
+    Compresses and decompresses the messages of one connection
+    with raw deflate streams whose history is kept between messages.
+    """
+
+    def __init__(self, options: DeflateOptions):
+        """
+        Compresses and decompresses the messages of one connection
+        with raw deflate streams whose history is kept between messages.
+
+        :param options: Settings of the extension
+        """
+        self._options: DeflateOptions = options
+        self._compressor = compressobj(options.level, DEFLATED, -MAX_WBITS)
+        self._decompressor = decompressobj(-MAX_WBITS)
+
+    @property
+    def options(self) -> DeflateOptions:
+        """
+        Gets the settings of the extension.
+
+        :return: DeflateOptions
+        """
+        return self._options
+
+    def compress(self, data: bytes | bytearray | memoryview) -> bytes:
+        """
+        Compresses a message. Messages must be decompressed by the peer
+        in the order they were compressed.
+
+        :param data: Data to compress
+        :return: Compressed data
+        """
+        return self._compressor.compress(data) + \
+            self._compressor.flush(Z_SYNC_FLUSH)
+
+    def decompress(self, data: bytes | bytearray | memoryview,
+                   max_length: int = 0) -> bytearray:
+        """
+        Decompresses a message or the next chunk of a message.
+        Output beyond the maximum length is not produced, after which
+        the context must not be used anymore.
+
+        :param data: Compressed data
+        :param max_length: The maximum size of the decompressed data,
+                           0 for no limit
+        :return: Decompressed data
+        """
+        return bytearray(self._decompressor.decompress(data, max_length))
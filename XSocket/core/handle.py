@@ -1,7 +1,12 @@
 from abc import ABCMeta, abstractmethod
-from typing import Any, Generator
+from os import PathLike
+from typing import (Any, AsyncIterable, BinaryIO, Generator, Iterable,
+                    Sequence)
 from XSocket.core.net import AddressFamily, AddressInfo
+from XSocket.metrics import Metrics
 from XSocket.protocol.protocol import ProtocolType
+from XSocket.stream import MessageStream
+from XSocket.tracing import Tracer
 from XSocket.util import OPCode
 
 __all__ = [
@@ -60,6 +65,87 @@ class IHandle(metaclass=ABCMeta):
         :return: ProtocolType
         """
 
+    @property
+    @abstractmethod
+    def opcode(self) -> OPCode:
+        """
+        Gets the data type of the last message received.
+
+        :return: OPCode
+        """
+
+    @property
+    @abstractmethod
+    def metrics(self) -> Metrics | None:
+        """
+        Gets the metrics the Handle records its frames and bytes in.
+
+        :return: Metrics or None if disabled
+        """
+
+    @metrics.setter
+    @abstractmethod
+    def metrics(self, metrics: Metrics | None):
+        """
+        Sets the metrics the Handle records its frames and bytes in.
+
+        :param metrics: Metrics or None to disable
+        """
+
+    @abstractmethod
+    def set_tracer(self, tracer: Tracer | None, connection_id: int = 0):
+        """
+        Sets the tracer the Handle reports the spans of its socket reads,
+        frame decoding and socket writes to.
+
+        :param tracer: Tracer or None to disable
+        :param connection_id: Id of the connection in the spans
+        """
+
+    @property
+    @abstractmethod
+    def rtt(self) -> float | None:
+        """
+        Gets the smoothed round trip time in seconds.
+
+        :return: float or None if no pong has been received
+        """
+
+    @property
+    @abstractmethod
+    def rtt_variance(self) -> float | None:
+        """
+        Gets the smoothed variation of the round trip time in seconds.
+
+        :return: float or None if no pong has been received
+        """
+
+    @property
+    @abstractmethod
+    def min_rtt(self) -> float | None:
+        """
+        Gets the smallest round trip time in seconds.
+
+        :return: float or None if no pong has been received
+        """
+
+    @property
+    @abstractmethod
+    def timed_out(self) -> bool:
+        """
+        Gets a value indicating whether the connection was aborted
+        because nothing was received for the idle timeout.
+
+        :return: bool
+        """
+
+    @abstractmethod
+    def ping(self):
+        """
+        Queues a ping. The round trip time is updated
+        when the pong of the peer arrives.
+        """
+
     @staticmethod
     @abstractmethod
     async def create(address: AddressInfo) -> "IHandle":
@@ -76,15 +162,35 @@ class IHandle(metaclass=ABCMeta):
         Closes the Socket connection.
         """
 
+    @abstractmethod
+    def abort(self):
+        """
+        Closes the Socket immediately, discarding queued data.
+        """
+
     @staticmethod
     @abstractmethod
-    def pack(data: bytearray, opcode: OPCode) -> Generator[bytearray, Any, Any]:
+    def pack(data: bytes | bytearray | memoryview, opcode: OPCode,
+             max_frame_size: int = 65535
+             ) -> Generator[bytes | memoryview, Any, Any]:
         """
-        Generates a packet to be transmitted.
+        Generates the buffers of the packets to be transmitted.
 
         :param data: Data to send
         :param opcode: Operation code
-        :return: Packet generator
+        :param max_frame_size: The maximum payload size of a frame
+        :return: Buffer generator
+        """
+
+    @abstractmethod
+    def encode(self, data: bytes | bytearray | memoryview,
+               opcode: OPCode) -> list[bytes | memoryview]:
+        """
+        Encodes data into the packets this Handle sends.
+
+        :param data: Data to send
+        :param opcode: Operation code
+        :return: Buffers of the packets
         """
 
     @staticmethod
@@ -98,18 +204,117 @@ class IHandle(metaclass=ABCMeta):
         """
 
     @abstractmethod
-    async def send(self, data: bytes | bytearray, opcode: OPCode):
+    async def send(self, data: bytes | bytearray | memoryview,
+                   opcode: OPCode, flush: bool = False):
         """
         Sends data to a connected Socket.
 
+        The data may be queued without being copied, so it must not be
+        modified until it is flushed.
+
         :param data: Data to send
         :param opcode: Operation Code
+        :param flush: Whether to wait until the data is written to the socket
+        """
+
+    @abstractmethod
+    async def send_stream(self, source: AsyncIterable[bytes | bytearray] |
+                          Iterable[bytes | bytearray] | BinaryIO,
+                          opcode: OPCode, chunk_size: int = 65535,
+                          flush: bool = False):
+        """
+        Sends a message whose data is read from an iterator or a file object.
+
+        :param source: Iterator of chunks or binary file object
+        :param opcode: Operation Code
+        :param chunk_size: The number of bytes to read from a file at once
+        :param flush: Whether to wait until the data is written to the socket
+        """
+
+    @abstractmethod
+    async def send_file(self, file: str | PathLike | int | BinaryIO,
+                        offset: int = 0, count: int | None = None,
+                        opcode: OPCode = OPCode.Data):
+        """
+        Sends a part of a file as one message with sendfile.
+
+        :param file: Path, file descriptor or binary file object
+        :param offset: Offset of the first byte to send
+        :param count: The number of bytes to send, defaults to the rest
+        :param opcode: Operation Code
+        """
+
+    @abstractmethod
+    def write_packets(self, packets: Sequence[bytes | memoryview]):
+        """
+        Queues packets generated by pack without waiting.
+
+        :param packets: Buffers of the packets to send
+        """
+
+    @abstractmethod
+    def get_write_buffer_size(self) -> int:
+        """
+        Gets the number of bytes queued and not yet written.
+
+        :return: Size of the write buffer
         """
 
     @abstractmethod
-    async def receive(self) -> bytearray:
+    def get_write_buffer_limits(self) -> tuple[int, int]:
+        """
+        Gets the high and low watermarks of the write buffer.
+
+        :return: High watermark, Low watermark
+        """
+
+    @abstractmethod
+    def set_write_buffer_limits(self, high: int | None = None,
+                                low: int | None = None):
+        """
+        Sets the high and low watermarks of the write buffer.
+
+        :param high: High watermark
+        :param low: Low watermark
+        """
+
+    @abstractmethod
+    async def drain(self):
+        """
+        Waits until the write buffer drains to the low watermark
+        if it is above the high watermark.
+        """
+
+    @abstractmethod
+    async def receive(self, stream: bool = False
+                      ) -> bytearray | MessageStream:
         """
         Receives data from a bound Socket.
 
-        :return: Received data
+        :param stream: Whether to return a fragmented message as a stream
+        :return: Received data or MessageStream
+        """
+
+    @abstractmethod
+    def receive_nowait(self, stream: bool = False) -> bytearray | None:
+        """
+        Receives a message only if it is already fully buffered.
+
+        :param stream: Whether fragmented messages are left to receive
+        :return: Received data or None
+        """
+
+    @abstractmethod
+    async def receive_into(self, buffer: bytearray | memoryview) -> int:
+        """
+        Receives the data of a message into a caller-owned buffer.
+
+        :param buffer: Writable buffer
+        :return: The number of bytes received
+        """
+
+    @abstractmethod
+    async def wait_message(self):
+        """
+        Reads from the socket until a message arrives, without receiving it.
         """
@@ -1,4 +1,5 @@
 from abc import ABCMeta, abstractmethod
+from typing import Any
 from XSocket.core.handle import IHandle
 from XSocket.core.net import AddressFamily, AddressInfo
 from XSocket.protocol.protocol import ProtocolType
@@ -96,3 +97,42 @@ class IListener(metaclass=ABCMeta):
 
         :return: Handle
         """
+
+    @abstractmethod
+    async def accept_many(self, limit: int) -> list[IHandle]:
+        """
+        Waits for a connection and creates Handles for it and
+        for every other connection already pending, up to the limit.
+
+        :param limit: The maximum number of connections
+        :return: list[Handle]
+        """
+
+    @abstractmethod
+    async def accept_socket(self) -> Any:
+        """
+        Accepts a connection without creating a Handle,
+        so it can be handed off to another event loop.
+
+        :return: Low-level socket
+        """
+
+    @abstractmethod
+    async def accept_sockets(self, limit: int) -> list[Any]:
+        """
+        Waits for a connection and accepts it and every other connection
+        already pending, up to the limit, without creating Handles.
+
+        :param limit: The maximum number of connections
+        :return: list of low-level sockets
+        """
+
+    @abstractmethod
+    async def adopt(self, sock: Any) -> IHandle:
+        """
+        Creates a Handle on the running event loop
+        for a socket returned by accept_socket.
+
+        :param sock: Low-level socket
+        :return: Handle
+        """
@@ -1,5 +1,5 @@
 from abc import ABCMeta, abstractmethod
-from typing import Any
+from typing import Any, BinaryIO, Sequence
 from XSocket.core.net import AddressInfo
 
 __all__ = [
@@ -73,6 +73,25 @@ class ISocket(metaclass=ABCMeta):
         :param data: Data to send
         """
 
+    @abstractmethod
+    async def send_vectored(self, buffers: Sequence[bytes | memoryview]):
+        """
+        Sends the concatenation of buffers to a connected Socket
+        without joining them.
+
+        :param buffers: Buffers to send
+        """
+
+    @abstractmethod
+    async def send_file(self, file: BinaryIO, offset: int, count: int):
+        """
+        Sends a part of a file to a connected Socket with sendfile.
+
+        :param file: Binary file object
+        :param offset: Offset of the first byte to send
+        :param count: The number of bytes to send
+        """
+
     @abstractmethod
     async def receive(self, length: int, exactly: bool = False) -> bytearray:
         """
@@ -82,3 +101,12 @@ class ISocket(metaclass=ABCMeta):
         :param exactly: Weather to read exactly
         :return: Received data
         """
+
+    @abstractmethod
+    async def receive_into(self, buffer: memoryview) -> int:
+        """
+        Receives data from a bound Socket into a buffer.
+
+        :param buffer: Writable buffer
+        :return: The number of bytes received, 0 if the peer closed
+        """
@@ -6,6 +6,8 @@ __all__ = [
     "OnCloseEventArgs",
     "OnAcceptEventArgs",
     "OnMessageEventArgs",
+    "OnStreamEventArgs",
+    "OnChannelEventArgs",
     "OnErrorEventArgs"
 ]
 
@@ -55,12 +57,41 @@ class OnMessageEventArgs(EventArgs):
     @property
     def data(self) -> bytearray:
         """
-        Returns received message.
+        Returns received message, the first one of a batch.
 
         :return: Data of bytes
         """
         return self._data[0]
 
+    @property
+    def messages(self) -> list[bytearray]:
+        """
+        Returns every received message of the batch in order.
+
+        :return: List of data
+        """
+        return self._data
+
+
+class OnStreamEventArgs(EventArgs):
+    """
+    Contains state information and event data associated
+    with message stream received event.
+    """
+    def __init__(self, stream):
+        self._stream = stream
+
+    @property
+    def stream(self):
+        """
+        Returns the chunks of the received message.
+        The stream must be read before the handler returns,
+        the rest of it is discarded afterwards.
+
+        :return: MessageStream
+        """
+        return self._stream
+
 
 class OnErrorEventArgs(EventArgs):
     """
@@ -78,3 +109,21 @@ class OnErrorEventArgs(EventArgs):
         :return: Exception
         """
         return self._exception
+
+
+class OnChannelEventArgs(EventArgs):
+    """
+    Contains state information and event data associated
+    with event of channel opened by the peer.
+    """
+    def __init__(self, channel):
+        self._channel = channel
+
+    @property
+    def channel(self):
+        """
+        Returns a channel object.
+
+        :return: Channel
+        """
+        return self._channel
@@ -7,6 +7,10 @@ __all__ = [
     "ListenerClosedException",
     "ServerClosedException",
     "ClientClosedException",
+    "PoolClosedException",
+    "ChannelClosedException",
+    "RequestFailedException",
+    "ProtocolException",
     "ConnectionAbortedException"
 ]
 
@@ -61,6 +65,31 @@ class ClientClosedException(ClosedException):
     """
 
 
+class PoolClosedException(ClosedException):
+    """
+    The exception that is thrown when closed pool is used.
+    """
+
+
+class ChannelClosedException(ClosedException):
+    """
+    The exception that is thrown when closed channel is used.
+    """
+
+
+class RequestFailedException(Exception):
+    """
+    The exception that is thrown when the peer failed to handle a request.
+    """
+
+
+class ProtocolException(InvalidOperationException):
+    """
+    The exception that is thrown when the peer breaks the protocol,
+    after which the connection is aborted.
+    """
+
+
 class ConnectionAbortedException(ConnectionAbortedError):
     """
     The exception that is thrown when connection is aborted.
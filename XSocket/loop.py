@@ -0,0 +1,60 @@
+from asyncio import (AbstractEventLoop, DefaultEventLoopPolicy,
+                     get_running_loop, set_event_loop_policy)
+from XSocket.exception import (InvalidOperationException,
+                               InvalidParameterException)
+
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+__all__ = [
+    "available_event_loops",
+    "install_event_loop",
+    "get_event_loop_name"
+]
+
+
+def available_event_loops() -> list[str]:
+    """
+    Gets the names of the event loops that can be installed,
+    the fastest one first.
+
+    :return: Names of the event loops
+    """
+    return ["uvloop", "asyncio"] if uvloop else ["asyncio"]
+
+
+def install_event_loop(name: str | None = None) -> str:
+    """
+    Installs the policy of an event loop, so asyncio.run and
+    new_event_loop create loops of that kind. Must be called
+    before the event loop is created.
+
+    :param name: "uvloop" or "asyncio", defaults to the fastest available
+    :return: Name of the installed event loop
+    """
+    if name is None:
+        name = available_event_loops()[0]
+    if name == "asyncio":
+        set_event_loop_policy(DefaultEventLoopPolicy())
+    elif name == "uvloop":
+        if not uvloop:
+            raise InvalidOperationException("uvloop is not installed.")
+        set_event_loop_policy(uvloop.EventLoopPolicy())
+    else:
+        raise InvalidParameterException(f"Unknown event loop: {name}")
+    return name
+
+
+def get_event_loop_name(loop: AbstractEventLoop | None = None) -> str:
+    """
+    Gets the name of the kind of an event loop.
+
+    :param loop: Event loop, defaults to the running loop
+    :return: "uvloop" or "asyncio"
+    """
+    loop = loop or get_running_loop()
+    if type(loop).__module__.split(".")[0] == "uvloop":
+        return "uvloop"
+    return "asyncio"
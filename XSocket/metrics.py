@@ -0,0 +1,394 @@
+from asyncio import (IncompleteReadError, LimitOverrunError, StreamReader,
+                     StreamWriter, start_server)
+from asyncio import Server as StreamServer
+from bisect import bisect_left
+from os import PathLike, replace
+from typing import Callable, Sequence
+
+__all__ = [
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "Metrics",
+    "serve_metrics"
+]
+
+SIZE_BUCKETS = (64, 256, 1024, 4096, 16384, 65536, 262144, 1048576,
+                4194304, 16777216)
+TIME_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+                0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+CLOSE_REASONS = ("local", "remote", "error", "timeout")
+
+
+class Counter:
+    """
+    Represents a value that only increases.
+    """
+    __slots__ = ("_name", "_description", "_labels", "_value")
+
+    def __init__(self, name: str, description: str, labels: str = ""):
+        """
+        Represents a value that only increases.
+
+        :param name: Name of the metric
+        :param description: Description of the metric
+        :param labels: Prometheus labels, like reason="error"
+        """
+        self._name: str = name
+        self._description: str = description
+        self._labels: str = labels
+        self._value: int | float = 0
+
+    @property
+    def name(self) -> str:
+        """
+        Gets the name of the metric.
+
+        :return: str
+        """
+        return self._name
+
+    @property
+    def description(self) -> str:
+        """
+        Gets the description of the metric.
+
+        :return: str
+        """
+        return self._description
+
+    @property
+    def value(self) -> int | float:
+        """
+        Gets the current value.
+
+        :return: int | float
+        """
+        return self._value
+
+    def inc(self, amount: int | float = 1):
+        """
+        Increases the value.
+
+        :param amount: Amount to add
+        """
+        self._value += amount
+
+    def merge(self, other: "Counter"):
+        """
+        Adds the value of another counter.
+
+        :param other: Counter of the same metric
+        """
+        self._value += other._value
+
+    def lines(self, prefix: str) -> list[str]:
+        """
+        Formats the samples in the Prometheus text format.
+
+        :param prefix: Prefix of the metric name
+        :return: Lines of the samples
+        """
+        labels = f"{{{self._labels}}}" if self._labels else ""
+        return [f"{prefix}{self._name}{labels} {self._value}"]
+
+
+class Gauge(Counter):
+    """
+    Represents a value that can go up and down.
+    """
+    __slots__ = ()
+
+    def set(self, value: int | float):
+        """
+        Sets the value.
+
+        :param value: New value
+        """
+        self._value = value
+
+    def dec(self, amount: int | float = 1):
+        """
+        Decreases the value.
+
+        :param amount: Amount to subtract
+        """
+        self._value -= amount
+
+
+class Histogram:
+    """
+    Counts observations in buckets of fixed upper bounds.
+    """
+    __slots__ = ("_name", "_description", "_bounds", "_counts", "_sum",
+                 "_count")
+
+    def __init__(self, name: str, description: str,
+                 bounds: Sequence[float]):
+        """
+        Counts observations in buckets of fixed upper bounds.
+
+        :param name: Name of the metric
+        :param description: Description of the metric
+        :param bounds: Upper bounds of the buckets in ascending order
+        """
+        self._name: str = name
+        self._description: str = description
+        self._bounds: Sequence[float] = bounds
+        self._counts: list[int] = [0] * (len(bounds) + 1)
+        self._sum: int | float = 0
+        self._count: int = 0
+
+    @property
+    def name(self) -> str:
+        """
+        Gets the name of the metric.
+
+        :return: str
+        """
+        return self._name
+
+    @property
+    def description(self) -> str:
+        """
+        Gets the description of the metric.
+
+        :return: str
+        """
+        return self._description
+
+    @property
+    def count(self) -> int:
+        """
+        Gets the number of observations.
+
+        :return: int
+        """
+        return self._count
+
+    @property
+    def sum(self) -> int | float:
+        """
+        Gets the sum of the observations.
+
+        :return: int | float
+        """
+        return self._sum
+
+    @property
+    def buckets(self) -> dict[float, int]:
+        """
+        Gets the cumulative number of observations up to each bound,
+        the last one being infinity.
+
+        :return: dict[float, int]
+        """
+        return dict(zip((*self._bounds, float("inf")), self._cumulative()))
+
+    def _cumulative(self) -> list[int]:
+        """
+        Adds up the counts of the buckets.
+
+        :return: Cumulative counts
+        """
+        counts, total = [], 0
+        for count in self._counts:
+            total += count
+            counts.append(total)
+        return counts
+
+    def observe(self, value: int | float):
+        """
+        Records an observation.
+
+        :param value: Observed value
+        """
+        self._counts[bisect_left(self._bounds, value)] += 1
+        self._sum += value
+        self._count += 1
+
+    def merge(self, other: "Histogram"):
+        """
+        Adds the observations of another histogram with the same bounds.
+
+        :param other: Histogram of the same metric
+        """
+        for index, count in enumerate(other._counts):
+            self._counts[index] += count
+        self._sum += other._sum
+        self._count += other._count
+
+    def lines(self, prefix: str) -> list[str]:
+        """
+        Formats the samples in the Prometheus text format.
+
+        :param prefix: Prefix of the metric name
+        :return: Lines of the cumulative buckets, sum and count
+        """
+        name = prefix + self._name
+        lines = [f'{name}_bucket{{le="{bound}"}} {count}'
+                 for bound, count in zip(self._bounds, self._cumulative())]
+        lines.append(f'{name}_bucket{{le="+Inf"}} {self._count}')
+        return [*lines, f"{name}_sum {self._sum}",
+                f"{name}_count {self._count}"]
+
+
+class Metrics:
+    """
+    Registry of the counters and histograms of a connection or a server.
+
+    Every instrument is only updated by the event loop owning the
+    connection, so updating one is a plain addition without a lock.
+    """
+
+    def __init__(self):
+        """
+        Registry of the counters and histograms of a connection or a server.
+        """
+        self.frames_sent: Counter = Counter(
+            "frames_sent_total", "Frames queued to be written.")
+        self.frames_received: Counter = Counter(
+            "frames_received_total", "Frames decoded.")
+        self.bytes_sent: Counter = Counter(
+            "bytes_sent_total", "Bytes written, frame headers included.")
+        self.bytes_received: Counter = Counter(
+            "bytes_received_total", "Bytes read, frame headers included.")
+        self.messages_sent: Counter = Counter(
+            "messages_sent_total", "Messages sent.")
+        self.messages_received: Counter = Counter(
+            "messages_received_total", "Messages received.")
+        self.accepted: Counter = Counter(
+            "accepted_total", "Connections accepted.")
+        self.closes: dict[str, Counter] = {
+            reason: Counter("closes_total", "Connections closed by reason.",
+                            f'reason="{reason}"')
+            for reason in CLOSE_REASONS}
+        self.connections: Gauge = Gauge(
+            "connections", "Open connections.")
+        self.sent_size: Histogram = Histogram(
+            "sent_message_size_bytes", "Sizes of the messages sent.",
+            SIZE_BUCKETS)
+        self.received_size: Histogram = Histogram(
+            "received_message_size_bytes", "Sizes of the messages received.",
+            SIZE_BUCKETS)
+        self.write_buffer: Histogram = Histogram(
+            "write_buffer_bytes",
+            "Bytes queued and not yet written after queueing a message.",
+            SIZE_BUCKETS)
+        self.send_latency: Histogram = Histogram(
+            "send_latency_seconds",
+            "Seconds a send waited to queue, flush or drain its message.",
+            TIME_BUCKETS)
+        self.handler_time: Histogram = Histogram(
+            "handler_seconds",
+            "Seconds spent in the on_message and on_stream handlers.",
+            TIME_BUCKETS)
+        self.rtt: Histogram = Histogram(
+            "rtt_seconds", "Round trip times measured by pings.",
+            TIME_BUCKETS)
+
+    @property
+    def instruments(self) -> list[Counter | Histogram]:
+        """
+        Gets every instrument of the registry.
+
+        :return: list[Counter | Histogram]
+        """
+        return [self.frames_sent, self.frames_received, self.bytes_sent,
+                self.bytes_received, self.messages_sent,
+                self.messages_received, self.accepted,
+                *self.closes.values(), self.connections, self.sent_size,
+                self.received_size, self.write_buffer, self.send_latency,
+                self.handler_time, self.rtt]
+
+    def merge(self, other: "Metrics"):
+        """
+        Adds the values of another registry.
+
+        :param other: Metrics
+        """
+        for mine, theirs in zip(self.instruments, other.instruments):
+            mine.merge(theirs)
+
+    def snapshot(self) -> dict:
+        """
+        Copies the current values into plain data.
+
+        :return: Values by metric name, close counts by reason and
+                 histograms as dicts of buckets, sum and count
+        """
+        snapshot = {}
+        for instrument in self.instruments:
+            if isinstance(instrument, Histogram):
+                snapshot[instrument.name] = {"buckets": instrument.buckets,
+                                             "sum": instrument.sum,
+                                             "count": instrument.count}
+            else:
+                snapshot[instrument.name] = instrument.value
+        snapshot["closes_total"] = {reason: counter.value
+                                    for reason, counter in
+                                    self.closes.items()}
+        return snapshot
+
+    def export(self, prefix: str = "xsocket_") -> str:
+        """
+        Formats the current values in the Prometheus text format.
+
+        :param prefix: Prefix of the metric names
+        :return: Exposition text
+        """
+        lines, described = [], set()
+        for instrument in self.instruments:
+            if instrument.name not in described:
+                described.add(instrument.name)
+                kind = "histogram" if isinstance(instrument, Histogram) \
+                    else "gauge" if isinstance(instrument, Gauge) \
+                    else "counter"
+                lines.append(f"# HELP {prefix}{instrument.name} "
+                             f"{instrument.description}")
+                lines.append(f"# TYPE {prefix}{instrument.name} {kind}")
+            lines += instrument.lines(prefix)
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str | PathLike, prefix: str = "xsocket_"):
+        """
+        Writes the Prometheus text to a file, replacing it at once
+        so a collector never reads a partial file.
+
+        :param path: Path of the file
+        :param prefix: Prefix of the metric names
+        """
+        temporary = f"{path}.tmp"
+        with open(temporary, "w") as file:
+            file.write(self.export(prefix))
+        replace(temporary, path)
+
+
+async def serve_metrics(source: Callable[[], Metrics | None],
+                        host: str = "127.0.0.1", port: int = 9100,
+                        prefix: str = "xsocket_") -> StreamServer:
+    """
+    Starts an HTTP endpoint answering every request
+    with the Prometheus text of the metrics.
+
+    :param source: Gets the metrics, like lambda: server.metrics
+    :param host: Address to listen on
+    :param port: Port to listen on
+    :param prefix: Prefix of the metric names
+    :return: asyncio Server of the endpoint, close it to stop
+    """
+    async def respond(reader: StreamReader, writer: StreamWriter):
+        try:
+            await reader.readuntil(b"\r\n\r\n")
+            metrics = source()
+            body = metrics.export(prefix).encode() if metrics else b""
+            writer.write(b"HTTP/1.1 200 OK\r\n"
+                         b"Content-Type: text/plain; version=0.0.4\r\n"
+                         b"Content-Length: %d\r\n"
+                         b"Connection: close\r\n\r\n" % len(body) + body)
+            await writer.drain()
+        except (IncompleteReadError, LimitOverrunError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+    return await start_server(respond, host, port)
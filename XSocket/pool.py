@@ -0,0 +1,458 @@
+from asyncio import (Condition, Task, create_task, gather, get_running_loop,
+                     sleep, wait, wait_for)
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, Hashable
+from XSocket.core.handle import IHandle
+from XSocket.core.listener import IListener
+from XSocket.core.net import AddressInfo
+from XSocket.exception import (InvalidOperationException,
+                               InvalidParameterException,
+                               PoolClosedException)
+from XSocket.protocol.inet.xtcp.listener import XTCPListener
+
+__all__ = [
+    "ClientPool"
+]
+
+
+class _Bucket:
+    """
+    Holds the handles connected to one address.
+    """
+    def __init__(self, address: AddressInfo):
+        self.address: AddressInfo = address
+        self.idle: deque[tuple[IHandle, float]] = deque()
+        self.size: int = 0
+        self.condition: Condition = Condition()
+
+
+class ClientPool:
+    """
+    Keeps connected handles per address, so requests lease a warm
+    connection instead of connecting.
+    """
+
+    def __init__(self,
+                 listener: Callable[[AddressInfo], IListener] = XTCPListener,
+                 min_size: int = 0, max_size: int = 8,
+                 idle_timeout: float = 60.0, interval: float = 5.0,
+                 health_check: Callable[[IHandle], Awaitable[bool]] |
+                 None = None):
+        """
+        Keeps connected handles per address, so requests lease a warm
+        connection instead of connecting.
+
+        :param listener: Creates the listener connecting to an address,
+                         like XTCPListener or UnixListener
+        :param min_size: The number of connections kept open per address
+        :param max_size: The maximum number of connections per address,
+                         leases wait while all of them are leased
+        :param idle_timeout: Seconds after which idle connections
+                             above the minimum are closed
+        :param interval: Seconds between maintenance runs
+        :param health_check: Tells whether an idle handle is still usable,
+                             defaults to checking whether it was closed
+        """
+        if not 0 <= min_size <= max_size or max_size < 1:
+            raise InvalidParameterException(
+                "The sizes must satisfy 0 <= min_size <= max_size "
+                "and max_size >= 1.")
+        if idle_timeout <= 0 or interval <= 0:
+            raise InvalidParameterException(
+                "The idle timeout and the interval must be positive.")
+        self._listener: Callable[[AddressInfo], IListener] = listener
+        self._min_size: int = min_size
+        self._max_size: int = max_size
+        self._idle_timeout: float = idle_timeout
+        self._interval: float = interval
+        self._health_check: Callable[[IHandle], Awaitable[bool]] | None = \
+            health_check
+        self._buckets: dict[Hashable, _Bucket] = {}
+        self._leased: dict[int, _Bucket] = {}
+        self._watchers: dict[int, Task] = {}
+        self._task: Task | None = None
+        self._running: bool = False
+        self._closed: bool = False
+
+    @property
+    def running(self) -> bool:
+        """
+        Gets a value indicating whether the maintenance of ClientPool
+        is running.
+
+        :return: bool
+        """
+        return self._running
+
+    @property
+    def closed(self) -> bool:
+        """
+        Gets a value indicating whether ClientPool has been closed.
+
+        :return: bool
+        """
+        return self._closed
+
+    @property
+    def min_size(self) -> int:
+        """
+        Gets the number of connections kept open per address.
+
+        :return: int
+        """
+        return self._min_size
+
+    @property
+    def max_size(self) -> int:
+        """
+        Gets the maximum number of connections per address.
+
+        :return: int
+        """
+        return self._max_size
+
+    @property
+    def connections(self) -> int:
+        """
+        Gets the number of connections open or being opened.
+
+        :return: int
+        """
+        return sum(bucket.size for bucket in self._buckets.values())
+
+    @property
+    def idle(self) -> int:
+        """
+        Gets the number of connections waiting to be leased.
+
+        :return: int
+        """
+        return sum(len(bucket.idle) for bucket in self._buckets.values())
+
+    @property
+    def leased(self) -> int:
+        """
+        Gets the number of connections leased and not returned.
+
+        :return: int
+        """
+        return len(self._leased)
+
+    async def run(self):
+        """
+        Starts the maintenance, which keeps the minimum number of
+        connections open, closes idle ones and runs the health checks.
+        """
+        if self._closed:
+            raise PoolClosedException()
+        if self._running:
+            return
+        self._running = True
+        self._task = create_task(self._maintain())
+
+    async def close(self):
+        """
+        Closes the idle connections, waiting up to the interval for the
+        peers to confirm. Leased connections are closed when they are
+        returned.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        if self._task:
+            self._task.cancel()
+            await gather(self._task, return_exceptions=True)
+        idle = []
+        for bucket in self._buckets.values():
+            async with bucket.condition:
+                idle.extend(handle for handle, _ in bucket.idle)
+                bucket.size -= len(bucket.idle)
+                bucket.idle.clear()
+                bucket.condition.notify_all()
+        await gather(*[handle.close() for handle in idle],
+                     return_exceptions=True)
+        watchers = [*self._watchers.values()]
+        if watchers:
+            await wait(watchers, timeout=self._interval)
+        for handle in idle:
+            await self._unwatch(handle)
+            handle.abort()
+        self._running = False
+
+    async def warm(self, address: AddressInfo):
+        """
+        Opens the minimum number of connections to an address now,
+        so the first leases do not connect.
+
+        :param address: Remote address
+        """
+        if self._closed:
+            raise PoolClosedException()
+        await self._fill(self._bucket(address))
+
+    async def acquire(self, address: AddressInfo,
+                      timeout: float | None = None) -> IHandle:
+        """
+        Leases a connection to an address. An idle one is reused,
+        otherwise one is opened unless the maximum is reached,
+        in which case the lease waits for a connection to be returned.
+
+        :param address: Remote address
+        :param timeout: Seconds to wait, raises TimeoutError when exceeded
+        :return: Handle that must be returned with release
+        """
+        if self._closed:
+            raise PoolClosedException()
+        bucket = self._bucket(address)
+        while True:
+            handle = await wait_for(self._take(bucket), timeout)
+            if handle is None or await self._unwatch(handle):
+                break
+            async with bucket.condition:
+                bucket.size -= 1
+                bucket.condition.notify()
+        if handle is None:
+            try:
+                handle = await self._listener(address).connect()
+            except BaseException:
+                async with bucket.condition:
+                    bucket.size -= 1
+                    bucket.condition.notify()
+                raise
+        self._leased[id(handle)] = bucket
+        return handle
+
+    async def release(self, handle: IHandle, discard: bool = False):
+        """
+        Returns a leased connection to the pool.
+
+        :param handle: Handle returned by acquire
+        :param discard: Whether to close the connection instead,
+                        because it is in an unknown state
+        """
+        bucket = self._leased.pop(id(handle), None)
+        if bucket is None:
+            raise InvalidOperationException(
+                "The handle is not leased from this pool.")
+        discard = discard or self._closed or handle.closed
+        async with bucket.condition:
+            if discard:
+                bucket.size -= 1
+            else:
+                bucket.idle.append((handle, get_running_loop().time()))
+                self._watch(bucket, handle)
+            bucket.condition.notify()
+        if discard:
+            await self._discard(handle)
+
+    @asynccontextmanager
+    async def lease(self, address: AddressInfo,
+                    timeout: float | None = None) -> AsyncIterator[IHandle]:
+        """
+        Leases a connection for the duration of the context.
+        It is discarded if the context exits with an exception.
+
+        :param address: Remote address
+        :param timeout: Seconds to wait, raises TimeoutError when exceeded
+        :return: Handle
+        """
+        handle = await self.acquire(address, timeout)
+        try:
+            yield handle
+        except BaseException:
+            await self.release(handle, discard=True)
+            raise
+        await self.release(handle)
+
+    def _bucket(self, address: AddressInfo) -> _Bucket:
+        """
+        Gets the bucket of an address. Addresses are compared
+        by their family and value, not by identity.
+
+        :param address: Remote address
+        :return: _Bucket
+        """
+        key = (address.address_family, *address)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = _Bucket(address)
+        return bucket
+
+    async def _take(self, bucket: _Bucket) -> IHandle | None:
+        """
+        Takes an open idle handle or reserves room for a new connection.
+
+        :param bucket: Bucket of the address
+        :return: Idle handle or None if a connection must be opened
+        """
+        async with bucket.condition:
+            while True:
+                if self._closed:
+                    raise PoolClosedException()
+                while bucket.idle:
+                    handle, _ = bucket.idle.pop()
+                    if not handle.closed:
+                        return handle
+                    bucket.size -= 1
+                if bucket.size < self._max_size:
+                    bucket.size += 1
+                    return None
+                await bucket.condition.wait()
+
+    async def _fill(self, bucket: _Bucket):
+        """
+        Opens connections until the minimum is reached.
+
+        :param bucket: Bucket of the address
+        """
+        async with bucket.condition:
+            missing = max(0, self._min_size - bucket.size)
+            bucket.size += missing
+        results = await gather(*[self._listener(bucket.address).connect()
+                                 for _ in range(missing)],
+                               return_exceptions=True)
+        async with bucket.condition:
+            now = get_running_loop().time()
+            for result in results:
+                if isinstance(result, BaseException):
+                    bucket.size -= 1
+                elif self._closed:
+                    bucket.size -= 1
+                    await self._discard(result)
+                else:
+                    bucket.idle.appendleft((result, now))
+                    self._watch(bucket, result)
+            bucket.condition.notify(len(results))
+        for result in results:
+            if isinstance(result, Exception):
+                raise result
+
+    async def _maintain(self):
+        """
+        Closes idle connections above the minimum, checks the health
+        of the others and reopens connections below the minimum.
+        """
+        while True:
+            await sleep(self._interval)
+            for bucket in [*self._buckets.values()]:
+                try:
+                    await self._evict(bucket)
+                    await self._fill(bucket)
+                except Exception:
+                    pass
+
+    async def _evict(self, bucket: _Bucket):
+        """
+        Removes the idle handles that timed out or failed the health check.
+        The least recently used handles are at the left.
+
+        :param bucket: Bucket of the address
+        """
+        deadline = get_running_loop().time() - self._idle_timeout
+        async with bucket.condition:
+            checked = [*bucket.idle]
+            bucket.idle.clear()
+        healthy = await gather(*[self._check(bucket, handle)
+                                 for handle, _ in checked])
+        removed = []
+        async with bucket.condition:
+            kept = []
+            for (handle, used), ok in zip(checked, healthy):
+                if not ok or used < deadline and \
+                        bucket.size - len(removed) > self._min_size:
+                    removed.append(handle)
+                else:
+                    kept.append((handle, used))
+            bucket.idle.extendleft(reversed(kept))
+            bucket.size -= len(removed)
+            bucket.condition.notify(len(removed))
+        await gather(*[self._discard(handle) for handle in removed])
+
+    async def _check(self, bucket: _Bucket, handle: IHandle) -> bool:
+        """
+        Tells whether an idle handle is still usable. The handle is not
+        watched while the health check uses it.
+
+        :param bucket: Bucket of the address
+        :param handle: Idle handle
+        :return: bool
+        """
+        if handle.closed:
+            return False
+        if self._health_check is None:
+            return True
+        if not await self._unwatch(handle):
+            return False
+        try:
+            healthy = await self._health_check(handle)
+        except Exception:
+            healthy = False
+        if healthy:
+            self._watch(bucket, handle)
+        return healthy
+
+    def _watch(self, bucket: _Bucket, handle: IHandle):
+        """
+        Reads from an idle handle until it is leased, so it notices
+        when the peer closes the connection.
+
+        :param bucket: Bucket of the address
+        :param handle: Idle handle
+        """
+        task = create_task(self._idle(bucket, handle))
+        self._watchers[id(handle)] = task
+
+        def forget(_):
+            if self._watchers.get(id(handle)) is task:
+                del self._watchers[id(handle)]
+
+        task.add_done_callback(forget)
+
+    async def _unwatch(self, handle: IHandle) -> bool:
+        """
+        Stops reading from an idle handle.
+
+        :param handle: Idle handle
+        :return: Whether the handle is still open
+        """
+        task = self._watchers.pop(id(handle), None)
+        if task is not None:
+            task.cancel()
+            await gather(task, return_exceptions=True)
+        return not handle.closed
+
+    @staticmethod
+    async def _idle(bucket: _Bucket, handle: IHandle):
+        """
+        Waits until the connection of an idle handle ends and removes it.
+        A message on an idle connection is unexpected,
+        so the handle is removed as well.
+
+        :param bucket: Bucket of the address
+        :param handle: Idle handle
+        """
+        try:
+            await handle.wait_message()
+        except Exception:
+            pass
+        handle.abort()
+        async with bucket.condition:
+            for index, (idle, _) in enumerate(bucket.idle):
+                if idle is handle:
+                    del bucket.idle[index]
+                    bucket.size -= 1
+                    bucket.condition.notify()
+                    break
+
+    @staticmethod
+    async def _discard(handle: IHandle):
+        """
+        Closes a handle removed from the pool, ignoring errors.
+
+        :param handle: Handle
+        """
+        try:
+            await handle.close()
+        except Exception:
+            handle.abort()
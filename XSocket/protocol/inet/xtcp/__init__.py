@@ -1,2 +1,4 @@
 from XSocket.protocol.inet.xtcp.handle import XTCPHandle
-from XSocket.protocol.inet.xtcp.listener import XTCPListener
+from XSocket.protocol.inet.xtcp.listener import (XTCPListener,
+                                                 XTCPTransportListener)
+from XSocket.protocol.inet.xtcp.options import XTCPOptions
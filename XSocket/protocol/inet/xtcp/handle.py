@@ -1,35 +1,210 @@
-from asyncio import AbstractEventLoop, get_running_loop
-from struct import pack, unpack
-from typing import Any, Generator
+from asyncio import (AbstractEventLoop, Future, Lock, Task, get_running_loop,
+                     sleep)
+from collections import deque
+from contextlib import nullcontext
+from os import PathLike, fstat
+from struct import pack, unpack, unpack_from
+from time import perf_counter_ns
+from typing import (Any, AsyncIterable, AsyncIterator, BinaryIO, Generator,
+                    Iterable, Sequence)
+from XSocket.buffer import BufferPool
+from XSocket.compression import DeflateContext
 from XSocket.core.handle import IHandle
 from XSocket.core.net import AddressFamily
+from XSocket.core.socket import ISocket
 from XSocket.exception import (ConnectionAbortedException,
                                HandleClosedException,
-                               InvalidOperationException)
+                               InvalidOperationException,
+                               InvalidParameterException,
+                               ProtocolException)
+from XSocket.metrics import Metrics
 from XSocket.protocol.protocol import ProtocolType
 from XSocket.protocol.inet.net import IPAddressInfo
+from XSocket.protocol.inet.xtcp.options import XTCPOptions
 from XSocket.protocol.inet.xtcp.socket import XTCPSocket
+from XSocket.stream import MessageStream
+from XSocket.tracing import Tracer
 from XSocket.util import OPCode
 
 __all__ = [
     "XTCPHandle"
 ]
 
+_WRITE_BATCH_SIZE = 4194304
+_OPCODES = frozenset(OPCode)
+
+
+class _FileRegion:
+    """
+    Represents a part of a file queued to be sent with sendfile.
+    """
+    __slots__ = ("file", "offset", "count")
+
+    def __init__(self, file: BinaryIO, offset: int, count: int):
+        self.file: BinaryIO = file
+        self.offset: int = offset
+        self.count: int = count
+
 
 class XTCPHandle(IHandle):
     """
     Provides client connections for TCP network services.
     """
 
-    def __init__(self, socket: XTCPSocket):
+    def __init__(self, socket: ISocket, options: XTCPOptions | None = None,
+                 connecting: bool = False):
         """
         Provides client connections for TCP network services.
 
         :param socket: Socket to handle
+        :param options: Settings of the handle
+        :param connecting: Whether the handle opened the connection,
+                           in which case it offers the extensions
         """
-        self._socket: XTCPSocket = socket
+        self._socket: ISocket = socket
         self._event_loop: AbstractEventLoop = get_running_loop()
+        self._options: XTCPOptions = options or XTCPOptions()
+        self._receive_size: int = self._options.receive_size
+        self._max_frame_size: int = self._options.max_frame_size
+        self._max_receive_size: int = self._options.max_receive_size
+        self._pool: BufferPool = self._options.buffer_pool
+        self._buffer: bytearray = self._pool.acquire(self._receive_size)
+        self._start: int = 0
+        self._end: int = 0
+        self._missing: int = 0
+        self._frames: deque[tuple[bool, OPCode, bool, int, int]] = deque()
+        self._stream: MessageStream | None = None
+        self._remote_closed: bool = False
+        self._outbound: deque[tuple[Sequence[bytes | memoryview],
+                                    int, Future | None]] = deque()
+        self._outbound_size: int = 0
+        self._high_water: int = 1048576
+        self._low_water: int = 262144
+        self._drain_waiters: list[Future] = []
+        self._held: deque[tuple[Sequence[bytes | memoryview],
+                                int, Future | None]] = deque()
+        self._held_size: int = 0
+        self._streaming: bool = False
+        self._stream_lock: Lock = Lock()
+        self._writer: Task | None = None
+        self._write_error: Exception | None = None
         self._closed: bool = False
+        self._deflate: DeflateContext | None = None
+        self._compressing: bool = False
+        self._offered: bool = False
+        self._compress_lock: Lock = Lock()
+        self._opcode: OPCode = OPCode.Data
+        self._metrics: Metrics | None = None
+        self._tracer: Tracer | None = None
+        self._connection_id: int = 0
+        self._reading_since: float | None = None
+        self._rtt: float | None = None
+        self._rtt_variance: float | None = None
+        self._min_rtt: float | None = None
+        self._timed_out: bool = False
+        self._heartbeat: Task | None = None
+        if self._options.heartbeat_interval or self._options.idle_timeout:
+            self._heartbeat = self._event_loop.create_task(self._watch())
+        if self._options.compression:
+            self._deflate = DeflateContext(self._options.compression)
+            if connecting:
+                self._offered = True
+                self._enqueue(self.encode(b"deflate", OPCode.Extension),
+                              False)
+
+    @property
+    def options(self) -> XTCPOptions:
+        """
+        Gets the settings of the Handle.
+
+        :return: XTCPOptions
+        """
+        return self._options
+
+    @property
+    def compressing(self) -> bool:
+        """
+        Gets a value indicating whether both peers
+        agreed to compress the messages.
+
+        :return: bool
+        """
+        return self._compressing
+
+    @property
+    def opcode(self) -> OPCode:
+        """
+        Gets the data type of the last message received.
+
+        :return: OPCode
+        """
+        return self._opcode
+
+    @property
+    def metrics(self) -> Metrics | None:
+        """
+        Gets the metrics the Handle records its frames and bytes in.
+
+        :return: Metrics or None if disabled
+        """
+        return self._metrics
+
+    @metrics.setter
+    def metrics(self, metrics: Metrics | None):
+        """
+        Sets the metrics the Handle records its frames and bytes in.
+
+        :param metrics: Metrics or None to disable
+        """
+        self._metrics = metrics
+
+    def set_tracer(self, tracer: Tracer | None, connection_id: int = 0):
+        """
+        Sets the tracer the Handle reports the spans of its socket reads,
+        frame decoding and socket writes to.
+
+        :param tracer: Tracer or None to disable
+        :param connection_id: Id of the connection in the spans
+        """
+        self._tracer = tracer
+        self._connection_id = connection_id
+
+    @property
+    def rtt(self) -> float | None:
+        """
+        Gets the smoothed round trip time in seconds.
+
+        :return: float or None if no pong has been received
+        """
+        return self._rtt
+
+    @property
+    def rtt_variance(self) -> float | None:
+        """
+        Gets the smoothed variation of the round trip time in seconds.
+
+        :return: float or None if no pong has been received
+        """
+        return self._rtt_variance
+
+    @property
+    def min_rtt(self) -> float | None:
+        """
+        Gets the smallest round trip time in seconds.
+
+        :return: float or None if no pong has been received
+        """
+        return self._min_rtt
+
+    @property
+    def timed_out(self) -> bool:
+        """
+        Gets a value indicating whether the connection was aborted
+        because nothing was received for the idle timeout.
+
+        :return: bool
+        """
+        return self._timed_out
 
     @property
     def closed(self) -> bool:
@@ -78,14 +253,16 @@ class XTCPHandle(IHandle):
         return ProtocolType.Xtcp
 
     @staticmethod
-    async def create(address: IPAddressInfo) -> "XTCPHandle":
+    async def create(address: IPAddressInfo,
+                     options: XTCPOptions | None = None) -> "XTCPHandle":
         """
         Create a new XTCPHandle with the IP address info.
 
         :param address: IPAddressInfo
+        :param options: Settings of the handle
         :return: XTCPHandle
         """
-        return XTCPHandle(await XTCPSocket.create(address))
+        return XTCPHandle(await XTCPSocket.create(address), options, True)
 
     async def close(self):
         """
@@ -96,41 +273,112 @@ class XTCPHandle(IHandle):
         await self._close(_close_socket=False)
         self._closed = True
 
+    def abort(self):
+        """
+        Closes the Socket immediately, discarding queued data.
+        After close, it stops waiting for the peer to confirm.
+        """
+        if self._closed and self._socket.closed:
+            return
+        self._closed = True
+        if self._heartbeat:
+            self._heartbeat.cancel()
+        self._socket.close()
+        self._fail(ConnectionAbortedException())
+
     async def _close(self, _close_socket: bool):
         """
         Sends a connection close signal to the peer and closes the socket.
 
         :param _close_socket: Whether to close the socket
         """
+        if self._heartbeat:
+            self._heartbeat.cancel()
         if _close_socket:
             self._socket.close()
             return
-        await self.send(bytearray(), OPCode.ConnectionClose)
+        await self.send(bytearray(), OPCode.ConnectionClose, flush=True)
 
     @staticmethod
-    def pack(data: bytearray, opcode: OPCode) -> Generator[bytearray, Any, Any]:
+    def pack(data: bytes | bytearray | memoryview, opcode: OPCode,
+             max_frame_size: int = 65535, compressed: bool = False
+             ) -> Generator[bytes | memoryview, Any, Any]:
         """
-        Generates a packet to be transmitted.
+        Generates the buffers of the packets to be transmitted.
+
+        Headers and payload are yielded as separate buffers and the payload
+        is only sliced through a memoryview, so it is never copied.
+        Payloads up to 65535 bytes use the 16-bit length form and larger ones
+        the 64-bit form. Data above max_frame_size is split into fragments.
 
         :param data: Data to send
         :param opcode: Data type
-        :return: Packet generator
-        """
-        fin = 128
-        if len(data) <= 125:
-            header = bytearray([fin | opcode, len(data)])
-            yield header + data
-        elif len(data) <= 65535:
-            header = bytearray([fin | opcode, 126, *pack("!H", len(data))])
-            yield header + data
-        else:
-            for index in range(0, len(data), 65535):
-                segment = data[index:index + 65535]
-                header = bytearray([
-                    opcode if index == 0 else OPCode.Continuation, 126,
-                    *pack("!H", len(segment))])
-                yield header + segment
-            yield bytearray([fin | OPCode.Continuation, 0])
+        :param max_frame_size: The maximum payload size of a frame
+        :param compressed: Whether to mark the data as compressed
+        :return: Buffer generator
+        """
+        data = memoryview(data).cast("B")
+        if len(data) <= max_frame_size:
+            yield XTCPHandle._header(True, opcode, len(data), compressed)
+            if data:
+                yield data
+            return
+        last = (len(data) - 1) // max_frame_size * max_frame_size
+        yield from XTCPHandle._fragment(data[:last], opcode, max_frame_size,
+                                        compressed)
+        yield XTCPHandle._header(True, OPCode.Continuation, len(data) - last)
+        yield data[last:]
+
+    def encode(self, data: bytes | bytearray | memoryview,
+               opcode: OPCode, compressed: bool = False
+               ) -> list[bytes | memoryview]:
+        """
+        Encodes data into the packets this Handle sends.
+
+        :param data: Data to send
+        :param opcode: Data type
+        :param compressed: Whether to mark the data as compressed
+        :return: Buffers of the packets
+        """
+        return [*self.pack(data, opcode, self._max_frame_size, compressed)]
+
+    @staticmethod
+    def _header(fin: bool, opcode: OPCode, size: int,
+                compressed: bool = False) -> bytes:
+        """
+        Encodes the header of a frame.
+
+        :param fin: Whether the frame is the last one of the message
+        :param opcode: Data type
+        :param size: Payload size
+        :param compressed: Whether to set RSV1 to mark compressed data
+        :return: Header
+        """
+        head = fin << 7 | compressed << 6 | opcode
+        if size <= 125:
+            return bytes((head, size))
+        if size <= 65535:
+            return pack("!BBH", head, 126, size)
+        return pack("!BBQ", head, 127, size)
+
+    @staticmethod
+    def _fragment(data: memoryview, opcode: OPCode, max_frame_size: int,
+                  compressed: bool = False
+                  ) -> Generator[bytes | memoryview, Any, Any]:
+        """
+        Generates the buffers of non-final frames carrying the data.
+
+        :param data: Data to send
+        :param opcode: Data type of the first frame
+        :param max_frame_size: The maximum payload size of a frame
+        :param compressed: Whether to mark the data as compressed
+        :return: Buffer generator
+        """
+        for index in range(0, len(data), max_frame_size):
+            segment = data[index:index + max_frame_size]
+            yield XTCPHandle._header(False, opcode, len(segment), compressed)
+            yield segment
+            opcode, compressed = OPCode.Continuation, False
 
     @staticmethod
     def unpack(packets: list[bytearray]) -> Generator[int, Any, Any]:
@@ -150,14 +398,18 @@ class XTCPHandle(IHandle):
             yield 2
             fin = packet[0] >> 7
             rsv = ((127 & packet[0]) >> 4) + (packet[1] >> 7)
+            if 15 & packet[0] not in _OPCODES:
+                raise InvalidOperationException()
             opcode = OPCode(15 & packet[0])
             size = 127 & packet[1]
-            extend = size == 126
             if rsv != 0:
                 raise InvalidOperationException()
-            if extend:
+            if size == 126:
                 yield 2
                 size = unpack("!H", packet[2:])[0]
+            elif size == 127:
+                yield 8
+                size = unpack("!Q", packet[2:])[0]
             else:
                 yield 0
             packet.clear()
@@ -166,40 +418,764 @@ class XTCPHandle(IHandle):
             if fin:
                 break
 
-    async def send(self, data: bytes | bytearray, opcode: OPCode):
+    async def send(self, data: bytes | bytearray | memoryview,
+                   opcode: OPCode, flush: bool = False):
         """
         Sends data to a connected Socket.
 
+        The frames of the message are queued for the writer task, which sends
+        them contiguously. The data must not be modified until it is flushed.
+        Waits for the queue to drain while it is above the high watermark.
+
+        Once compression is agreed, data messages from the threshold up are
+        compressed, large ones in the default executor. Compression and
+        queueing happen under a lock, so the peer inflates them in order.
+
         :param data: Data to send
         :param opcode: Operation Code
+        :param flush: Whether to wait until the data is written to the socket
+        """
+        if self._closed:
+            raise HandleClosedException()
+        if self._compressing and not opcode & 8 and \
+                len(data) >= self._deflate.options.threshold:
+            async with self._compress_lock:
+                waiter = self._enqueue(self.encode(
+                    await self._compress(data), opcode, True), flush)
+        else:
+            waiter = self._enqueue(self.encode(data, opcode), flush)
+        if waiter:
+            await waiter
+        elif self._outbound_size > self._high_water:
+            await self.drain()
+
+    async def _compress(self, data: bytes | bytearray | memoryview) -> bytes:
+        """
+        Compresses a message, in the default executor
+        from the executor threshold up.
+
+        :param data: Data to compress
+        :return: Compressed data
+        """
+        if len(data) < self._deflate.options.executor_threshold:
+            return self._deflate.compress(data)
+        return await self._event_loop.run_in_executor(
+            None, self._deflate.compress, data)
+
+    def ping(self):
+        """
+        Queues a ping carrying the time it was sent. The round trip time
+        is updated when the pong of the peer arrives. Pings are sent
+        between the frames of a stream being sent.
+        """
+        if self._closed:
+            raise HandleClosedException()
+        self._enqueue(self.encode(pack("!Q", perf_counter_ns()),
+                                  OPCode.Ping), False, True)
+
+    def _sample(self, sent: int):
+        """
+        Updates the round trip time with a pong,
+        smoothing it like the retransmission timer of TCP.
+
+        :param sent: perf_counter_ns time the ping was sent at
+        """
+        rtt = (perf_counter_ns() - sent) / 1e9
+        if self._rtt is None:
+            self._rtt, self._rtt_variance, self._min_rtt = rtt, rtt / 2, rtt
+        else:
+            self._rtt_variance += (abs(self._rtt - rtt) -
+                                   self._rtt_variance) / 4
+            self._rtt += (rtt - self._rtt) / 8
+            self._min_rtt = min(self._min_rtt, rtt)
+        if self._metrics is not None:
+            self._metrics.rtt.observe(rtt)
+
+    async def _watch(self):
+        """
+        Sends a ping every heartbeat interval and aborts the connection
+        once the socket has been read for the idle timeout
+        without receiving anything.
+        """
+        interval = self._options.heartbeat_interval
+        timeout = self._options.idle_timeout
+        period = min(interval or timeout, timeout / 2 if timeout else interval)
+        next_ping = self._event_loop.time()
+        while not self._closed:
+            await sleep(period)
+            now = self._event_loop.time()
+            if timeout and self._reading_since is not None and \
+                    now - self._reading_since >= timeout:
+                self._timed_out = True
+                self.abort()
+                return
+            if interval and now >= next_ping and not self._write_error:
+                next_ping = now + interval
+                self.ping()
+
+    def write_packets(self, packets: Sequence[bytes | memoryview]):
+        """
+        Queues packets generated by pack without waiting.
+        The same packets may be queued on many handles.
+
+        :param packets: Buffers of the packets to send
+        """
+        if self._closed:
+            raise HandleClosedException()
+        self._enqueue(packets, False)
+
+    async def send_stream(self, source: AsyncIterable[bytes | bytearray] |
+                          Iterable[bytes | bytearray] | BinaryIO,
+                          opcode: OPCode, chunk_size: int = 65535,
+                          flush: bool = False):
+        """
+        Sends a message whose data is read from an iterator or a file object
+        and framed chunk by chunk. Other messages sent meanwhile are held
+        back until the stream ends, so the frames are never interleaved.
+
+        :param source: Iterator of chunks or binary file object
+        :param opcode: Operation Code
+        :param chunk_size: The number of bytes to read from a file at once
+        :param flush: Whether to wait until the data is written to the socket
         """
         if self._closed:
             raise HandleClosedException()
-        for packet in self.pack(bytearray(data), opcode):
-            await self._socket.send(packet)
+        async with self._stream_lock:
+            self._streaming = True
+            try:
+                async for chunk in self._chunks(source, chunk_size):
+                    if not chunk:
+                        continue
+                    self._enqueue([*self._fragment(
+                        memoryview(chunk).cast("B"), opcode,
+                        self._max_frame_size)], False, stream=True)
+                    opcode = OPCode.Continuation
+                    if self._outbound_size > self._high_water:
+                        await self.drain()
+                waiter = self._enqueue(
+                    [self._header(True, opcode, 0)], flush, stream=True)
+            finally:
+                self._streaming = False
+                self._release()
+        if waiter:
+            await waiter
 
-    async def receive(self) -> bytearray:
+    async def send_file(self, file: str | PathLike | int | BinaryIO,
+                        offset: int = 0, count: int | None = None,
+                        opcode: OPCode = OPCode.Data):
+        """
+        Sends a part of a file as one message. The frame headers are written
+        by the Handle and the file data is sent with sendfile, so it never
+        enters Python memory. Waits until the file is written.
+
+        The message is always fragmented, so a streaming receiver
+        gets it as a MessageStream.
+
+        :param file: Path, file descriptor or binary file object
+        :param offset: Offset of the first byte to send
+        :param count: The number of bytes to send, defaults to the rest
+        :param opcode: Operation Code
+        """
+        if self._closed:
+            raise HandleClosedException()
+        if isinstance(file, int):
+            file = open(file, "rb", closefd=False)
+        elif not hasattr(file, "read"):
+            file = open(file, "rb")
+        else:
+            file = nullcontext(file)
+        with file as source:
+            if count is None:
+                count = fstat(source.fileno()).st_size - offset
+            if offset < 0 or count < 0:
+                raise InvalidParameterException(
+                    "The offset and count must not be negative.")
+            packets = []
+            for index in range(0, count, self._max_frame_size):
+                size = min(self._max_frame_size, count - index)
+                packets.append(self._header(False, opcode, size))
+                packets.append(_FileRegion(source, offset + index, size))
+                opcode = OPCode.Continuation
+            packets.append(self._header(True, opcode, 0))
+            await self._enqueue(packets, True)
+            if self._metrics is not None:
+                self._metrics.bytes_sent.inc(count)
+
+    async def _chunks(self, source: AsyncIterable[bytes | bytearray] |
+                      Iterable[bytes | bytearray] | BinaryIO,
+                      chunk_size: int) -> AsyncIterator[bytes | bytearray]:
+        """
+        Iterates the chunks of a stream source.
+
+        :param source: Iterator of chunks or binary file object
+        :param chunk_size: The number of bytes to read from a file at once
+        :return: Chunk iterator
+        """
+        if hasattr(source, "read"):
+            while chunk := await self._event_loop.run_in_executor(
+                    None, source.read, chunk_size):
+                yield chunk
+        elif hasattr(source, "__aiter__"):
+            async for chunk in source:
+                yield chunk
+        else:
+            for chunk in source:
+                yield chunk
+
+    def _enqueue(self, packets: Sequence[bytes | memoryview],
+                 flush: bool, stream: bool = False) -> Future | None:
+        """
+        Queues the buffers of a message and starts the writer task.
+        While a stream is being sent, other messages are held back.
+
+        :param packets: Buffers of the message
+        :param flush: Whether to return a future resolved once written
+        :param stream: Whether the buffers belong to the stream being sent
+        :return: Future or None
+        """
+        if self._write_error:
+            raise self._write_error
+        size = sum(len(packet) for packet in packets
+                   if not isinstance(packet, _FileRegion))
+        waiter = self._event_loop.create_future() if flush else None
+        held = self._streaming and not stream
+        if held:
+            self._held_size += size
+        else:
+            self._outbound_size += size
+        if self._metrics is not None:
+            self._metrics.frames_sent.inc(sum(
+                isinstance(packet, bytes) for packet in packets))
+            self._metrics.write_buffer.observe(
+                self._outbound_size + self._held_size)
+        if held:
+            self._held.append((packets, size, waiter))
+            return waiter
+        self._outbound.append((packets, size, waiter))
+        if self._writer is None:
+            self._writer = self._event_loop.create_task(self._write())
+        return waiter
+
+    def _release(self):
+        """
+        Queues the messages held back while a stream was being sent.
+        Their size only counts towards the watermarks from now on,
+        since they could not be written before.
+        """
+        if not self._held:
+            return
+        self._outbound.extend(self._held)
+        self._outbound_size += self._held_size
+        self._held.clear()
+        self._held_size = 0
+        if self._writer is None:
+            self._writer = self._event_loop.create_task(self._write())
+
+    async def _write(self):
+        """
+        Writes queued messages, merging everything queued into one write.
+        """
+        try:
+            while self._outbound:
+                buffers, waiters, size = [], [], 0
+                while self._outbound and size < _WRITE_BATCH_SIZE:
+                    packets, length, waiter = self._outbound.popleft()
+                    buffers += packets
+                    size += length
+                    if waiter:
+                        waiters.append(waiter)
+                try:
+                    if self._tracer is None:
+                        await self._send(buffers)
+                    else:
+                        with self._tracer.span(
+                                "xsocket.socket.send", self._connection_id,
+                                {"bytes": size}):
+                            await self._send(buffers)
+                except Exception as e:
+                    self._fail(e, waiters)
+                    return
+                self._outbound_size -= size
+                if self._metrics is not None:
+                    self._metrics.bytes_sent.inc(size)
+                if self._outbound_size <= self._low_water:
+                    waiters += self._drain_waiters
+                    self._drain_waiters = []
+                for waiter in waiters:
+                    if not waiter.done():
+                        waiter.set_result(None)
+        finally:
+            self._writer = None
+
+    async def _send(self, buffers: list[bytes | memoryview | _FileRegion]):
+        """
+        Writes buffers with vectored I/O and file regions with sendfile.
+        A file shorter than its region closes the socket, since the frame
+        header already declared the size.
+
+        :param buffers: Buffers and file regions to write
+        """
+        start = 0
+        for index, buffer in enumerate(buffers):
+            if isinstance(buffer, _FileRegion):
+                if start < index:
+                    await self._socket.send_vectored(buffers[start:index])
+                try:
+                    await self._socket.send_file(
+                        buffer.file, buffer.offset, buffer.count)
+                except EOFError:
+                    self._socket.close()
+                    raise
+                start = index + 1
+        if start < len(buffers):
+            await self._socket.send_vectored(buffers[start:])
+
+    def _fail(self, error: Exception, waiters: list[Future] | None = None):
+        """
+        Discards queued data and fails everything waiting for the writer.
+
+        :param error: Error to raise from the waiters
+        :param waiters: Waiters of the data being written
+        """
+        self._write_error = error
+        waiters = (waiters or []) + self._drain_waiters + [
+            waiter for _, _, waiter in [*self._outbound, *self._held]
+            if waiter]
+        self._outbound.clear()
+        self._held.clear()
+        self._outbound_size = 0
+        self._held_size = 0
+        self._drain_waiters = []
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_exception(error)
+
+    def get_write_buffer_size(self) -> int:
+        """
+        Gets the number of bytes queued and not yet written,
+        including messages held back while a stream is being sent.
+
+        :return: Size of the write buffer
+        """
+        return self._outbound_size + self._held_size
+
+    def get_write_buffer_limits(self) -> tuple[int, int]:
+        """
+        Gets the high and low watermarks of the write buffer.
+
+        :return: High watermark, Low watermark
+        """
+        return self._high_water, self._low_water
+
+    def set_write_buffer_limits(self, high: int | None = None,
+                                low: int | None = None):
+        """
+        Sets the high and low watermarks of the write buffer.
+        send waits above the high watermark until the buffer
+        drains to the low watermark.
+
+        :param high: High watermark, defaults to 1 MiB
+        :param low: Low watermark, defaults to a quarter of high
+        """
+        if high is None:
+            high = 1048576 if low is None else low * 4
+        if low is None:
+            low = high // 4
+        if not 0 <= low <= high:
+            raise InvalidParameterException(
+                "The watermarks must satisfy 0 <= low <= high.")
+        self._high_water = high
+        self._low_water = low
+
+    async def drain(self):
+        """
+        Waits until the write buffer drains to the low watermark
+        if it is above the high watermark. Messages held back while
+        a stream is being sent are not counted, as they cannot drain
+        before the stream ends.
+        """
+        if self._write_error:
+            raise self._write_error
+        if self._outbound_size <= self._high_water:
+            return
+        waiter = self._event_loop.create_future()
+        self._drain_waiters.append(waiter)
+        await waiter
+
+    async def receive(self, stream: bool = False
+                      ) -> bytearray | MessageStream:
         """
         Receives data from a bound Socket.
 
-        :return: Received data
+        Reads ahead as many bytes as are available and decodes every complete
+        frame in the buffer, so a burst of messages costs a few reads.
+        The data type of the message is left in the opcode property.
+
+        :param stream: Whether to return a fragmented data message
+                       as a stream
+        :return: Received data or MessageStream
         """
         if self._closed:
             raise HandleClosedException()
-        opcode = None
-        temp = [bytearray()]
-        counter = 0
-        for packet in self.unpack(temp):
-            counter += 1
-            if counter % 4 != 0:
-                temp[-1] += await self._socket.receive(packet, exactly=True)
-                continue
-            if opcode is None:
-                opcode = packet
-            if opcode == OPCode.ConnectionClose or self._closed:
-                await self._close(True)
-                raise ConnectionAbortedException()
-            elif opcode == OPCode.Continuation:
+        if self._stream and not self._stream.finished:
+            await self._stream.discard()
+        fin, opcode, compressed, data = await self._frame()
+        if opcode == OPCode.Continuation:
+            raise InvalidOperationException()
+        self._opcode = opcode
+        if fin:
+            return self._decompress(data) if compressed else data
+        if stream and opcode == OPCode.Data:
+            if compressed:
+                self._stream = MessageStream(
+                    self._inflated, self._decompress(data))
+            else:
+                self._stream = MessageStream(self._continuation, data)
+            return self._stream
+        fragments, size = [data], len(data)
+        while not fin:
+            fin, data = await self._continuation()
+            fragments.append(data)
+            size += len(data)
+            if size > self._max_receive_size:
+                raise self._protocol_error("The message is too large.")
+        data = bytearray().join(fragments)
+        return self._decompress(data) if compressed else data
+
+    def receive_nowait(self, stream: bool = False) -> bytearray | None:
+        """
+        Receives a message only if all of its frames are already decoded,
+        without reading from the socket.
+
+        :param stream: Whether fragmented data messages are left
+                       to receive, which returns them as streams
+        :return: Received data or None
+        """
+        if self._closed:
+            raise HandleClosedException()
+        if self._stream and not self._stream.finished or \
+                not any(frame[0] for frame in self._frames) or \
+                stream and not self._frames[0][0] and \
+                self._frames[0][1] == OPCode.Data:
+            return None
+        fin, opcode, compressed, start, end = self._frames.popleft()
+        if opcode == OPCode.Continuation:
+            raise InvalidOperationException()
+        self._opcode = opcode
+        fragments, size = [self._buffer[start:end]], end - start
+        while not fin:
+            fin, opcode, _, start, end = self._frames.popleft()
+            if opcode != OPCode.Continuation:
                 raise InvalidOperationException()
-            temp.append(bytearray())
-        return bytearray(b"".join(temp))
+            fragments.append(self._buffer[start:end])
+            size += end - start
+            if size > self._max_receive_size:
+                raise self._protocol_error("The message is too large.")
+        data = fragments[0] if len(fragments) == 1 else \
+            bytearray().join(fragments)
+        return self._decompress(data) if compressed else data
+
+    async def receive_into(self, buffer: bytearray | memoryview) -> int:
+        """
+        Receives the data of a message into a caller-owned buffer.
+
+        Buffered data is copied once into the buffer and the rest of a large
+        frame is read from the socket directly into it. If the message does
+        not fit, it is discarded and InvalidParameterException is raised.
+        With compression enabled, messages are received and then copied,
+        since every message has to pass through the decompressor.
+
+        :param buffer: Writable buffer
+        :return: The number of bytes received
+        """
+        if self._closed:
+            raise HandleClosedException()
+        view = memoryview(buffer).cast("B")
+        if self._deflate:
+            data = await self.receive()
+            if len(data) > len(view):
+                raise InvalidParameterException(
+                    "The buffer is too small for the message.")
+            view[:len(data)] = data
+            return len(data)
+        if self._stream and not self._stream.finished:
+            await self._stream.discard()
+        written = 0
+        fin, opcode, size = await self._frame_into(view)
+        if opcode == OPCode.Continuation:
+            raise InvalidOperationException()
+        self._opcode = opcode
+        while size is not None:
+            written += size
+            if fin:
+                return written
+            fin, opcode, size = await self._frame_into(view[written:])
+            if opcode != OPCode.Continuation:
+                raise InvalidOperationException()
+        while not fin:
+            fin, _ = await self._continuation()
+        raise InvalidParameterException(
+            "The buffer is too small for the message.")
+
+    async def wait_message(self):
+        """
+        Reads from the socket until a message arrives, without receiving it.
+        Control frames are handled meanwhile, so a connection nobody receives
+        from notices when the peer closes it. Cancelling it loses no data.
+        """
+        if self._closed:
+            raise HandleClosedException()
+        while not self._frames:
+            await self._fill()
+
+    async def _continuation(self) -> tuple[bool, bytearray]:
+        """
+        Receives the next frame of a fragmented message.
+
+        :return: Whether the frame is the last one, Data
+        """
+        fin, opcode, _, data = await self._frame()
+        if opcode != OPCode.Continuation:
+            raise InvalidOperationException()
+        return fin, data
+
+    async def _inflated(self) -> tuple[bool, bytearray]:
+        """
+        Receives and decompresses the next frame of a compressed message.
+
+        :return: Whether the frame is the last one, Data
+        """
+        fin, data = await self._continuation()
+        return fin, self._decompress(data)
+
+    def _decompress(self, data: bytearray) -> bytearray:
+        """
+        Decompresses a message or the next frame of a message stream,
+        aborting the connection if the result exceeds the maximum
+        receive size.
+
+        :param data: Compressed data
+        :return: Decompressed data
+        """
+        data = self._deflate.decompress(data, self._max_receive_size + 1)
+        if len(data) > self._max_receive_size:
+            raise self._protocol_error("The message is too large.")
+        return data
+
+    async def _frame(self) -> tuple[bool, OPCode, bool, bytearray]:
+        """
+        Receives the next frame, reading ahead if none is buffered.
+
+        :return: Whether the frame is the last one, Data type,
+                 Whether the message is compressed, Data
+        """
+        while not self._frames:
+            await self._fill()
+        fin, opcode, compressed, start, end = self._frames.popleft()
+        return fin, opcode, compressed, self._buffer[start:end]
+
+    async def _frame_into(self, target: memoryview
+                          ) -> tuple[bool, OPCode, int | None]:
+        """
+        Receives the next frame into the target.
+        A data frame that is not fully buffered yet
+        is read from the socket directly into the target.
+
+        :param target: Writable buffer
+        :return: Whether the frame is the last one, Data type,
+                 Size or None if the frame did not fit and was discarded
+        """
+        while not self._frames:
+            if self._remote_closed or self._closed:
+                await self._abandon()
+            header = self._peek(self._start)
+            if header and not header[0] & 8 and \
+                    self._end - header[1] < header[2] <= len(target):
+                head, start, size = header
+                received = self._end - start
+                target[:received] = memoryview(self._buffer)[start:self._end]
+                self._start = self._end
+                self._missing = 0
+                if self._tracer is None:
+                    await self._receive_exactly(target, received, size)
+                else:
+                    with self._tracer.span("xsocket.socket.receive",
+                                           self._connection_id):
+                        await self._receive_exactly(target, received, size)
+                if self._metrics is not None:
+                    self._metrics.frames_received.inc()
+                    self._metrics.bytes_received.inc(
+                        size - (self._end - start))
+                return bool(head & 128), OPCode(15 & head), size
+            await self._fill()
+        fin, opcode, _, start, end = self._frames.popleft()
+        if end - start > len(target):
+            return fin, opcode, None
+        target[:end - start] = memoryview(self._buffer)[start:end]
+        return fin, opcode, end - start
+
+    async def _receive_exactly(self, target: memoryview, received: int,
+                               size: int):
+        """
+        Reads the rest of a frame from the socket directly into the target.
+
+        :param target: Writable buffer holding the first bytes of the frame
+        :param received: The number of bytes already in the target
+        :param size: Size of the frame
+        """
+        while received < size:
+            self._reading_since = self._event_loop.time()
+            try:
+                length = await self._socket.receive_into(
+                    target[received:size])
+            finally:
+                self._reading_since = None
+            if not length:
+                await self._abandon()
+            received += length
+
+    async def _fill(self):
+        """
+        Reads ahead into the pooled receive buffer and decodes the frames.
+        Must only be called when no decoded frame is queued. The buffer
+        grows with the bytes received rather than with the declared size
+        of a frame, so it at most doubles per read.
+        """
+        if self._remote_closed or self._closed:
+            await self._abandon()
+        buffer = self._buffer
+        length = self._end - self._start
+        if len(buffer) - self._end < max(self._missing, len(buffer) >> 2, 1):
+            capacity = max(self._receive_size,
+                           min(length + self._missing, length << 1))
+            if capacity > len(buffer) or \
+                    not length and len(buffer) > self._receive_size << 1:
+                self._buffer = self._pool.acquire(capacity)
+                self._buffer[:length] = buffer[self._start:self._end]
+                self._pool.release(buffer)
+            else:
+                buffer[:length] = buffer[self._start:self._end]
+            self._start, self._end = 0, length
+        self._reading_since = self._event_loop.time()
+        try:
+            if self._tracer is None:
+                received = await self._socket.receive_into(
+                    memoryview(self._buffer)[self._end:])
+            else:
+                with self._tracer.span("xsocket.socket.receive",
+                                       self._connection_id):
+                    received = await self._socket.receive_into(
+                        memoryview(self._buffer)[self._end:])
+        finally:
+            self._reading_since = None
+        if not received:
+            await self._abandon()
+        self._end += received
+        if self._metrics is not None:
+            self._metrics.bytes_received.inc(received)
+        if self._tracer is None:
+            self._parse()
+        else:
+            with self._tracer.span("xsocket.frame.decode",
+                                   self._connection_id, {"bytes": received}):
+                self._parse()
+
+    async def _abandon(self):
+        """
+        Closes the socket after the connection ended
+        and returns the receive buffer to the pool.
+        """
+        await self._close(True)
+        self._frames.clear()
+        self._pool.release(self._buffer)
+        self._buffer = bytearray()
+        self._start = self._end = 0
+        raise ConnectionAbortedException()
+
+    def _peek(self, offset: int) -> tuple[int, int, int] | None:
+        """
+        Decodes the header of the frame at the offset of the receive buffer.
+        RSV1 is only accepted on the first frame of a data message
+        when compression is enabled.
+
+        :param offset: Offset of the frame
+        :return: First byte, Offset of the payload, Payload size
+                 or None if the header is incomplete
+        """
+        buffer, end = self._buffer, self._end
+        if end - offset < 2:
+            return None
+        head, size = buffer[offset], buffer[offset + 1]
+        start = offset + 2
+        if size == 126:
+            if end - start < 2:
+                return None
+            size = unpack_from("!H", buffer, start)[0]
+            start += 2
+        elif size == 127:
+            if end - start < 8:
+                return None
+            size = unpack_from("!Q", buffer, start)[0]
+            start += 8
+        elif size > 127:
+            raise self._protocol_error("Masked frames are not supported.")
+        if head & 15 not in _OPCODES:
+            raise self._protocol_error("Unknown opcode.")
+        if head & 112 and (head & 112 != 64 or not self._deflate or
+                           not head & 15 or head & 8):
+            raise self._protocol_error("Unexpected reserved bits.")
+        if size > self._max_receive_size:
+            raise self._protocol_error("The frame is too large.")
+        return head, start, size
+
+    def _protocol_error(self, message: str) -> ProtocolException:
+        """
+        Aborts the connection because the peer broke the protocol.
+
+        :param message: Description of the violation
+        :return: ProtocolException to raise
+        """
+        self.abort()
+        return ProtocolException(message)
+
+    def _parse(self):
+        """
+        Decodes every complete frame in the receive buffer.
+        """
+        offset = self._start
+        self._missing = 0
+        while header := self._peek(offset):
+            head, start, size = header
+            if self._end - start < size:
+                self._missing = size - (self._end - start)
+                break
+            opcode = OPCode(15 & head)
+            offset = start + size
+            if self._metrics is not None:
+                self._metrics.frames_received.inc()
+            if opcode == OPCode.ConnectionClose:
+                self._remote_closed = True
+                break
+            if opcode == OPCode.Ping:
+                if not self._closed and not self._write_error:
+                    self._enqueue(self.encode(self._buffer[start:offset],
+                                              OPCode.Pong), False, True)
+                continue
+            if opcode == OPCode.Pong:
+                if size == 8:
+                    self._sample(unpack_from("!Q", self._buffer, start)[0])
+                continue
+            if opcode == OPCode.Extension:
+                if self._deflate and not self._compressing and \
+                        self._buffer[start:offset] == b"deflate":
+                    if not self._offered:
+                        if self._closed or self._write_error:
+                            continue
+                        self._enqueue(self.encode(b"deflate",
+                                                  OPCode.Extension),
+                                      False, True)
+                    self._compressing = True
+                continue
+            self._frames.append((bool(head & 128), opcode, bool(head & 64),
+                                 start, offset))
+        self._start = offset
@@ -1,34 +1,63 @@
-from asyncio import AbstractEventLoop, get_running_loop
+from asyncio import AbstractEventLoop, Queue, Task, get_running_loop
 from select import select
 from socket import SOCK_STREAM, SOL_SOCKET, SO_LINGER, SO_REUSEADDR, socket
 from struct import pack
 from XSocket.core.listener import IListener
 from XSocket.core.net import AddressFamily
-from XSocket.exception import ListenerClosedException
+from XSocket.exception import (InvalidOperationException,
+                               InvalidParameterException,
+                               ListenerClosedException)
 from XSocket.protocol.protocol import ProtocolType
 from XSocket.protocol.inet.net import IPAddressInfo
 from XSocket.protocol.inet.xtcp.handle import XTCPHandle
+from XSocket.protocol.inet.xtcp.options import XTCPOptions
 from XSocket.protocol.inet.xtcp.socket import XTCPSocket
+from XSocket.protocol.inet.xtcp.transport import (XTCPProtocol,
+                                                  XTCPTransportSocket)
 
 __all__ = [
-    "XTCPListener"
+    "XTCPListener",
+    "XTCPTransportListener"
 ]
 
+try:
+    from socket import SO_REUSEPORT
+except ImportError:
+    SO_REUSEPORT = None
+
 
 class XTCPListener(IListener):
     """
     Listens for connections from TCP network clients.
     """
 
-    def __init__(self, address: IPAddressInfo | tuple[str, int]):
+    def __init__(self, address: IPAddressInfo | tuple[str, int],
+                 options: XTCPOptions | None = None,
+                 reuse_port: bool = False, backlog: int | None = None):
         """
         Listens for connections from TCP network clients.
 
         :param address: Local address
+        :param options: Settings of the created handles
+        :param reuse_port: Whether to bind with SO_REUSEPORT, so listeners
+                           of several processes share the address and
+                           the kernel spreads the connections over them
+        :param backlog: The number of connections the kernel queues
+                        before they are accepted, capped by somaxconn,
+                        defaults to the default of listen
         """
         if isinstance(address, tuple):
             address = IPAddressInfo(address[0], address[1])
+        if reuse_port and SO_REUSEPORT is None:
+            raise InvalidOperationException(
+                "SO_REUSEPORT is not supported on this platform.")
+        if backlog is not None and backlog < 0:
+            raise InvalidParameterException(
+                "The backlog must not be negative.")
         self._address: IPAddressInfo = address
+        self._options: XTCPOptions | None = options
+        self._reuse_port: bool = reuse_port
+        self._backlog: int | None = backlog
         self._socket: socket | None = None
         self._event_loop: AbstractEventLoop | None = None
         self._running: bool = False
@@ -54,6 +83,25 @@ class XTCPListener(IListener):
         """
         return self._closed
 
+    @property
+    def reuse_port(self) -> bool:
+        """
+        Gets a value indicating whether the Listener binds with SO_REUSEPORT.
+
+        :return: bool
+        """
+        return self._reuse_port
+
+    @property
+    def backlog(self) -> int | None:
+        """
+        Gets the number of connections the kernel queues
+        before they are accepted.
+
+        :return: int or None for the default of listen
+        """
+        return self._backlog
+
     @property
     def pending(self) -> bool:
         """
@@ -102,11 +150,22 @@ class XTCPListener(IListener):
         self._socket = socket(self.address_family, SOCK_STREAM)
         self._socket.setsockopt(SOL_SOCKET, SO_LINGER, pack("ii", 1, 0))
         self._socket.setsockopt(SOL_SOCKET, SO_REUSEADDR, 1)
+        if self._reuse_port:
+            self._socket.setsockopt(SOL_SOCKET, SO_REUSEPORT, 1)
         self._socket.setblocking(False)
         self._socket.bind((*self._address,))
-        self._socket.listen()
+        self._listen()
         self._running = True
 
+    def _listen(self):
+        """
+        Starts listening on the bound socket with the backlog.
+        """
+        if self._backlog is None:
+            self._socket.listen()
+        else:
+            self._socket.listen(self._backlog)
+
     def close(self):
         """
         Closes the listener.
@@ -124,7 +183,7 @@ class XTCPListener(IListener):
 
         :return: XTCPHandle
         """
-        return await XTCPHandle.create(self._address)
+        return await XTCPHandle.create(self._address, self._options)
 
     async def accept(self) -> XTCPHandle:
         """
@@ -132,8 +191,211 @@ class XTCPListener(IListener):
 
         :return: XTCPHandle
         """
+        return await self.adopt(await self.accept_socket())
+
+    async def accept_many(self, limit: int) -> list[XTCPHandle]:
+        """
+        Waits for a connection and creates XTCPHandles for it and
+        for every other connection already pending, up to the limit.
+        If a socket cannot be adopted, it and the rest are closed and
+        the handles created so far are returned, or the error is raised
+        if there are none.
+
+        :param limit: The maximum number of connections
+        :return: list[XTCPHandle]
+        """
+        sockets = await self.accept_sockets(limit)
+        handles = []
+        try:
+            for sock in sockets:
+                handles.append(await self.adopt(sock))
+        except BaseException as e:
+            for sock in sockets[len(handles):]:
+                sock.close()
+            if handles and isinstance(e, Exception):
+                return handles
+            for handle in handles:
+                handle.abort()
+            raise
+        return handles
+
+    async def accept_socket(self) -> socket:
+        """
+        Accepts a connection without creating a Handle,
+        so it can be handed off to another event loop.
+
+        :return: Low-level socket
+        """
         if not self._running or self._closed:
             raise ListenerClosedException()
         sock, addr = await self._event_loop.sock_accept(self._socket)
         sock.setblocking(False)
-        return XTCPHandle(XTCPSocket(sock))
+        return sock
+
+    async def accept_sockets(self, limit: int) -> list[socket]:
+        """
+        Waits for a connection and accepts it and every other connection
+        already pending, up to the limit, without creating Handles.
+        A burst of connections then costs one wakeup of the loop.
+        Errors like EMFILE are raised after closing the sockets
+        accepted so far, so running out of descriptors is not hidden.
+
+        :param limit: The maximum number of connections
+        :return: list of low-level sockets
+        """
+        sockets = [await self.accept_socket()]
+        while len(sockets) < limit:
+            try:
+                sock, addr = self._socket.accept()
+            except (BlockingIOError, InterruptedError):
+                break
+            except ConnectionAbortedError:
+                continue
+            except BaseException:
+                for accepted in sockets:
+                    accepted.close()
+                raise
+            sock.setblocking(False)
+            sockets.append(sock)
+        return sockets
+
+    async def adopt(self, sock: socket) -> XTCPHandle:
+        """
+        Creates a new XTCPHandle on the running event loop
+        for a socket returned by accept_socket.
+
+        :param sock: Low-level socket
+        :return: XTCPHandle
+        """
+        return XTCPHandle(XTCPSocket(sock), self._options)
+
+
+class XTCPTransportListener(XTCPListener):
+    """
+    Listens for connections from TCP network clients
+    using asyncio transports and protocols.
+    """
+
+    def __init__(self, address: IPAddressInfo | tuple[str, int],
+                 options: XTCPOptions | None = None,
+                 reuse_port: bool = False, backlog: int | None = None):
+        """
+        Listens for connections from TCP network clients
+        using asyncio transports and protocols.
+
+        :param address: Local address
+        :param options: Settings of the created handles
+        :param reuse_port: Whether to bind with SO_REUSEPORT
+        :param backlog: The number of connections the kernel queues
+                        before they are accepted
+        """
+        super().__init__(address, options, reuse_port, backlog)
+        self._server: Task | None = None
+        self._accepted: Queue[XTCPHandle] = Queue()
+
+    @property
+    def pending(self) -> bool:
+        """
+        Determines if there are pending connection requests.
+
+        :return: bool
+        """
+        if not self._running or self._closed:
+            raise ListenerClosedException()
+        if not self._server:
+            return super().pending
+        return not self._accepted.empty()
+
+    def close(self):
+        """
+        Closes the listener.
+        """
+        if not self._running or self._closed:
+            return
+        server = self._server
+        if server and not server.done():
+            server.cancel()
+        elif server and not server.cancelled() and not server.exception():
+            server.result().close()
+        super().close()
+
+    def _connected(self, protocol: XTCPProtocol):
+        transport = protocol.transport
+        transport.get_extra_info("socket").setsockopt(
+            SOL_SOCKET, SO_LINGER, pack("ii", 1, 0))
+        self._accepted.put_nowait(
+            XTCPHandle(XTCPTransportSocket(transport, protocol),
+                       self._options))
+
+    async def connect(self) -> XTCPHandle:
+        """
+        Establishes a connection to a remote host.
+
+        :return: XTCPHandle
+        """
+        return XTCPHandle(await XTCPTransportSocket.create(self._address),
+                          self._options, True)
+
+    async def accept(self) -> XTCPHandle:
+        """
+        Creates a new XTCPHandle for a newly created connection.
+        The first call starts serving the socket with transports,
+        after which accept_socket must not be used.
+
+        :return: XTCPHandle
+        """
+        if not self._running or self._closed:
+            raise ListenerClosedException()
+        await self._serve()
+        return await self._accepted.get()
+
+    async def accept_many(self, limit: int) -> list[XTCPHandle]:
+        """
+        Waits for a connection and returns its XTCPHandle with those of
+        every other connection already accepted, up to the limit.
+        The first call starts serving the socket with transports,
+        after which accept_socket must not be used.
+
+        :param limit: The maximum number of connections
+        :return: list[XTCPHandle]
+        """
+        if not self._running or self._closed:
+            raise ListenerClosedException()
+        await self._serve()
+        handles = [await self._accepted.get()]
+        while len(handles) < limit and not self._accepted.empty():
+            handles.append(self._accepted.get_nowait())
+        return handles
+
+    async def _serve(self):
+        """
+        Starts serving the socket with transports on the first call.
+        """
+        if not self._server:
+            backlog = {} if self._backlog is None else \
+                {"backlog": self._backlog}
+            self._server = self._event_loop.create_task(
+                self._event_loop.create_server(
+                    lambda: XTCPProtocol(self._connected),
+                    sock=self._socket, **backlog))
+        await self._server
+
+    async def adopt(self, sock: socket) -> XTCPHandle:
+        """
+        Creates a new XTCPHandle on the running event loop
+        for a socket returned by accept_socket.
+        The socket is closed if the transport cannot be created.
+
+        :param sock: Low-level socket
+        :return: XTCPHandle
+        """
+        try:
+            sock.setsockopt(SOL_SOCKET, SO_LINGER, pack("ii", 1, 0))
+            transport, protocol = \
+                await get_running_loop().connect_accepted_socket(
+                    XTCPProtocol, sock)
+        except BaseException:
+            sock.close()
+            raise
+        return XTCPHandle(XTCPTransportSocket(transport, protocol),
+                          self._options)
@@ -0,0 +1,135 @@
+from XSocket.buffer import BufferPool, get_buffer_pool
+from XSocket.compression import DeflateOptions
+from XSocket.exception import InvalidParameterException
+
+__all__ = [
+    "XTCPOptions"
+]
+
+
+class XTCPOptions:
+    """
+    Specifies the settings of XTCP handles.
+    """
+
+    def __init__(self, receive_size: int = 65536,
+                 max_frame_size: int = 65535,
+                 max_receive_size: int = 67108864,
+                 buffer_pool: BufferPool | None = None,
+                 compression: DeflateOptions | None = None,
+                 heartbeat_interval: float | None = None,
+                 idle_timeout: float | None = None):
+        """
+        Specifies the settings of XTCP handles.
+
+        :param receive_size: The number of bytes to read ahead at once
+        :param max_frame_size: The maximum payload size of a sent frame,
+                               peers older than the 64-bit length form
+                               only understand up to 65535
+        :param max_receive_size: The maximum size of a received frame and
+                                 of a received message once assembled or
+                                 decompressed. Larger ones abort the
+                                 connection; streams are only limited
+                                 per frame
+        :param buffer_pool: Pool of the receive buffers,
+                            defaults to the shared pool
+        :param compression: Settings of the per-message deflate extension,
+                            which the connecting peer offers and uses
+                            once the accepting peer, if configured for
+                            it too, answers the offer. The accepting
+                            peer must understand the Extension opcode
+        :param heartbeat_interval: Seconds between pings, which measure
+                                   the round trip time. Both peers must
+                                   understand the Ping and Pong opcodes
+        :param idle_timeout: Seconds the socket may be read without
+                             receiving anything before the connection
+                             is aborted, which should be a few heartbeat
+                             intervals and longer than any handler
+        """
+        if receive_size < 1:
+            raise InvalidParameterException(
+                "The receive size must be positive.")
+        if not 1 <= max_frame_size <= 0x7FFFFFFFFFFFFFFF:
+            raise InvalidParameterException(
+                "The maximum frame size must be between 1 and 2^63 - 1.")
+        if max_receive_size < 1:
+            raise InvalidParameterException(
+                "The maximum receive size must be positive.")
+        if heartbeat_interval is not None and heartbeat_interval <= 0 or \
+                idle_timeout is not None and idle_timeout <= 0:
+            raise InvalidParameterException(
+                "The heartbeat interval and the idle timeout "
+                "must be positive.")
+        self._receive_size: int = receive_size
+        self._max_frame_size: int = max_frame_size
+        self._max_receive_size: int = max_receive_size
+        self._buffer_pool: BufferPool = buffer_pool or get_buffer_pool()
+        self._compression: DeflateOptions | None = compression
+        self._heartbeat_interval: float | None = heartbeat_interval
+        self._idle_timeout: float | None = idle_timeout
+
+    @property
+    def receive_size(self) -> int:
+        """
+        Gets the number of bytes to read ahead at once.
+
+        :return: int
+        """
+        return self._receive_size
+
+    @property
+    def max_frame_size(self) -> int:
+        """
+        Gets the maximum payload size of a sent frame.
+        Larger messages are split into continuation frames.
+
+        :return: int
+        """
+        return self._max_frame_size
+
+    @property
+    def max_receive_size(self) -> int:
+        """
+        Gets the maximum size of a received frame and of a received
+        message once assembled or decompressed.
+
+        :return: int
+        """
+        return self._max_receive_size
+
+    @property
+    def buffer_pool(self) -> BufferPool:
+        """
+        Gets the pool of the receive buffers.
+
+        :return: BufferPool
+        """
+        return self._buffer_pool
+
+    @property
+    def compression(self) -> DeflateOptions | None:
+        """
+        Gets the settings of the per-message deflate extension.
+
+        :return: DeflateOptions or None if compression is disabled
+        """
+        return self._compression
+
+    @property
+    def heartbeat_interval(self) -> float | None:
+        """
+        Gets the seconds between pings.
+
+        :return: float or None if heartbeats are disabled
+        """
+        return self._heartbeat_interval
+
+    @property
+    def idle_timeout(self) -> float | None:
+        """
+        Gets the seconds the socket may be read without receiving anything
+        before the connection is aborted.
+
+        :return: float or None if idle connections are kept
+        """
+        return self._idle_timeout
@@ -1,14 +1,30 @@
-from asyncio import AbstractEventLoop, get_running_loop
+from asyncio import AbstractEventLoop, Future, get_running_loop
+from asyncio.proactor_events import BaseProactorEventLoop
+from collections import deque
+from itertools import islice
+from os import sysconf
 from socket import SOCK_STREAM, SOL_SOCKET, SO_LINGER, SO_REUSEADDR, socket
 from struct import pack
+from typing import BinaryIO, Sequence
 from XSocket.core.socket import ISocket
-from XSocket.exception import SocketClosedException
+from XSocket.exception import (ConnectionAbortedException,
+                               SocketClosedException)
 from XSocket.protocol.inet.net import IPAddressInfo
 
 __all__ = [
     "XTCPSocket"
 ]
 
+try:
+    from os import sendfile
+except ImportError:
+    sendfile = None
+
+try:
+    _IOV_MAX = sysconf("SC_IOV_MAX")
+except (AttributeError, ValueError, OSError):
+    _IOV_MAX = 1024
+
 
 class XTCPSocket(ISocket):
     """
@@ -20,6 +36,9 @@ class XTCPSocket(ISocket):
         self._local_address: IPAddressInfo = IPAddressInfo(*sock.getsockname())
         self._remote_address: IPAddressInfo = IPAddressInfo(*sock.getpeername())
         self._event_loop: AbstractEventLoop = get_running_loop()
+        self._readiness: bool = not isinstance(self._event_loop,
+                                               BaseProactorEventLoop)
+        self._waiters: dict[bool, Future] = {}
         self._closed: bool = False
 
     @property
@@ -83,6 +102,13 @@ class XTCPSocket(ISocket):
         """
         if self._closed:
             return
+        for writing, waiter in self._waiters.items():
+            if writing:
+                self._event_loop.remove_writer(self._socket)
+            else:
+                self._event_loop.remove_reader(self._socket)
+            if not waiter.done():
+                waiter.set_exception(ConnectionAbortedException())
         self._socket.close()
         self._closed = True
 
@@ -96,6 +122,107 @@ class XTCPSocket(ISocket):
             raise SocketClosedException()
         return await self._event_loop.sock_sendall(self._socket, data)
 
+    async def send_vectored(self, buffers: Sequence[bytes | memoryview]):
+        """
+        Sends the concatenation of buffers to a connected Socket
+        with vectored I/O, so the buffers are never joined.
+        Event loops without readiness callbacks, like the proactor
+        event loop, send the joined buffers with sock_sendall.
+
+        :param buffers: Buffers to send
+        """
+        if self._closed:
+            raise SocketClosedException()
+        if not self._readiness or not hasattr(self._socket, "sendmsg"):
+            return await self._event_loop.sock_sendall(
+                self._socket, b"".join(buffers))
+        pending = deque(memoryview(buffer).cast("B")
+                        for buffer in buffers if len(buffer))
+        while pending:
+            try:
+                sent = self._socket.sendmsg(islice(pending, _IOV_MAX))
+            except (BlockingIOError, InterruptedError):
+                await self._ready(writing=True)
+                continue
+            while sent:
+                if sent < len(pending[0]):
+                    pending[0] = pending[0][sent:]
+                    break
+                sent -= len(pending.popleft())
+
+    async def send_file(self, file: BinaryIO, offset: int, count: int):
+        """
+        Sends a part of a file to a connected Socket with sendfile.
+        Raises EOFError if the file ends before the count.
+
+        :param file: Binary file object
+        :param offset: Offset of the first byte to send
+        :param count: The number of bytes to send
+        """
+        if self._closed:
+            raise SocketClosedException()
+        if not count:
+            return
+        try:
+            sent = await self._event_loop.sock_sendfile(
+                self._socket, file, offset, count)
+        except NotImplementedError:
+            await self._send_file(file, offset, count)
+            return
+        if sent != count:
+            raise EOFError("The file ended before the count.")
+
+    async def _send_file(self, file: BinaryIO, offset: int, count: int):
+        """
+        Sends a part of a file with os.sendfile, waiting for writability
+        between calls, for event loops without sock_sendfile.
+        Without os.sendfile, the file is read chunk by chunk.
+
+        :param file: Binary file object
+        :param offset: Offset of the first byte to send
+        :param count: The number of bytes to send
+        """
+        end = offset + count
+        while offset < end:
+            if not sendfile or not self._readiness:
+                file.seek(offset)
+                chunk = await self._event_loop.run_in_executor(
+                    None, file.read, min(262144, end - offset))
+                sent = len(chunk)
+                if chunk:
+                    await self.send_vectored([chunk])
+            else:
+                try:
+                    sent = sendfile(self._socket.fileno(), file.fileno(),
+                                    offset, end - offset)
+                except (BlockingIOError, InterruptedError):
+                    await self._ready(writing=True)
+                    continue
+            if not sent:
+                raise EOFError("The file ended before the count.")
+            offset += sent
+
+    async def _ready(self, writing: bool):
+        """
+        Waits until the socket is ready for reading or writing.
+        Closing the socket wakes the waiter with an error.
+        Only used when the event loop supports readiness callbacks.
+
+        :param writing: Whether to wait for writing
+        """
+        loop = self._event_loop
+        add, remove = ((loop.add_writer, loop.remove_writer) if writing
+                       else (loop.add_reader, loop.remove_reader))
+        waiter = loop.create_future()
+        self._waiters[writing] = waiter
+        add(self._socket, lambda: waiter.done() or waiter.set_result(None))
+        try:
+            await waiter
+        finally:
+            del self._waiters[writing]
+            if not self._closed:
+                remove(self._socket)
+
     async def receive(self, length: int, exactly: bool = False) -> bytearray:
         """
         Receives data from a bound Socket.
@@ -108,8 +235,35 @@ class XTCPSocket(ISocket):
             raise SocketClosedException()
         buffer = bytearray()
         while len(buffer) != length:
-            buffer += await self._event_loop.sock_recv(
-                self._socket, length - len(buffer))
-            if not exactly:
+            if self._readiness:
+                try:
+                    data = self._socket.recv(length - len(buffer))
+                except (BlockingIOError, InterruptedError):
+                    await self._ready(writing=False)
+                    continue
+            else:
+                data = await self._event_loop.sock_recv(
+                    self._socket, length - len(buffer))
+            buffer += data
+            if not data or not exactly:
                 break
         return buffer
+
+    async def receive_into(self, buffer: memoryview) -> int:
+        """
+        Receives data from a bound Socket into a buffer.
+        The socket is read directly once it is readable, or with
+        sock_recv_into on event loops without readiness callbacks.
+
+        :param buffer: Writable buffer
+        :return: The number of bytes received, 0 if the peer closed
+        """
+        if self._closed:
+            raise SocketClosedException()
+        if not self._readiness:
+            return await self._event_loop.sock_recv_into(self._socket, buffer)
+        while True:
+            try:
+                return self._socket.recv_into(buffer)
+            except (BlockingIOError, InterruptedError):
+                await self._ready(writing=False)
@@ -0,0 +1,359 @@
+from asyncio import (AbstractEventLoop, BaseTransport, BufferedProtocol,
+                     Future, Transport, get_running_loop)
+from socket import SOL_SOCKET, SO_LINGER
+from struct import pack
+from typing import Any, BinaryIO, Callable, Sequence
+from XSocket.core.socket import ISocket
+from XSocket.exception import (ConnectionAbortedException,
+                               SocketClosedException)
+from XSocket.protocol.inet.net import IPAddressInfo
+
+__all__ = [
+    "XTCPProtocol",
+    "XTCPTransportSocket"
+]
+
+
+class XTCPProtocol(BufferedProtocol):
+    """
+    Buffers the incoming byte stream of an asyncio transport.
+    """
+
+    def __init__(self,
+                 connected: Callable[["XTCPProtocol"], Any] | None = None,
+                 buffer_size: int = 65536):
+        """
+        Buffers the incoming byte stream of an asyncio transport.
+
+        :param connected: Called when the connection is made
+        :param buffer_size: Initial size of the receive buffer
+        """
+        self._connected: Callable[["XTCPProtocol"], Any] | None = connected
+        self._transport: Transport | None = None
+        self._buffer: bytearray = bytearray(buffer_size)
+        self._buffer_size: int = buffer_size
+        self._start: int = 0
+        self._end: int = 0
+        self._read_waiter: Future | None = None
+        self._drain_waiter: Future | None = None
+        self._reading_paused: bool = False
+        self._writing_paused: bool = False
+        self._exception: Exception | None = None
+
+    @property
+    def transport(self) -> Transport:
+        """
+        Gets the transport of the Protocol.
+
+        :return: Transport
+        """
+        return self._transport
+
+    def connection_made(self, transport: BaseTransport):
+        self._transport = transport
+        if self._connected:
+            self._connected(self)
+
+    def connection_lost(self, exc: Exception | None):
+        self._exception = exc or ConnectionAbortedException()
+        self._wake(self._read_waiter)
+        self._wake(self._drain_waiter)
+
+    def eof_received(self) -> bool:
+        self._exception = ConnectionAbortedException()
+        self._wake(self._read_waiter)
+        return False
+
+    def get_buffer(self, sizehint: int) -> memoryview:
+        if self._start == self._end:
+            self._start = self._end = 0
+        minimum = max(sizehint, 4096)
+        if len(self._buffer) - self._end < minimum and self._start:
+            length = self._end - self._start
+            self._buffer[:length] = self._buffer[self._start:self._end]
+            self._start, self._end = 0, length
+        if len(self._buffer) - self._end < minimum:
+            self._buffer.extend(bytes(max(minimum, len(self._buffer))))
+        return memoryview(self._buffer)[self._end:]
+
+    def buffer_updated(self, nbytes: int):
+        self._end += nbytes
+        if self._end - self._start >= self._buffer_size * 4:
+            self._transport.pause_reading()
+            self._reading_paused = True
+        self._wake(self._read_waiter)
+
+    def pause_writing(self):
+        self._writing_paused = True
+
+    def resume_writing(self):
+        self._writing_paused = False
+        self._wake(self._drain_waiter)
+
+    @staticmethod
+    def _wake(waiter: Future | None):
+        if waiter is not None and not waiter.done():
+            waiter.set_result(None)
+
+    async def read(self, length: int, exactly: bool = False) -> bytearray:
+        """
+        Reads buffered data, waiting for the transport if necessary.
+
+        :param length: The number of bytes to read
+        :param exactly: Weather to read exactly
+        :return: Read data
+        """
+        while self._end - self._start < (length if exactly else 1):
+            if self._exception:
+                raise self._exception
+            self._read_waiter = get_running_loop().create_future()
+            try:
+                await self._read_waiter
+            finally:
+                self._read_waiter = None
+        size = min(length, self._end - self._start)
+        data = self._buffer[self._start:self._start + size]
+        self._start += size
+        if self._reading_paused and \
+                self._end - self._start < self._buffer_size:
+            self._reading_paused = False
+            self._transport.resume_reading()
+        return data
+
+    async def read_into(self, buffer: memoryview) -> int:
+        """
+        Copies buffered data into a buffer,
+        waiting for the transport if necessary.
+
+        :param buffer: Writable buffer
+        :return: The number of bytes copied, 0 at the end of the stream
+        """
+        while self._end == self._start:
+            if self._exception:
+                return 0
+            self._read_waiter = get_running_loop().create_future()
+            try:
+                await self._read_waiter
+            finally:
+                self._read_waiter = None
+        size = min(len(buffer), self._end - self._start)
+        start, self._start = self._start, self._start + size
+        buffer[:size] = memoryview(self._buffer)[start:self._start]
+        if self._reading_paused and \
+                self._end - self._start < self._buffer_size:
+            self._reading_paused = False
+            self._transport.resume_reading()
+        return size
+
+    async def write(self, data: bytes | bytearray | memoryview):
+        """
+        Writes data to the transport and waits while it is paused.
+
+        :param data: Data to write
+        """
+        if self._exception:
+            raise self._exception
+        self._transport.write(data)
+        await self._drain()
+
+    async def writelines(self, buffers: Sequence[bytes | memoryview]):
+        """
+        Writes buffers to the transport and waits while it is paused.
+
+        :param buffers: Buffers to write
+        """
+        if self._exception:
+            raise self._exception
+        self._transport.writelines(buffers)
+        await self._drain()
+
+    async def _drain(self):
+        """
+        Waits until the transport resumes writing.
+        """
+        if self._writing_paused:
+            self._drain_waiter = get_running_loop().create_future()
+            try:
+                await self._drain_waiter
+            finally:
+                self._drain_waiter = None
+            if self._exception:
+                raise self._exception
+
+
+class XTCPTransportSocket(ISocket):
+    """
+    Implements XTCP sockets interface over an asyncio transport.
+    """
+
+    def __init__(self, transport: Transport, protocol: XTCPProtocol):
+        self._transport: Transport = transport
+        self._protocol: XTCPProtocol = protocol
+        self._local_address: IPAddressInfo = IPAddressInfo(
+            *transport.get_extra_info("sockname")[:2])
+        self._remote_address: IPAddressInfo = IPAddressInfo(
+            *transport.get_extra_info("peername")[:2])
+        self._event_loop: AbstractEventLoop = get_running_loop()
+        self._closed: bool = False
+
+    @property
+    def closed(self) -> bool:
+        """
+        Gets a value indicating whether
+        the Socket for a Socket has been closed.
+
+        :return: bool
+        """
+        return self._closed
+
+    @property
+    def get_raw_socket(self) -> Any:
+        """
+        Get a low-level socket.
+
+        :return: Low-level socket
+        """
+        if self._closed:
+            raise SocketClosedException()
+        return self._transport.get_extra_info("socket")
+
+    @property
+    def local_address(self) -> IPAddressInfo:
+        """
+        Gets the local IP address info.
+
+        :return: IPAddressInfo
+        """
+        return self._local_address
+
+    @property
+    def remote_address(self) -> IPAddressInfo:
+        """
+        Gets the remote IP address info.
+
+        :return: IPAddressInfo
+        """
+        return self._remote_address
+
+    @staticmethod
+    async def create(address: IPAddressInfo) -> "XTCPTransportSocket":
+        """
+        Create a new XTCPTransportSocket with the IP address info.
+
+        :param address: IPAddressInfo
+        :return: XTCPTransportSocket
+        """
+        loop = get_running_loop()
+        transport, protocol = await loop.create_connection(
+            XTCPProtocol, *address)
+        transport.get_extra_info("socket").setsockopt(
+            SOL_SOCKET, SO_LINGER, pack("ii", 1, 0))
+        return XTCPTransportSocket(transport, protocol)
+
+    def close(self):
+        """
+        Close the socket.
+        """
+        if self._closed:
+            return
+        self._transport.abort()
+        self._closed = True
+
+    async def send(self, data: bytearray):
+        """
+        Sends data to a connected Socket.
+
+        :param data: Data to send
+        """
+        if self._closed:
+            raise SocketClosedException()
+        await self._protocol.write(data)
+
+    async def send_vectored(self, buffers: Sequence[bytes | memoryview]):
+        """
+        Sends the concatenation of buffers to a connected Socket.
+        The transport may keep references to the buffers until they are
+        written, so they must not be modified after sending.
+
+        :param buffers: Buffers to send
+        """
+        if self._closed:
+            raise SocketClosedException()
+        await self._protocol.writelines(buffers)
+
+    async def send_file(self, file: BinaryIO, offset: int, count: int):
+        """
+        Sends a part of a file to a connected Socket with sendfile.
+        Raises EOFError if the file ends before the count.
+
+        :param file: Binary file object
+        :param offset: Offset of the first byte to send
+        :param count: The number of bytes to send
+        """
+        if self._closed:
+            raise SocketClosedException()
+        if not count:
+            return
+        try:
+            sent = await self._event_loop.sendfile(
+                self._transport, file, offset, count)
+        except NotImplementedError:
+            await self._send_file_chunks(file, offset, count)
+            return
+        if sent != count:
+            raise EOFError("The file ended before the count.")
+
+    async def _send_file_chunks(self, file: BinaryIO, offset: int,
+                                count: int):
+        """
+        Sends a part of a file read chunk by chunk in the executor,
+        for event loops whose transports do not support sendfile.
+
+        :param file: Binary file object
+        :param offset: Offset of the first byte to send
+        :param count: The number of bytes to send
+        """
+        end = offset + count
+        while offset < end:
+            chunk = await self._event_loop.run_in_executor(
+                None, _read, file, offset, min(262144, end - offset))
+            if not chunk:
+                raise EOFError("The file ended before the count.")
+            await self._protocol.write(chunk)
+            offset += len(chunk)
+
+    async def receive(self, length: int, exactly: bool = False) -> bytearray:
+        """
+        Receives data from a bound Socket.
+
+        :param length: The number of bytes to receive
+        :param exactly: weather to read exactly
+        :return: Received data
+        """
+        if self._closed:
+            raise SocketClosedException()
+        return await self._protocol.read(length, exactly)
+
+    async def receive_into(self, buffer: memoryview) -> int:
+        """
+        Receives data from a bound Socket into a buffer.
+
+        :param buffer: Writable buffer
+        :return: The number of bytes received, 0 if the peer closed
+        """
+        if self._closed:
+            raise SocketClosedException()
+        return await self._protocol.read_into(buffer)
+
+
+def _read(file: BinaryIO, offset: int, size: int) -> bytes:
+    """
+    Reads a part of a file.
+
+    :param file: Binary file object
+    :param offset: Offset of the first byte to read
+    :param size: The maximum number of bytes to read
+    :return: Data
+    """
+    file.seek(offset)
+    return file.read(size)
@@ -0,0 +1,3 @@
+from XSocket.protocol.unix.handle import UnixHandle
+from XSocket.protocol.unix.listener import UnixListener
+from XSocket.protocol.unix.net import UnixAddressInfo
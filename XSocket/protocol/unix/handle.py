@@ -0,0 +1,45 @@
+from XSocket.protocol.inet.xtcp.handle import XTCPHandle
+from XSocket.protocol.inet.xtcp.options import XTCPOptions
+from XSocket.protocol.unix.net import UnixAddressInfo
+from XSocket.protocol.unix.socket import UnixSocket
+
+__all__ = [
+    "UnixHandle"
+]
+
+
+class UnixHandle(XTCPHandle):
+    """
+    Provides client connections over Unix domain sockets
+    with the framing of XTCP.
+    """
+
+    @property
+    def local_address(self) -> UnixAddressInfo:
+        """
+        Gets the local endpoint.
+
+        :return: UnixAddressInfo
+        """
+        return self._socket.local_address
+
+    @property
+    def remote_address(self) -> UnixAddressInfo:
+        """
+        Gets the remote endpoint.
+
+        :return: UnixAddressInfo
+        """
+        return self._socket.remote_address
+
+    @staticmethod
+    async def create(address: UnixAddressInfo,
+                     options: XTCPOptions | None = None) -> "UnixHandle":
+        """
+        Create a new UnixHandle connected to the address info.
+
+        :param address: UnixAddressInfo
+        :param options: Settings of the handle
+        :return: UnixHandle
+        """
+        return UnixHandle(await UnixSocket.create(address), options, True)
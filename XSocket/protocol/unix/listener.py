@@ -0,0 +1,110 @@
+from asyncio import get_running_loop
+from os import PathLike, stat, unlink
+from socket import SOCK_STREAM, socket
+from stat import S_ISSOCK
+from XSocket.exception import InvalidOperationException
+from XSocket.protocol.inet.xtcp.listener import XTCPListener
+from XSocket.protocol.inet.xtcp.options import XTCPOptions
+from XSocket.protocol.unix.handle import UnixHandle
+from XSocket.protocol.unix.net import UnixAddressInfo
+from XSocket.protocol.unix.socket import AF_UNIX, UnixSocket
+
+__all__ = [
+    "UnixListener"
+]
+
+
+class UnixListener(XTCPListener):
+    """
+    Listens for connections from Unix domain socket clients
+    on the same host.
+    """
+
+    def __init__(self, address: UnixAddressInfo | str | PathLike,
+                 options: XTCPOptions | None = None,
+                 backlog: int | None = None):
+        """
+        Listens for connections from Unix domain socket clients
+        on the same host.
+
+        A stale socket file left at the path is replaced when the
+        listener starts, and the file is removed when it closes.
+
+        :param address: Path of the socket file
+        :param options: Settings of the created handles
+        :param backlog: The number of connections the kernel queues
+                        before they are accepted
+        """
+        if AF_UNIX is None:
+            raise InvalidOperationException(
+                "Unix domain sockets are not supported on this platform.")
+        if not isinstance(address, UnixAddressInfo):
+            address = UnixAddressInfo(address)
+        super().__init__(address, options, backlog=backlog)
+
+    @property
+    def local_address(self) -> UnixAddressInfo:
+        """
+        Gets the local endpoint.
+
+        :return: UnixAddressInfo
+        """
+        return self._address
+
+    def run(self):
+        """
+        Starts listening for incoming connection requests.
+        """
+        if self._running or self._closed:
+            return
+        self._event_loop = get_running_loop()
+        self._unlink_stale()
+        self._socket = socket(AF_UNIX, SOCK_STREAM)
+        self._socket.setblocking(False)
+        self._socket.bind(self._address.path)
+        self._listen()
+        self._running = True
+
+    def close(self):
+        """
+        Closes the listener and removes its socket file.
+        """
+        if not self._running or self._closed:
+            return
+        super().close()
+        if self._address.path and not self._address.abstract:
+            try:
+                unlink(self._address.path)
+            except FileNotFoundError:
+                pass
+
+    def _unlink_stale(self):
+        """
+        Removes a socket file left at the path by a listener
+        that did not close. Other files are never removed.
+        """
+        if not self._address.path or self._address.abstract:
+            return
+        try:
+            if S_ISSOCK(stat(self._address.path).st_mode):
+                unlink(self._address.path)
+        except FileNotFoundError:
+            pass
+
+    async def connect(self) -> UnixHandle:
+        """
+        Establishes a connection to a listening Unix domain socket.
+
+        :return: UnixHandle
+        """
+        return await UnixHandle.create(self._address, self._options)
+
+    async def adopt(self, sock: socket) -> UnixHandle:
+        """
+        Creates a new UnixHandle on the running event loop
+        for a socket returned by accept_socket.
+
+        :param sock: Low-level socket
+        :return: UnixHandle
+        """
+        return UnixHandle(UnixSocket(sock), self._options)
@@ -0,0 +1,71 @@
+from os import PathLike, fsdecode
+from typing import Iterator
+from XSocket.exception import InvalidParameterException
+from XSocket.core.net import AddressFamily, AddressInfo
+
+__all__ = [
+    "UnixAddressInfo"
+]
+
+
+class UnixAddressInfo(AddressInfo):
+    """
+    Represents a local endpoint as the path of a Unix domain socket.
+    """
+
+    def __init__(self, path: str | bytes | PathLike):
+        """
+        Represents a local endpoint as the path of a Unix domain socket.
+
+        :param path: Path of the socket file, a path starting with a null
+                     byte is in the Linux abstract namespace and an empty
+                     path is an unnamed socket
+        """
+        try:
+            self._path: str = fsdecode(path)
+        except TypeError:
+            raise InvalidParameterException("The path is invalid.")
+
+    @property
+    def path(self) -> str:
+        """
+        Gets the path of the AddressInfo.
+
+        :return: Path of the socket file
+        """
+        return self._path
+
+    @property
+    def abstract(self) -> bool:
+        """
+        Gets a value indicating whether the path is
+        in the Linux abstract namespace instead of the file system.
+
+        :return: bool
+        """
+        return self._path.startswith("\0")
+
+    @property
+    def address_family(self) -> AddressFamily:
+        """
+        Gets the address family.
+
+        :return: AddressFamily
+        """
+        return AddressFamily.Unix
+
+    def __iter__(self) -> Iterator[str]:
+        """
+        Gets the path of the AddressInfo as an iterator.
+
+        :return: Path
+        """
+        return iter((self._path,))
+
+    def __hash__(self) -> int:
+        """
+        Returns a hash code for the current object.
+
+        :return: Hash code
+        """
+        return hash(self._path)
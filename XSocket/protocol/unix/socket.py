@@ -0,0 +1,72 @@
+from asyncio import AbstractEventLoop, Future, get_running_loop
+from asyncio.proactor_events import BaseProactorEventLoop
+from socket import SOCK_STREAM, socket
+from XSocket.exception import InvalidOperationException
+from XSocket.protocol.inet.xtcp.socket import XTCPSocket
+from XSocket.protocol.unix.net import UnixAddressInfo
+
+__all__ = [
+    "UnixSocket"
+]
+
+try:
+    from socket import AF_UNIX
+except ImportError:
+    AF_UNIX = None
+
+
+class UnixSocket(XTCPSocket):
+    """
+    Implements the sockets interface over Unix domain stream sockets.
+    """
+
+    def __init__(self, sock: socket):
+        self._socket: socket = sock
+        self._local_address: UnixAddressInfo = UnixAddressInfo(
+            sock.getsockname())
+        self._remote_address: UnixAddressInfo = UnixAddressInfo(
+            sock.getpeername())
+        self._event_loop: AbstractEventLoop = get_running_loop()
+        self._readiness: bool = not isinstance(self._event_loop,
+                                               BaseProactorEventLoop)
+        self._waiters: dict[bool, Future] = {}
+        self._closed: bool = False
+
+    @property
+    def local_address(self) -> UnixAddressInfo:
+        """
+        Gets the local address info.
+
+        :return: UnixAddressInfo
+        """
+        return self._local_address
+
+    @property
+    def remote_address(self) -> UnixAddressInfo:
+        """
+        Gets the remote address info.
+
+        :return: UnixAddressInfo
+        """
+        return self._remote_address
+
+    @staticmethod
+    async def create(address: UnixAddressInfo) -> "UnixSocket":
+        """
+        Create a new UnixSocket connected to the address info.
+
+        :param address: UnixAddressInfo
+        :return: UnixSocket
+        """
+        if AF_UNIX is None:
+            raise InvalidOperationException(
+                "Unix domain sockets are not supported on this platform.")
+        loop = get_running_loop()
+        sock = socket(AF_UNIX, SOCK_STREAM)
+        sock.setblocking(False)
+        try:
+            await loop.sock_connect(sock, address.path)
+        except BaseException:
+            sock.close()
+            raise
+        return UnixSocket(sock)
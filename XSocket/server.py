@@ -1,16 +1,27 @@
-from asyncio import Lock, Task, create_task, gather
+from asyncio import (AbstractEventLoop, Future, Lock, Semaphore, Task,
+                     all_tasks, create_task, gather, get_running_loop,
+                     new_event_loop, run_coroutine_threadsafe, set_event_loop,
+                     sleep, wrap_future)
+from threading import Lock as ThreadLock, Thread
+from typing import Any, Awaitable, Callable, Coroutine
 from pyeventlib import EventHandler
 from XSocket.client import Client
+from XSocket.core.handle import IHandle
 from XSocket.core.listener import IListener
 from XSocket.core.net import AddressFamily, AddressInfo
 from XSocket.events import (OnOpenEventArgs,
                             OnCloseEventArgs,
                             OnAcceptEventArgs,
                             OnErrorEventArgs)
-from XSocket.exception import ServerClosedException
+from XSocket.exception import (InvalidParameterException,
+                               ServerClosedException)
+from XSocket.metrics import Metrics
 from XSocket.protocol.protocol import ProtocolType
+from XSocket.tracing import Tracer
+from XSocket.util import LoadBalancing, SlowConsumerPolicy
 
 __all__ = [
+    "BroadcastResult",
     "Server"
 ]
 
@@ -26,11 +37,145 @@ class ServerEventWrapper:
         self.on_error: EventHandler = EventHandler()
 
 
+class BroadcastResult:
+    """
+    Contains the number of clients a broadcast reached.
+    """
+    def __init__(self, delivered: int, skipped: int, failed: int):
+        self._delivered = delivered
+        self._skipped = skipped
+        self._failed = failed
+
+    @property
+    def delivered(self) -> int:
+        """
+        Gets the number of clients the message was queued for.
+
+        :return: int
+        """
+        return self._delivered
+
+    @property
+    def skipped(self) -> int:
+        """
+        Gets the number of clients that were not running.
+
+        :return: int
+        """
+        return self._skipped
+
+    @property
+    def failed(self) -> int:
+        """
+        Gets the number of clients that raised an error.
+
+        :return: int
+        """
+        return self._failed
+
+
+class _Worker:
+    """
+    Runs an event loop in a thread and owns the clients handed off to it.
+    """
+    def __init__(self, index: int, retire: Callable[[Client], None],
+                 concurrency: int):
+        self.loop: AbstractEventLoop = new_event_loop()
+        self.clients: dict[int, Client] = {}
+        self.retire: Callable[[Client], None] = retire
+        self.accepting: Semaphore = Semaphore(concurrency)
+        self.assigned: int = 0
+        self.released: int = 0
+        self.thread: Thread = Thread(target=self._run, daemon=True,
+                                     name=f"XSocket-worker-{index}")
+        self.thread.start()
+
+    def _run(self):
+        set_event_loop(self.loop)
+        try:
+            self.loop.run_forever()
+            tasks = all_tasks(self.loop)
+            for task in tasks:
+                task.cancel()
+            self.loop.run_until_complete(
+                gather(*tasks, return_exceptions=True))
+        finally:
+            self.loop.close()
+
+    def call(self, coroutine: Coroutine) -> Future:
+        """
+        Runs a coroutine on the loop of the worker.
+
+        :param coroutine: Coroutine to run
+        :return: Future of the caller's loop
+        """
+        return wrap_future(run_coroutine_threadsafe(coroutine, self.loop))
+
+    def stop(self):
+        """
+        Stops the loop of the worker.
+        """
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+    @property
+    def load(self) -> int:
+        """
+        Gets the number of connections handed to the worker and not closed.
+        Each counter is only written by one thread, so none is lost.
+
+        :return: int
+        """
+        return self.assigned - self.released
+
+    async def collector(self, sender: Client, _):
+        if self.clients.pop(id(sender), None):
+            self.released += 1
+            self.retire(sender)
+
+
 class Server:
-    def __init__(self, listener: IListener):
+    def __init__(self, listener: IListener,
+                 slow_consumer_policy: SlowConsumerPolicy =
+                 SlowConsumerPolicy.Block,
+                 streaming: bool = False, batch_size: int = 1,
+                 batch_latency: float = 0, workers: int = 0,
+                 load_balancing: LoadBalancing = LoadBalancing.RoundRobin,
+                 metrics: bool = False, tracer: Tracer | None = None,
+                 request_handler: Callable[
+                     [Client, bytearray],
+                     Awaitable[bytes | bytearray | memoryview | None]] |
+                 None = None, accept_batch: int = 256,
+                 accept_concurrency: int = 256,
+                 accept_rate: float | None = None):
+        if accept_batch < 1 or accept_concurrency < 1 or \
+                accept_rate is not None and accept_rate <= 0:
+            raise InvalidParameterException(
+                "The accept batch, concurrency and rate must be positive.")
         self._listener: IListener = listener
+        self._streaming: bool = streaming
+        self._batch_size: int = batch_size
+        self._batch_latency: float = batch_latency
+        self._slow_consumer_policy: SlowConsumerPolicy = slow_consumer_policy
         self._clients: dict[int, Client] = {}
-        self._wrapper_lock: Lock = Lock()
+        self._accepted: int = 0
+        self._worker_count: int = workers
+        self._load_balancing: LoadBalancing = load_balancing
+        self._metrics: Metrics | None = Metrics() if metrics else None
+        self._metrics_lock: ThreadLock = ThreadLock()
+        self._tracer: Tracer | None = tracer
+        self._request_handler: Callable[
+            [Client, bytearray],
+            Awaitable[bytes | bytearray | memoryview | None]] | None = \
+            request_handler
+        self._accept_batch: int = accept_batch
+        self._accept_concurrency: int = accept_concurrency
+        self._accept_rate: float | None = accept_rate
+        self._accepting: Semaphore = Semaphore(accept_concurrency)
+        self._setups: set[Task] = set()
+        self._tokens: float = accept_batch
+        self._refilled: float = 0
+        self._workers: list[_Worker] = []
+        self._next_worker: int = 0
         self._collector_lock: Lock = Lock()
         self._task: Task | None = None
         self._running: bool = False
@@ -55,6 +200,126 @@ class Server:
         """
         return self._closed
 
+    @property
+    def connections(self) -> int:
+        """
+        Gets the number of connected clients.
+
+        :return: int
+        """
+        return len(self._clients) + sum(len(worker.clients)
+                                        for worker in self._workers)
+
+    @property
+    def workers(self) -> int:
+        """
+        Gets the number of worker threads running their own event loop,
+        0 if clients run on the loop of the server.
+
+        :return: int
+        """
+        return self._worker_count
+
+    @property
+    def load_balancing(self) -> LoadBalancing:
+        """
+        Gets how connections are spread over the worker loops.
+
+        :return: LoadBalancing
+        """
+        return self._load_balancing
+
+    @property
+    def accept_batch(self) -> int:
+        """
+        Gets the maximum number of pending connections
+        accepted per wakeup of the accept loop.
+
+        :return: int
+        """
+        return self._accept_batch
+
+    @property
+    def accept_concurrency(self) -> int:
+        """
+        Gets the maximum number of connections being set up at once,
+        per loop, including their on_accept handlers.
+
+        :return: int
+        """
+        return self._accept_concurrency
+
+    @property
+    def accept_rate(self) -> float | None:
+        """
+        Gets the maximum number of connections accepted per second.
+        Connections above the rate wait in the backlog of the listener.
+
+        :return: float or None if unlimited
+        """
+        return self._accept_rate
+
+    @property
+    def accepted(self) -> int:
+        """
+        Gets the number of clients accepted since the server started.
+
+        :return: int
+        """
+        return self._accepted
+
+    @property
+    def metrics(self) -> Metrics | None:
+        """
+        Gets the metrics of all clients, closed ones included, added up
+        into a new registry. Connections closing meanwhile may be missed.
+
+        :return: Metrics or None if disabled
+        """
+        if self._metrics is None:
+            return None
+        metrics = Metrics()
+        with self._metrics_lock:
+            metrics.merge(self._metrics)
+        clients = [*self._clients.values()]
+        for worker in self._workers:
+            clients += [*worker.clients.values()]
+        for client in clients:
+            metrics.merge(client.metrics)
+        metrics.accepted.inc(self._accepted)
+        return metrics
+
+    @property
+    def tracer(self) -> Tracer | None:
+        """
+        Gets the tracer the clients report their timed stages to.
+
+        :return: Tracer or None if disabled
+        """
+        return self._tracer
+
+    @property
+    def request_handler(self) -> Callable[
+            [Client, bytearray],
+            Awaitable[bytes | bytearray | memoryview | None]] | None:
+        """
+        Gets the coroutine function answering the requests of the clients,
+        see Client.request_handler.
+
+        :return: Request handler or None
+        """
+        return self._request_handler
+
+    @property
+    def slow_consumer_policy(self) -> SlowConsumerPolicy:
+        """
+        Gets how a broadcast treats a client
+        whose write buffer is above the high watermark.
+
+        :return: SlowConsumerPolicy
+        """
+        return self._slow_consumer_policy
+
     @property
     def local_address(self) -> AddressInfo:
         """
@@ -99,6 +364,10 @@ class Server:
             return
         self._running = True
         self._listener.run()
+        self._workers = [_Worker(index, self._retire,
+                                 self._accept_concurrency)
+                         for index in range(self._worker_count)]
+        self._refilled = get_running_loop().time()
         self._task = create_task(self._wrapper())
 
     async def close(self):
@@ -108,47 +377,248 @@ class Server:
         if not self._running or self._closed:
             return
         self._closed = True
-        await self._task
-        await gather(*[client.close() for client in self._clients.values()])
+        self._task.cancel()
+        await gather(self._task, return_exceptions=True)
+        for task in [*self._setups]:
+            task.cancel()
+        await gather(*self._setups, return_exceptions=True)
+        await gather(*[client.close() for client in self._clients.values()],
+                     return_exceptions=True)
+        await gather(*[worker.call(self._close_clients(worker.clients))
+                       for worker in self._workers],
+                     return_exceptions=True)
+        loop = get_running_loop()
+        for worker in self._workers:
+            worker.stop()
+        await gather(*[loop.run_in_executor(None, worker.thread.join)
+                       for worker in self._workers])
         self._listener.close()
         self._running = False
 
+    @staticmethod
+    async def _close_clients(clients: dict[int, Client]):
+        await gather(*[client.close() for client in [*clients.values()]],
+                     return_exceptions=True)
+
     async def _wrapper(self):
         await self.event.on_open(self, OnOpenEventArgs())
-        while not self._closed:
-            try:
-                handle = await self._listener.accept()
-                client = Client(handle)
-                client.event.on_close += self._collector
-                async with self._wrapper_lock:
-                    cid = id(client)
-                    self._clients[cid] = client
+        try:
+            while not self._closed:
+                try:
+                    limit = await self._throttle()
+                    if self._workers:
+                        sockets = await self._listener.accept_sockets(limit)
+                        self._tokens -= len(sockets)
+                        for sock in sockets:
+                            self._hand_off(sock)
+                        continue
+                    handles = await self._listener.accept_many(limit)
+                    self._tokens -= len(handles)
+                    for index, handle in enumerate(handles):
+                        try:
+                            await self._accepting.acquire()
+                        except BaseException:
+                            for pending in handles[index:]:
+                                pending.abort()
+                            raise
+                        task = create_task(self._setup(handle))
+                        self._setups.add(task)
+                        task.add_done_callback(self._setups.discard)
+                except Exception as e:
+                    await self.event.on_error(self, OnErrorEventArgs(e))
+        finally:
+            await self.event.on_close(self, OnCloseEventArgs())
+
+    async def _throttle(self) -> int:
+        """
+        Waits until the accept rate allows another connection.
+
+        :return: The number of connections that may be accepted now
+        """
+        if self._accept_rate is None:
+            return self._accept_batch
+        loop = get_running_loop()
+        while True:
+            now = loop.time()
+            self._tokens = min(self._accept_batch, self._tokens +
+                               (now - self._refilled) * self._accept_rate)
+            self._refilled = now
+            if self._tokens >= 1:
+                return int(self._tokens)
+            await sleep((1 - self._tokens) / self._accept_rate)
+
+    async def _setup(self, handle: IHandle):
+        """
+        Creates and starts the client of an accepted handle and runs
+        the on_accept handlers, while the accept loop keeps accepting.
+
+        :param handle: Accepted handle
+        """
+        try:
+            client = Client(handle, self._streaming,
+                            self._batch_size, self._batch_latency,
+                            self._metrics is not None, self._tracer,
+                            self._request_handler)
+            client.event.on_close += self._collector
+            self._clients[id(client)] = client
+            self._accepted += 1
+            await client.run()
+            await self.event.on_accept(self, OnAcceptEventArgs(client))
+        except Exception as e:
+            await self.event.on_error(self, OnErrorEventArgs(e))
+        finally:
+            self._accepting.release()
+
+    def _hand_off(self, sock: Any):
+        """
+        Hands an accepted socket off to a worker loop
+        chosen by the load balancing policy.
+
+        :param sock: Low-level socket
+        """
+        if self._load_balancing == LoadBalancing.LeastConnections:
+            worker = min(self._workers, key=lambda w: w.load)
+        else:
+            worker = self._workers[self._next_worker]
+            self._next_worker = (self._next_worker + 1) % len(self._workers)
+        self._accepted += 1
+        worker.assigned += 1
+        run_coroutine_threadsafe(self._adopt(worker, sock), worker.loop)
+
+    async def _adopt(self, worker: _Worker, sock: Any):
+        """
+        Creates the client of a handed off socket on the worker loop,
+        so its events run on the loop that owns it.
+
+        :param worker: Worker owning the client
+        :param sock: Low-level socket
+        """
+        try:
+            async with worker.accepting:
+                try:
+                    handle = await self._listener.adopt(sock)
+                except Exception:
+                    worker.released += 1
+                    sock.close()
+                    raise
+                client = Client(handle, self._streaming,
+                                self._batch_size, self._batch_latency,
+                                self._metrics is not None, self._tracer,
+                                self._request_handler)
+                client.event.on_close += worker.collector
+                worker.clients[id(client)] = client
                 await client.run()
                 await self.event.on_accept(self, OnAcceptEventArgs(client))
-            except Exception as e:
-                await self.event.on_error(self, OnErrorEventArgs(e))
-        await self.event.on_close(self, OnCloseEventArgs())
+        except Exception as e:
+            await self.event.on_error(self, OnErrorEventArgs(e))
 
     async def _collector(self, sender: Client, _):
         async with self._collector_lock:
             del self._clients[id(sender)]
+        self._retire(sender)
+
+    def _retire(self, client: Client):
+        """
+        Adds the metrics of a closed client to those of the server.
+        Called from the loop owning the client.
 
-    async def broadcast(self, data: bytes | bytearray):
+        :param client: Closed client
+        """
+        if self._metrics is None:
+            return
+        with self._metrics_lock:
+            self._metrics.merge(client.metrics)
+
+    async def broadcast(self, data: bytes | bytearray | memoryview,
+                        policy: SlowConsumerPolicy | None = None
+                        ) -> BroadcastResult:
         """
         Send data to all clients.
 
+        The packets are encoded once per protocol type and the same immutable
+        buffers are queued on every client. Clients whose write buffer is
+        above the high watermark are handled by the slow consumer policy,
+        so they never delay the other clients. Data other than bytes is
+        copied once first, so the caller may modify it after the call.
+
+        With worker loops, each worker broadcasts to its own clients
+        on its own loop and the results are added up.
+
         :param data: Data to send
+        :param policy: Slow consumer policy, defaults to the server's
+        :return: BroadcastResult
         """
         if not self._running or self._closed:
             raise ServerClosedException()
-        tasks = [client.send(data) for client in self._clients.values()]
-        await gather(*tasks)
+        if policy is None:
+            policy = self._slow_consumer_policy
+        if not isinstance(data, bytes):
+            data = bytes(data)
+        if not self._workers:
+            return await self._broadcast(self._clients, data, policy)
+        results = [await self._broadcast(self._clients, data, policy),
+                   *await gather(*[
+                       worker.call(self._broadcast(
+                           worker.clients, data, policy))
+                       for worker in self._workers])]
+        return BroadcastResult(sum(result.delivered for result in results),
+                               sum(result.skipped for result in results),
+                               sum(result.failed for result in results))
+
+    @staticmethod
+    async def _broadcast(clients: dict[int, Client], data: bytes,
+                         policy: SlowConsumerPolicy) -> BroadcastResult:
+        """
+        Sends data to the clients of one event loop.
+
+        :param clients: Clients owned by the running loop
+        :param data: Data to send
+        :param policy: Slow consumer policy
+        :return: BroadcastResult
+        """
+        packets: dict[ProtocolType, list[bytes | memoryview]] = {}
+        blocked: list[Client] = []
+        aborted: list[Client] = []
+        delivered = skipped = failed = 0
+        for client in [*clients.values()]:
+            if not client.running or client.closed:
+                skipped += 1
+                continue
+            try:
+                slow = client.get_write_buffer_size() >= \
+                    client.get_write_buffer_limits()[0]
+                if slow and policy == SlowConsumerPolicy.Drop:
+                    skipped += 1
+                    continue
+                if slow and policy == SlowConsumerPolicy.Disconnect:
+                    aborted.append(client)
+                    skipped += 1
+                    continue
+                protocol_type = client.protocol_type
+                if protocol_type not in packets:
+                    packets[protocol_type] = client.pack(data)
+                client.write_packets(packets[protocol_type])
+                if slow:
+                    blocked.append(client)
+                delivered += 1
+            except Exception:
+                failed += 1
+        results = await gather(*[client.drain() for client in blocked],
+                               *[client.abort() for client in aborted],
+                               return_exceptions=True)
+        errors = sum(isinstance(result, Exception)
+                     for result in results[:len(blocked)])
+        return BroadcastResult(delivered - errors, skipped, failed + errors)
 
-    async def broadcast_string(self, string: str, encoding: str = "UTF-8"):
+    async def broadcast_string(self, string: str, encoding: str = "UTF-8",
+                               policy: SlowConsumerPolicy | None = None
+                               ) -> BroadcastResult:
         """
         Send string to all clients.
 
         :param string: String to send
         :param encoding: String encoding
+        :param policy: Slow consumer policy, defaults to the server's
+        :return: BroadcastResult
         """
-        await self.broadcast(string.encode(encoding))
+        return await self.broadcast(string.encode(encoding), policy)
@@ -0,0 +1,79 @@
+from asyncio import get_running_loop
+from typing import Awaitable, BinaryIO, Callable
+
+__all__ = [
+    "MessageStream"
+]
+
+
+class MessageStream:
+    """
+    Provides the chunks of a fragmented message as they arrive.
+    """
+    def __init__(self, read: Callable[[], Awaitable[tuple[bool, bytearray]]],
+                 first: bytearray):
+        """
+        Provides the chunks of a fragmented message as they arrive.
+
+        :param read: Reads the next fragment and whether it is the last one
+        :param first: Data of the first fragment
+        """
+        self._read: Callable[[], Awaitable[tuple[bool, bytearray]]] = read
+        self._first: bytearray | None = first
+        self._finished: bool = False
+
+    @property
+    def finished(self) -> bool:
+        """
+        Gets a value indicating whether every chunk has been read.
+
+        :return: bool
+        """
+        return self._finished
+
+    def __aiter__(self) -> "MessageStream":
+        return self
+
+    async def __anext__(self) -> bytearray:
+        chunk = await self.read()
+        if not chunk:
+            raise StopAsyncIteration
+        return chunk
+
+    async def read(self) -> bytearray:
+        """
+        Reads the next chunk of the message.
+
+        :return: Chunk, empty at the end of the message
+        """
+        if self._first:
+            chunk, self._first = self._first, None
+            return chunk
+        while not self._finished:
+            fin, chunk = await self._read()
+            self._finished = fin
+            if chunk:
+                return chunk
+        return bytearray()
+
+    async def discard(self):
+        """
+        Reads and discards the rest of the message.
+        """
+        while await self.read():
+            pass
+
+    async def write_to(self, file: BinaryIO) -> int:
+        """
+        Writes the rest of the message to a binary file object
+        chunk by chunk as it arrives.
+
+        :param file: Binary file object
+        :return: The number of bytes written
+        """
+        loop = get_running_loop()
+        written = 0
+        while chunk := await self.read():
+            await loop.run_in_executor(None, file.write, chunk)
+            written += len(chunk)
+        return written
@@ -0,0 +1,207 @@
+from abc import ABCMeta, abstractmethod
+from collections import deque
+from contextlib import AbstractContextManager
+from itertools import count
+from time import perf_counter_ns
+from typing import Any
+from XSocket.exception import InvalidOperationException
+
+__all__ = [
+    "Span",
+    "Tracer",
+    "RecordingTracer",
+    "OpenTelemetryTracer",
+    "next_connection_id"
+]
+
+try:
+    from opentelemetry import trace
+except ImportError:
+    trace = None
+
+_connection_ids = count(1)
+
+
+def next_connection_id() -> int:
+    """
+    Gets a new id identifying a connection in spans.
+
+    :return: int
+    """
+    return next(_connection_ids)
+
+
+class Span:
+    """
+    Contains a timed stage of a connection.
+    """
+    __slots__ = ("_name", "_connection_id", "_attributes", "_start", "_end",
+                 "_error")
+
+    def __init__(self, name: str, connection_id: int,
+                 attributes: dict[str, Any] | None):
+        self._name: str = name
+        self._connection_id: int = connection_id
+        self._attributes: dict[str, Any] | None = attributes
+        self._start: int = perf_counter_ns()
+        self._end: int | None = None
+        self._error: BaseException | None = None
+
+    @property
+    def name(self) -> str:
+        """
+        Gets the name of the stage.
+
+        :return: str
+        """
+        return self._name
+
+    @property
+    def connection_id(self) -> int:
+        """
+        Gets the id of the connection.
+
+        :return: int
+        """
+        return self._connection_id
+
+    @property
+    def attributes(self) -> dict[str, Any]:
+        """
+        Gets the attributes of the span.
+
+        :return: dict[str, Any]
+        """
+        return self._attributes or {}
+
+    @property
+    def start(self) -> int:
+        """
+        Gets the perf_counter_ns time the stage started at.
+
+        :return: int
+        """
+        return self._start
+
+    @property
+    def duration(self) -> float | None:
+        """
+        Gets the seconds the stage took.
+
+        :return: float or None if it did not end yet
+        """
+        if self._end is None:
+            return None
+        return (self._end - self._start) / 1e9
+
+    @property
+    def error(self) -> BaseException | None:
+        """
+        Gets the exception the stage ended with.
+
+        :return: BaseException or None
+        """
+        return self._error
+
+
+class Tracer(metaclass=ABCMeta):
+    """
+    Receives timed spans of the stages of connections.
+
+    Handles and clients only call a tracer when one is attached,
+    so an absent tracer costs one comparison per stage.
+    """
+
+    @abstractmethod
+    def span(self, name: str, connection_id: int,
+             attributes: dict[str, Any] | None = None
+             ) -> AbstractContextManager:
+        """
+        Times a stage while the context is entered.
+
+        Stages are xsocket.socket.receive (waiting for the socket),
+        xsocket.frame.decode (decoding received frames),
+        xsocket.send (encoding and queueing a message),
+        xsocket.socket.send (writing queued messages)
+        and xsocket.dispatch (running the event handlers).
+
+        :param name: Name of the stage
+        :param connection_id: Id of the connection
+        :param attributes: Attributes of the stage
+        :return: Context manager
+        """
+
+
+class _RecordedSpan(AbstractContextManager):
+    __slots__ = ("_span", "_spans")
+
+    def __init__(self, span: Span, spans: deque[Span]):
+        self._span: Span = span
+        self._spans: deque[Span] = spans
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._span._end = perf_counter_ns()
+        self._span._error = exc_value
+        self._spans.append(self._span)
+
+
+class RecordingTracer(Tracer):
+    """
+    Keeps the most recent spans in memory.
+    """
+
+    def __init__(self, limit: int = 65536):
+        """
+        Keeps the most recent spans in memory.
+
+        :param limit: The maximum number of spans kept
+        """
+        self._spans: deque[Span] = deque(maxlen=limit)
+
+    @property
+    def spans(self) -> list[Span]:
+        """
+        Gets the recorded spans, oldest first.
+
+        :return: list[Span]
+        """
+        return [*self._spans]
+
+    def clear(self):
+        """
+        Removes the recorded spans.
+        """
+        self._spans.clear()
+
+    def span(self, name: str, connection_id: int,
+             attributes: dict[str, Any] | None = None
+             ) -> AbstractContextManager:
+        return _RecordedSpan(Span(name, connection_id, attributes),
+                             self._spans)
+
+
+class OpenTelemetryTracer(Tracer):
+    """
+    Reports the spans to OpenTelemetry.
+    """
+
+    def __init__(self, tracer: Any = None):
+        """
+        Reports the spans to OpenTelemetry.
+
+        :param tracer: OpenTelemetry tracer,
+                       defaults to the one of the global provider
+        """
+        if tracer is None:
+            if not trace:
+                raise InvalidOperationException(
+                    "opentelemetry-api is not installed.")
+            tracer = trace.get_tracer("XSocket")
+        self._tracer: Any = tracer
+
+    def span(self, name: str, connection_id: int,
+             attributes: dict[str, Any] | None = None
+             ) -> AbstractContextManager:
+        return self._tracer.start_as_current_span(
+            name, attributes={"xsocket.connection_id": connection_id,
+                              **(attributes or {})})
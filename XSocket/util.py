@@ -2,6 +2,8 @@ from enum import IntEnum
 
 __all__ = [
     "OPCode",
+    "SlowConsumerPolicy",
+    "LoadBalancing",
     "OperationControl"
 ]
 
@@ -12,7 +14,36 @@ class OPCode(IntEnum):
     """
     Continuation = 0x0
     Data = 0x2
+    Request = 0x3
+    Response = 0x4
+    Channel = 0x5
     ConnectionClose = 0x8
+    Ping = 0x9
+    Pong = 0xA
+    Extension = 0xB
+
+
+class SlowConsumerPolicy(IntEnum):
+    """
+    Specifies how a broadcast treats a client
+    whose write buffer is above the high watermark.
+    """
+    Drop = 0
+    """Skip the message for the client."""
+    Disconnect = 1
+    """Abort the connection of the client."""
+    Block = 2
+    """Queue the message and wait for the client to drain."""
+
+
+class LoadBalancing(IntEnum):
+    """
+    Specifies how a server spreads connections over its worker loops.
+    """
+    RoundRobin = 0
+    """Hand connections to the workers in turn."""
+    LeastConnections = 1
+    """Hand a connection to the worker with the fewest clients."""
 
 
 class OperationControl(BaseException):
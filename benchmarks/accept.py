@@ -0,0 +1,71 @@
+"""
+Simulates a reconnect storm: many sockets connect at once and the time
+until the server ran on_accept for all of them is measured.
+
+    python benchmarks/accept.py --connections 20000 --handler-delay 0.01
+"""
+from argparse import ArgumentParser
+from XSocket import *
+from XSocket.protocol.inet import *
+import asyncio
+import socket
+import time
+
+
+async def storm(port, connections, parallel):
+    loop = asyncio.get_running_loop()
+    sockets = []
+    remaining = connections
+
+    async def connector():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            sock = socket.socket()
+            sock.setblocking(False)
+            await loop.sock_connect(sock, ("127.0.0.1", port))
+            sockets.append(sock)
+
+    await asyncio.gather(*[connector() for _ in range(parallel)])
+    return sockets
+
+
+async def main():
+    parser = ArgumentParser()
+    parser.add_argument("--connections", type=int, default=20000)
+    parser.add_argument("--parallel", type=int, default=512)
+    parser.add_argument("--handler-delay", type=float, default=0.0)
+    parser.add_argument("--accept-batch", type=int, default=256)
+    parser.add_argument("--accept-concurrency", type=int, default=256)
+    parser.add_argument("--backlog", type=int, default=4096)
+    parser.add_argument("--port", type=int, default=9000)
+    args = parser.parse_args()
+    server = Server(XTCPListener(IPAddressInfo("127.0.0.1", args.port),
+                                 backlog=args.backlog),
+                    accept_batch=args.accept_batch,
+                    accept_concurrency=args.accept_concurrency)
+    accepted = 0
+    finished = asyncio.get_running_loop().create_future()
+
+    @server.event.on_accept.register
+    async def on_accept(_, __):
+        nonlocal accepted
+        if args.handler_delay:
+            await asyncio.sleep(args.handler_delay)
+        accepted += 1
+        if accepted == args.connections:
+            finished.set_result(None)
+
+    await server.run()
+    start = time.perf_counter()
+    sockets = await storm(args.port, args.connections, args.parallel)
+    await finished
+    elapsed = time.perf_counter() - start
+    print(f"{args.connections} connections in {elapsed:.2f} s, "
+          f"{args.connections / elapsed:.0f} connections/s")
+    for sock in sockets:
+        sock.close()
+    await server.close()
+
+
+asyncio.run(main())
@@ -0,0 +1,63 @@
+"""
+Compares per-message and batched on_message delivery
+by streaming small messages from a server to a client over loopback.
+
+    python benchmarks/batching.py --messages 200000 --size 32
+"""
+from argparse import ArgumentParser
+from XSocket import *
+from XSocket.protocol.inet import *
+import asyncio
+import time
+
+
+async def deliver(port, messages, size, batch_size, batch_latency):
+    server = Server(XTCPListener(IPAddressInfo("127.0.0.1", port)))
+    connected = asyncio.get_running_loop().create_future()
+
+    @server.event.on_accept.register
+    async def on_accept(_, e):
+        connected.set_result(e.client)
+
+    await server.run()
+    client = Client(XTCPListener(IPAddressInfo("127.0.0.1", port)),
+                    batch_size=batch_size, batch_latency=batch_latency)
+    done = asyncio.get_running_loop().create_future()
+    counts = [0, 0]
+
+    async def on_message(_, e):
+        counts[0] += len(e.messages)
+        counts[1] += 1
+        if counts[0] == messages and not done.done():
+            done.set_result(None)
+    client.event.on_message += on_message
+    await client.run()
+    sender = await connected
+
+    start = time.perf_counter()
+    payload = bytes(size)
+    for _ in range(messages):
+        await sender.send(payload)
+    await done
+    elapsed = time.perf_counter() - start
+
+    await client.close()
+    return elapsed, counts[1]
+
+
+async def main():
+    parser = ArgumentParser()
+    parser.add_argument("--messages", type=int, default=200000)
+    parser.add_argument("--size", type=int, default=32)
+    parser.add_argument("--port", type=int, default=8100)
+    args = parser.parse_args()
+    for index, (batch_size, batch_latency) in enumerate(
+            ((1, 0), (64, 0), (1024, 0), (1024, 0.001))):
+        elapsed, events = await deliver(args.port + index, args.messages,
+                                        args.size, batch_size, batch_latency)
+        print(f"batch {batch_size:<6}latency {batch_latency:<8}"
+              f"{args.messages / elapsed:>12.0f} msg/s"
+              f"{events:>10} events")
+
+
+asyncio.run(main())
@@ -0,0 +1,83 @@
+"""
+Measures the round trip of small messages on one channel while another
+channel of the same connection transfers large messages, compared with
+sending both over the connection directly.
+
+    python benchmarks/channels.py --round-trips 2000 --bulk-size 8388608
+"""
+from argparse import ArgumentParser
+from XSocket import *
+from XSocket.protocol.inet import *
+import asyncio
+import statistics
+import time
+
+
+async def ping(send, replies, round_trips):
+    latencies = []
+    for _ in range(round_trips):
+        start = time.perf_counter()
+        await send(b"ping")
+        await replies.get()
+        latencies.append(time.perf_counter() - start)
+    return statistics.median(latencies), \
+        sorted(latencies)[int(len(latencies) * 0.99)]
+
+
+async def main():
+    parser = ArgumentParser()
+    parser.add_argument("--round-trips", type=int, default=2000)
+    parser.add_argument("--bulk-size", type=int, default=8388608)
+    parser.add_argument("--port", type=int, default=8900)
+    args = parser.parse_args()
+    server = Server(XTCPListener(IPAddressInfo("127.0.0.1", args.port)))
+
+    async def echo(sender, e):
+        if e.data == b"ping":
+            await sender.send(e.data)
+
+    @server.event.on_accept.register
+    async def on_accept(_, e):
+        e.client.event.on_message += echo
+
+        @e.client.event.on_channel.register
+        async def on_channel(_, c):
+            c.channel.event.on_message += echo
+
+    await server.run()
+    client = Client(XTCPListener(IPAddressInfo("127.0.0.1", args.port)))
+    opened = asyncio.get_running_loop().create_future()
+    replies = asyncio.Queue()
+
+    @client.event.on_open.register
+    async def on_open(_, __):
+        opened.set_result(None)
+
+    @client.event.on_message.register
+    async def on_message(_, e):
+        replies.put_nowait(e.data)
+
+    await client.run()
+    await opened
+    bulk, control = await client.open_channel(), await client.open_channel()
+    control.event.on_message += on_message
+    payload = bytes(args.bulk_size)
+
+    async def flood(send):
+        while True:
+            await send(payload)
+
+    for name, send_bulk, send_ping in (
+            ("connection", client.send, client.send),
+            ("channels", bulk.send, control.send)):
+        task = asyncio.create_task(flood(send_bulk))
+        median, p99 = await ping(send_ping, replies, args.round_trips)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        print(f"{name:<12}{median * 1e3:>10.2f} ms median"
+              f"{p99 * 1e3:>10.2f} ms p99")
+    await client.close()
+    await server.close()
+
+
+asyncio.run(main())
@@ -0,0 +1,106 @@
+"""
+Measures how accept and echo throughput scale with the number of
+Cluster workers sharing one port with SO_REUSEPORT. Load is generated
+by separate client processes, so the clients are not the bottleneck.
+
+    python benchmarks/cluster.py --workers 4 --processes 4 --clients 32
+"""
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from os import cpu_count
+from XSocket import *
+from XSocket.protocol.inet import *
+import asyncio
+import time
+
+
+def echo_server(port):
+    server = Server(XTCPListener(IPAddressInfo("127.0.0.1", port),
+                                 reuse_port=True))
+
+    @server.event.on_accept.register
+    async def on_accept(_, e):
+        async def on_message(sender, m):
+            await sender.send(m.data)
+        e.client.event.on_message += on_message
+    return server
+
+
+async def load(port, clients, messages, size):
+    loop = asyncio.get_running_loop()
+    connected = []
+    start = time.perf_counter()
+    for _ in range(clients):
+        client = Client(XTCPListener(IPAddressInfo("127.0.0.1", port)))
+        opened = loop.create_future()
+        done = loop.create_future()
+        received = [0]
+
+        def on_open(_, __, opened=opened):
+            opened.set_result(None)
+
+        def on_message(_, __, done=done, received=received):
+            received[0] += 1
+            if received[0] == messages and not done.done():
+                done.set_result(None)
+        client.event.on_open += on_open
+        client.event.on_message += on_message
+        await client.run()
+        await opened
+        connected.append((client, done))
+    connecting = time.perf_counter() - start
+
+    payload = bytes(size)
+    start = time.perf_counter()
+    for client, _ in connected:
+        for _ in range(messages):
+            await client.send(payload)
+    await asyncio.gather(*[done for _, done in connected])
+    echoing = time.perf_counter() - start
+    await asyncio.gather(*[client.close() for client, _ in connected])
+    return connecting, echoing
+
+
+def generate(port, clients, messages, size):
+    return asyncio.run(load(port, clients, messages, size))
+
+
+async def measure(workers, port, processes, clients, messages, size):
+    cluster = Cluster(partial(echo_server, port), workers)
+    await cluster.run()
+    await asyncio.sleep(1)
+    loop = asyncio.get_running_loop()
+    with ProcessPoolExecutor(processes) as executor:
+        results = await asyncio.gather(*[
+            loop.run_in_executor(executor, generate, port, clients,
+                                 messages, size)
+            for _ in range(processes)])
+    await cluster.close()
+    connecting = max(result[0] for result in results)
+    echoing = max(result[1] for result in results)
+    return connecting, echoing
+
+
+async def main():
+    parser = ArgumentParser()
+    parser.add_argument("--workers", type=int, default=cpu_count())
+    parser.add_argument("--processes", type=int, default=cpu_count())
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--messages", type=int, default=1000)
+    parser.add_argument("--size", type=int, default=64)
+    parser.add_argument("--port", type=int, default=8200)
+    args = parser.parse_args()
+    connections = args.processes * args.clients
+    total = connections * args.messages
+    for index, workers in enumerate(sorted({1, args.workers})):
+        connecting, echoing = await measure(
+            workers, args.port + index, args.processes, args.clients,
+            args.messages, args.size)
+        print(f"{workers:>3} workers"
+              f"{connections / connecting:>12.0f} conn/s"
+              f"{total / echoing:>12.0f} msg/s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
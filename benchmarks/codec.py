@@ -0,0 +1,184 @@
+"""
+Times the XTCP framing code: XTCPHandle.pack (encode), the unpack
+generator protocol (decode) and a full round trip through a pair of
+XTCPHandles over loopback. Results are written as JSON, and a
+previous result can be compared to find which path regressed.
+
+    python benchmarks/codec.py --output codec.json
+    python benchmarks/codec.py --compare codec.json
+"""
+from argparse import ArgumentParser
+from os.path import dirname
+from platform import python_implementation, python_version
+from socket import create_connection, create_server
+from statistics import median, stdev
+from subprocess import DEVNULL, CalledProcessError, check_output
+from XSocket import OPCode
+from XSocket.protocol.inet.xtcp import XTCPHandle, XTCPOptions
+from XSocket.protocol.inet.xtcp.socket import XTCPSocket
+import XSocket
+import asyncio
+import json
+import time
+
+SIZES = [0, 125, 126, 65535, 65536, 1048576, 16777216, 100000000]
+
+
+def calibrate(function, min_time):
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            function()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or loops >= 1 << 20:
+            return loops
+        loops *= 2
+
+
+def measure(function, repeat, min_time):
+    loops = calibrate(function, min_time)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(loops):
+            function()
+        timings.append((time.perf_counter() - start) / loops)
+    return timings
+
+
+def encode(data, max_frame_size):
+    return [*XTCPHandle.pack(data, OPCode.Data, max_frame_size)]
+
+
+def decode(packed):
+    packets = [bytearray()]
+    generator = XTCPHandle.unpack(packets)
+    fragments = []
+    offset = 0
+    for length in generator:
+        packets[-1] += packed[offset:offset + length]
+        offset += length
+        length = next(generator)
+        packets[-1] += packed[offset:offset + length]
+        offset += length
+        size = next(generator)
+        fragments.append(packed[offset:offset + size])
+        offset += size
+        next(generator)
+        packets.append(bytearray())
+    return bytearray().join(fragments)
+
+
+async def round_trips(sizes, repeat, min_time, max_frame_size):
+    listener = create_server(("127.0.0.1", 0))
+    left = create_connection(listener.getsockname())
+    right = listener.accept()[0]
+    listener.close()
+    left.setblocking(False)
+    right.setblocking(False)
+    options = XTCPOptions(max_frame_size=max_frame_size)
+    sender = XTCPHandle(XTCPSocket(left), options)
+    receiver = XTCPHandle(XTCPSocket(right), options)
+    results = {}
+    for size in sizes:
+        data = bytes(size)
+
+        async def trip():
+            await asyncio.gather(sender.send(data, OPCode.Data),
+                                 receiver.receive())
+        await trip()
+        loops = 1
+        while True:
+            start = time.perf_counter()
+            for _ in range(loops):
+                await trip()
+            if time.perf_counter() - start >= min_time or loops >= 1 << 16:
+                break
+            loops *= 2
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(loops):
+                await trip()
+            timings.append((time.perf_counter() - start) / loops)
+        results[size] = timings
+    sender.abort()
+    receiver.abort()
+    return results
+
+
+def summarize(benchmark, size, timings):
+    middle = median(timings)
+    return {
+        "benchmark": benchmark,
+        "size": size,
+        "median": middle,
+        "min": min(timings),
+        "stdev": stdev(timings) if len(timings) > 1 else 0.0,
+        "runs": len(timings),
+        "throughput": size / middle if middle else 0.0
+    }
+
+
+def revision():
+    try:
+        return check_output(["git", "rev-parse", "--short", "HEAD"],
+                            cwd=dirname(XSocket.__file__),
+                            stderr=DEVNULL, text=True).strip()
+    except (OSError, ValueError, CalledProcessError):
+        return None
+
+
+def compare(results, path):
+    with open(path) as file:
+        previous = {(result["benchmark"], result["size"]): result["median"]
+                    for result in json.load(file)["results"]}
+    for result in results:
+        key = (result["benchmark"], result["size"])
+        if key in previous:
+            change = result["median"] / previous[key] - 1
+            print(f"{key[0]:<12}{key[1]:>12}{change:>+10.1%}")
+
+
+def main():
+    parser = ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.1)
+    parser.add_argument("--max-frame-size", type=int, default=65535)
+    parser.add_argument("--output")
+    parser.add_argument("--compare")
+    args = parser.parse_args()
+    results = []
+    for size in args.sizes:
+        data = bytes(size)
+        packed = b"".join(encode(data, args.max_frame_size))
+        results.append(summarize("encode", size, measure(
+            lambda: encode(data, args.max_frame_size),
+            args.repeat, args.min_time)))
+        results.append(summarize("decode", size, measure(
+            lambda: decode(packed), args.repeat, args.min_time)))
+    trips = asyncio.run(round_trips(args.sizes, args.repeat, args.min_time,
+                                    args.max_frame_size))
+    results += [summarize("round_trip", size, timings)
+                for size, timings in trips.items()]
+    results.sort(key=lambda result: (result["size"], result["benchmark"]))
+    for result in results:
+        print(f"{result['benchmark']:<12}{result['size']:>12}"
+              f"{result['median'] * 1e6:>14.2f} us"
+              f"{result['throughput'] / 2 ** 20:>12.1f} MiB/s")
+    report = {
+        "python": f"{python_implementation()} {python_version()}",
+        "revision": revision(),
+        "max_frame_size": args.max_frame_size,
+        "results": results
+    }
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+    if args.compare:
+        compare(results, args.compare)
+
+
+main()
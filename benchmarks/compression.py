@@ -0,0 +1,58 @@
+"""
+Measures the bandwidth saved by the per-message deflate extension
+against the CPU time spent compressing and decompressing JSON messages.
+
+    python benchmarks/compression.py --messages 10000 --size 1024
+"""
+from argparse import ArgumentParser
+from XSocket import DeflateContext, DeflateOptions
+import json
+import random
+import time
+
+
+def messages(count, size):
+    generator = random.Random(0)
+    result = []
+    for index in range(count):
+        message = {"id": index, "type": "update", "items": []}
+        while len(json.dumps(message)) < size:
+            message["items"].append({
+                "name": f"item-{generator.randrange(1000)}",
+                "price": round(generator.uniform(0, 100), 2),
+                "tags": generator.sample(["new", "sale", "hot", "old"], 2)})
+        result.append(json.dumps(message).encode())
+    return result
+
+
+def measure(level, payloads):
+    sender = DeflateContext(DeflateOptions(level))
+    receiver = DeflateContext(DeflateOptions(level))
+    start = time.perf_counter()
+    compressed = [sender.compress(payload) for payload in payloads]
+    compressing = time.perf_counter() - start
+    start = time.perf_counter()
+    for payload in compressed:
+        receiver.decompress(payload)
+    decompressing = time.perf_counter() - start
+    return sum(map(len, compressed)), compressing, decompressing
+
+
+def main():
+    parser = ArgumentParser()
+    parser.add_argument("--messages", type=int, default=10000)
+    parser.add_argument("--size", type=int, default=1024)
+    args = parser.parse_args()
+    payloads = messages(args.messages, args.size)
+    total = sum(map(len, payloads))
+    print(f"{'level':<8}{'ratio':>8}{'saved':>12}"
+          f"{'compress':>16}{'decompress':>16}")
+    for level in (1, 3, 6, 9):
+        size, compressing, decompressing = measure(level, payloads)
+        print(f"{level:<8}{total / size:>8.2f}"
+              f"{(total - size) / 2 ** 20:>8.1f} MiB"
+              f"{compressing / args.messages * 1e6:>11.2f} us/msg"
+              f"{decompressing / args.messages * 1e6:>11.2f} us/msg")
+
+
+main()
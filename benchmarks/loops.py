@@ -0,0 +1,99 @@
+"""
+Measures echo and broadcast throughput of both listeners
+on every installed event loop.
+
+    python benchmarks/loops.py --clients 8 --messages 10000 --size 64
+"""
+from argparse import ArgumentParser
+from XSocket import *
+from XSocket.protocol.inet import *
+import asyncio
+import time
+
+
+async def connect(listener_type, port, clients, expected):
+    connected = []
+    for _ in range(clients):
+        client = Client(listener_type(IPAddressInfo("127.0.0.1", port)))
+        opened = asyncio.get_running_loop().create_future()
+        done = asyncio.get_running_loop().create_future()
+        received = [0]
+
+        def on_open(_, __, opened=opened):
+            opened.set_result(None)
+
+        def on_message(_, __, done=done, received=received):
+            received[0] += 1
+            if received[0] == expected and not done.done():
+                done.set_result(None)
+        client.event.on_open += on_open
+        client.event.on_message += on_message
+        await client.run()
+        await opened
+        connected.append((client, done))
+    return connected
+
+
+async def echo(listener_type, port, clients, messages, size):
+    server = Server(listener_type(IPAddressInfo("127.0.0.1", port)))
+
+    @server.event.on_accept.register
+    async def on_accept(_, e):
+        async def on_message(sender, m):
+            await sender.send(m.data)
+        e.client.event.on_message += on_message
+
+    await server.run()
+    connected = await connect(listener_type, port, clients, messages)
+    payload = bytes(size)
+    start = time.perf_counter()
+    for client, _ in connected:
+        for _ in range(messages):
+            await client.send(payload)
+    await asyncio.gather(*[done for _, done in connected])
+    elapsed = time.perf_counter() - start
+    await asyncio.gather(*[client.close() for client, _ in connected])
+    await server.close()
+    return clients * messages / elapsed
+
+
+async def broadcast(listener_type, port, clients, messages, size):
+    server = Server(listener_type(IPAddressInfo("127.0.0.1", port)))
+    await server.run()
+    connected = await connect(listener_type, port, clients, messages)
+    while server.connections < clients:
+        await asyncio.sleep(0.01)
+    payload = bytes(size)
+    start = time.perf_counter()
+    for _ in range(messages):
+        await server.broadcast(payload)
+    await asyncio.gather(*[done for _, done in connected])
+    elapsed = time.perf_counter() - start
+    await asyncio.gather(*[client.close() for client, _ in connected])
+    await server.close()
+    return clients * messages / elapsed
+
+
+def main():
+    parser = ArgumentParser()
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--messages", type=int, default=10000)
+    parser.add_argument("--size", type=int, default=64)
+    parser.add_argument("--port", type=int, default=8400)
+    args = parser.parse_args()
+    port = args.port
+    for loop in available_event_loops():
+        install_event_loop(loop)
+        for listener_type in (XTCPListener, XTCPTransportListener):
+            results = []
+            for benchmark in (echo, broadcast):
+                results.append(asyncio.run(benchmark(
+                    listener_type, port, args.clients, args.messages,
+                    args.size)))
+                port += 1
+            print(f"{loop:<10}{listener_type.__name__:<24}"
+                  f"{results[0]:>12.0f} echo msg/s"
+                  f"{results[1]:>12.0f} broadcast msg/s")
+
+
+main()
@@ -0,0 +1,60 @@
+"""
+Measures requests per second over one connection with one request
+in flight at a time and with many pipelined requests in flight.
+
+    python benchmarks/rpc.py --requests 50000 --concurrency 1 16 256
+"""
+from argparse import ArgumentParser
+from XSocket import *
+from XSocket.protocol.inet import *
+import asyncio
+import time
+
+
+async def echo(_, data):
+    return data
+
+
+async def measure(client, requests, concurrency, payload):
+    remaining = requests
+
+    async def caller():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            await client.request(payload)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[caller() for _ in range(concurrency)])
+    return requests / (time.perf_counter() - start)
+
+
+async def main():
+    parser = ArgumentParser()
+    parser.add_argument("--requests", type=int, default=50000)
+    parser.add_argument("--concurrency", type=int, nargs="+",
+                        default=[1, 16, 256])
+    parser.add_argument("--size", type=int, default=64)
+    parser.add_argument("--port", type=int, default=8800)
+    args = parser.parse_args()
+    server = Server(XTCPListener(IPAddressInfo("127.0.0.1", args.port)),
+                    request_handler=echo)
+    await server.run()
+    client = Client(XTCPListener(IPAddressInfo("127.0.0.1", args.port)))
+    opened = asyncio.get_running_loop().create_future()
+
+    @client.event.on_open.register
+    async def on_open(_, __):
+        opened.set_result(None)
+
+    await client.run()
+    await opened
+    payload = bytes(args.size)
+    for concurrency in args.concurrency:
+        rate = await measure(client, args.requests, concurrency, payload)
+        print(f"{concurrency:>6} in flight{rate:>12.0f} req/s")
+    await client.close()
+    await server.close()
+
+
+asyncio.run(main())
@@ -0,0 +1,71 @@
+"""
+Compares a single loop Server with worker loop threads on a handler
+that hashes every message, which releases the GIL.
+
+    python benchmarks/threads.py --workers 4 --clients 16 --size 1048576
+"""
+from argparse import ArgumentParser
+from hashlib import sha256
+from XSocket import *
+from XSocket.protocol.inet import *
+import asyncio
+import time
+
+
+async def hash_echo(port, workers, clients, messages, size):
+    server = Server(XTCPListener(IPAddressInfo("127.0.0.1", port)),
+                    workers=workers)
+
+    @server.event.on_accept.register
+    async def on_accept(_, e):
+        async def on_message(sender, m):
+            await sender.send(sha256(m.data).digest())
+        e.client.event.on_message += on_message
+
+    await server.run()
+    payload = bytes(size)
+    finished = []
+    for _ in range(clients):
+        client = Client(XTCPListener(IPAddressInfo("127.0.0.1", port)))
+        done = asyncio.get_running_loop().create_future()
+        received = [0]
+
+        def on_message(_, __, done=done, received=received):
+            received[0] += 1
+            if received[0] == messages and not done.done():
+                done.set_result(None)
+        client.event.on_message += on_message
+        await client.run()
+        finished.append((client, done))
+    await asyncio.sleep(0.1)
+
+    start = time.perf_counter()
+    for client, _ in finished:
+        for _ in range(messages):
+            await client.send(payload)
+    await asyncio.gather(*[done for _, done in finished])
+    elapsed = time.perf_counter() - start
+
+    await asyncio.gather(*[client.close() for client, _ in finished])
+    await server.close()
+    return elapsed
+
+
+async def main():
+    parser = ArgumentParser()
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--messages", type=int, default=20)
+    parser.add_argument("--size", type=int, default=1048576)
+    parser.add_argument("--port", type=int, default=8300)
+    args = parser.parse_args()
+    total = args.clients * args.messages
+    for index, workers in enumerate((0, args.workers)):
+        elapsed = await hash_echo(args.port + index, workers, args.clients,
+                                  args.messages, args.size)
+        print(f"{workers:>3} workers"
+              f"{total / elapsed:>12.0f} msg/s"
+              f"{total * args.size / elapsed / 2 ** 20:>10.1f} MiB/s")
+
+
+asyncio.run(main())
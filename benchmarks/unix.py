@@ -0,0 +1,92 @@
+"""
+Compares Unix domain sockets against TCP loopback by timing echo round
+trips of small messages and one-way throughput of large messages.
+
+    python benchmarks/unix.py --round-trips 20000 --size 64
+"""
+from argparse import ArgumentParser
+from XSocket import *
+from XSocket.protocol.inet import *
+from XSocket.protocol.unix import *
+import asyncio
+import os
+import tempfile
+import time
+
+
+async def connect(listener):
+    client = Client(listener)
+    opened = asyncio.get_running_loop().create_future()
+    messages = asyncio.Queue()
+
+    @client.event.on_open.register
+    async def on_open(_, __):
+        opened.set_result(None)
+
+    @client.event.on_message.register
+    async def on_message(_, e):
+        messages.put_nowait(e.data)
+
+    await client.run()
+    await opened
+    return client, messages
+
+
+async def measure(create, round_trips, size, bulk_messages, bulk_size):
+    server = Server(create())
+    received = asyncio.Queue()
+
+    @server.event.on_accept.register
+    async def on_accept(_, e):
+        @e.client.event.on_message.register
+        async def on_message(sender, m):
+            if len(m.data) == size:
+                await sender.send(m.data)
+            else:
+                received.put_nowait(len(m.data))
+
+    await server.run()
+    client, messages = await connect(create())
+
+    payload = bytes(size)
+    start = time.perf_counter()
+    for _ in range(round_trips):
+        await client.send(payload)
+        await messages.get()
+    latency = (time.perf_counter() - start) / round_trips
+
+    payload = bytes(bulk_size)
+    start = time.perf_counter()
+    for _ in range(bulk_messages):
+        await client.send(payload)
+    for _ in range(bulk_messages):
+        await received.get()
+    throughput = bulk_messages * bulk_size / (time.perf_counter() - start)
+
+    await client.close()
+    await server.close()
+    return latency, throughput
+
+
+async def main():
+    parser = ArgumentParser()
+    parser.add_argument("--round-trips", type=int, default=20000)
+    parser.add_argument("--size", type=int, default=64)
+    parser.add_argument("--bulk-messages", type=int, default=200)
+    parser.add_argument("--bulk-size", type=int, default=1048576)
+    parser.add_argument("--port", type=int, default=8700)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "xsocket.sock")
+        for name, create in (
+                ("tcp", lambda: XTCPListener(
+                    IPAddressInfo("127.0.0.1", args.port))),
+                ("unix", lambda: UnixListener(path))):
+            latency, throughput = await measure(
+                create, args.round_trips, args.size,
+                args.bulk_messages, args.bulk_size)
+            print(f"{name:<6}{latency * 1e6:>10.1f} us/round trip"
+                  f"{throughput / 2 ** 20:>12.1f} MiB/s")
+
+
+asyncio.run(main())
@@ -0,0 +1,68 @@
+"""
+Compares the socket based XTCPListener with the transport based
+XTCPTransportListener by echoing messages over loopback.
+
+    python benchmarks/xtcp_transport.py --clients 8 --messages 10000 --size 64
+"""
+from argparse import ArgumentParser
+from XSocket import *
+from XSocket.protocol.inet import *
+import asyncio
+import time
+
+
+async def echo(listener_type, port, clients, messages, size):
+    server = Server(listener_type(IPAddressInfo("127.0.0.1", port)))
+
+    @server.event.on_accept.register
+    async def on_accept(_, e):
+        async def on_message(sender, m):
+            await sender.send(m.data)
+        e.client.event.on_message += on_message
+
+    await server.run()
+    payload = bytes(size)
+    finished = []
+    for _ in range(clients):
+        client = Client(listener_type(IPAddressInfo("127.0.0.1", port)))
+        done = asyncio.get_running_loop().create_future()
+        received = [0]
+
+        def on_message(_, __, done=done, received=received):
+            received[0] += 1
+            if received[0] == messages and not done.done():
+                done.set_result(None)
+        client.event.on_message += on_message
+        await client.run()
+        finished.append((client, done))
+    await asyncio.sleep(0.1)
+
+    start = time.perf_counter()
+    for client, _ in finished:
+        for _ in range(messages):
+            await client.send(payload)
+    await asyncio.gather(*[done for _, done in finished])
+    elapsed = time.perf_counter() - start
+
+    await asyncio.gather(*[client.close() for client, _ in finished])
+    return elapsed
+
+
+async def main():
+    parser = ArgumentParser()
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--messages", type=int, default=10000)
+    parser.add_argument("--size", type=int, default=64)
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+    total = args.clients * args.messages
+    for index, listener_type in enumerate((XTCPListener,
+                                           XTCPTransportListener)):
+        elapsed = await echo(listener_type, args.port + index, args.clients,
+                             args.messages, args.size)
+        print(f"{listener_type.__name__:<24}"
+              f"{total / elapsed:>12.0f} msg/s"
+              f"{total * args.size * 2 / elapsed / 2 ** 20:>10.1f} MiB/s")
+
+
+asyncio.run(main())
@@ -18,6 +18,9 @@ setup(
     url="https://github.com/DuelitDev/XSocket-Python",
     packages=find_packages(),
     python_requires=">=3.10",
+    extras_require={
+        "uvloop": ["uvloop >= 0.17; sys_platform != 'win32'"]
+    },
     keywords=["socket"],
     classifiers=[
         "License :: OSI Approved :: "
@@ -0,0 +1,82 @@
+from asyncio import (Event, Queue, create_task, get_running_loop, run, sleep,
+                     wait_for)
+from XSocket import *
+from XSocket.protocol.inet import *
+import pytest
+
+
+async def open_pair(listener, port):
+    server = Server(listener(IPAddressInfo("127.0.0.1", port)))
+    entered, gate = Event(), Event()
+    received = Queue()
+
+    @server.event.on_accept.register
+    async def on_accept(_, e):
+        @e.client.event.on_channel.register
+        async def on_channel(_, c):
+            @c.channel.event.on_message.register
+            async def on_message(_, m):
+                entered.set()
+                await gate.wait()
+                received.put_nowait(bytes(m.data))
+
+    await server.run()
+    client = Client(listener(IPAddressInfo("127.0.0.1", port)))
+    opened = get_running_loop().create_future()
+
+    @client.event.on_open.register
+    async def on_open(_, __):
+        opened.set_result(None)
+
+    await client.run()
+    await wait_for(opened, 5)
+    channel = await client.open_channel()
+    for _ in range(100):
+        if channel.credit:
+            break
+        await sleep(0.01)
+    return server, client, channel, entered, gate, received
+
+
+@pytest.mark.parametrize("listener, port", [(XTCPListener, 18390),
+                                            (XTCPTransportListener, 18391)])
+def test_credit_bounds_sender(listener, port):
+    async def main():
+        server, client, channel, entered, gate, received = \
+            await open_pair(listener, port)
+        granted = channel.credit
+        messages = [bytes([index]) * (granted // 2) for index in range(6)]
+        await wait_for(channel.send(messages[0]), 5)
+        await wait_for(entered.wait(), 5)
+        await wait_for(channel.send(messages[1]), 5)
+        sending = create_task(channel.send(messages[2]))
+        await sleep(0.2)
+        assert not sending.done() and channel.credit == 0
+        gate.set()
+        await wait_for(sending, 5)
+        for message in messages[3:]:
+            await wait_for(channel.send(message), 5)
+        for message in messages:
+            assert await wait_for(received.get(), 5) == message
+        await client.close()
+        await server.close()
+
+    run(main())
+
+
+@pytest.mark.parametrize("listener, port", [(XTCPListener, 18392),
+                                            (XTCPTransportListener, 18393)])
+def test_message_larger_than_window(listener, port):
+    async def main():
+        server, client, channel, entered, gate, received = \
+            await open_pair(listener, port)
+        granted = channel.credit
+        gate.set()
+        message = bytes(range(256)) * (granted // 64)
+        await wait_for(channel.send(message), 5)
+        assert await wait_for(received.get(), 5) == message
+        assert channel.credit <= granted
+        await client.close()
+        await server.close()
+
+    run(main())
@@ -0,0 +1,204 @@
+from asyncio import (create_task, open_connection, run, sleep, start_server,
+                     wait_for)
+from os import urandom
+from struct import pack, unpack
+from XSocket import *
+from XSocket.exception import InvalidParameterException, ProtocolException
+from XSocket.protocol.inet import *
+from XSocket.protocol.inet.xtcp import XTCPHandle
+import pytest
+
+LISTENERS = [XTCPListener, XTCPTransportListener]
+
+
+async def connect(listener, port, options=None):
+    server = listener(IPAddressInfo("127.0.0.1", port), options)
+    server.run()
+    accepted = create_task(server.accept())
+    client = await server.connect()
+    return server, client, await wait_for(accepted, 5)
+
+
+async def read_frame(reader):
+    head, size = await reader.readexactly(2)
+    if size == 126:
+        size = unpack("!H", await reader.readexactly(2))[0]
+    elif size == 127:
+        size = unpack("!Q", await reader.readexactly(8))[0]
+    return head, await reader.readexactly(size)
+
+
+@pytest.mark.parametrize("size, length", [(0, 0), (125, 125), (126, 126),
+                                          (65535, 126), (65536, 127)])
+def test_length_forms(size, length):
+    header = next(XTCPHandle.pack(bytes(size), OPCode.Data, 1 << 20))
+    assert header[0] == 128 | OPCode.Data and header[1] == length
+    assert len(header) == {125: 2, 126: 4, 127: 10}.get(length, 2)
+
+
+def test_max_frame_size_fragments():
+    buffers = [*XTCPHandle.pack(bytes(150000), OPCode.Data, 65535)]
+    headers = buffers[::2]
+    assert [header[0] for header in headers] == \
+        [OPCode.Data, OPCode.Continuation, 128 | OPCode.Continuation]
+    assert [len(payload) for payload in buffers[1::2]] == \
+        [65535, 65535, 18930]
+
+
+@pytest.mark.parametrize("listener, port", [(XTCPListener, 18320),
+                                            (XTCPTransportListener, 18321)])
+def test_round_trip_length_forms(listener, port):
+    async def main():
+        sizes = [0, 125, 126, 65535, 65536, 70000, 3000000]
+        server, client, accepted = await connect(
+            listener, port, XTCPOptions(max_frame_size=1 << 20))
+        messages = [urandom(size) for size in sizes]
+        for message in messages:
+            await client.send(message, OPCode.Data)
+        for message in messages:
+            assert await wait_for(accepted.receive(), 5) == message
+        client.abort()
+        accepted.abort()
+        server.close()
+
+    run(main())
+
+
+@pytest.mark.parametrize("listener, port", [(XTCPListener, 18322),
+                                            (XTCPTransportListener, 18323)])
+def test_receive_into(listener, port):
+    async def main():
+        server, client, accepted = await connect(listener, port)
+        messages = [b"", b"small", urandom(200000), urandom(500), b"after"]
+        for message in messages:
+            await client.send(message, OPCode.Data)
+        buffer = bytearray(300000)
+        for message in messages[:3]:
+            size = await wait_for(accepted.receive_into(buffer), 5)
+            assert buffer[:size] == message
+        with pytest.raises(InvalidParameterException):
+            await accepted.receive_into(bytearray(100))
+        size = await wait_for(accepted.receive_into(buffer), 5)
+        assert buffer[:size] == b"after"
+        client.abort()
+        accepted.abort()
+        server.close()
+
+    run(main())
+
+
+@pytest.mark.parametrize("listener, port", [(XTCPListener, 18324),
+                                            (XTCPTransportListener, 18325)])
+def test_send_stream_holds_other_messages(listener, port):
+    async def main():
+        server, client, accepted = await connect(listener, port)
+        chunks = [urandom(100000) for _ in range(5)]
+
+        async def source():
+            for chunk in chunks:
+                yield chunk
+                await sleep(0.01)
+
+        streaming = create_task(client.send_stream(source(), OPCode.Data))
+        await sleep(0.005)
+        await client.send(b"held", OPCode.Data)
+        stream = await wait_for(accepted.receive(stream=True), 5)
+        assert bytes().join([chunk async for chunk in stream]) == \
+            bytes().join(chunks)
+        assert await wait_for(accepted.receive(), 5) == b"held"
+        await streaming
+        client.abort()
+        accepted.abort()
+        server.close()
+
+    run(main())
+
+
+@pytest.mark.parametrize("listener, port", [(XTCPListener, 18326),
+                                            (XTCPTransportListener, 18327)])
+def test_deflate_negotiation(listener, port):
+    async def main():
+        options = XTCPOptions(compression=DeflateOptions(threshold=0))
+        server, client, accepted = await connect(listener, port, options)
+        reading = create_task(client.wait_message())
+        message = b"compressible " * 10000
+        await client.send(b"first", OPCode.Data)
+        assert await wait_for(accepted.receive(), 5) == b"first"
+        assert accepted.compressing
+        await accepted.send(message, OPCode.Data)
+        await wait_for(reading, 5)
+        assert client.compressing
+        assert await client.receive() == message
+        await client.send(message, OPCode.Data)
+        assert await wait_for(accepted.receive(), 5) == message
+        client.abort()
+        accepted.abort()
+        server.close()
+
+    run(main())
+
+
+@pytest.mark.parametrize("listener, port", [(XTCPListener, 18328),
+                                            (XTCPTransportListener, 18329)])
+def test_deflate_with_peer_that_does_not_negotiate(listener, port):
+    async def main():
+        options = XTCPOptions(compression=DeflateOptions(threshold=0))
+        frames = []
+
+        async def old_peer(reader, writer):
+            frames.append(await read_frame(reader))
+            writer.write(b"".join(XTCPHandle.pack(b"plain", OPCode.Data)))
+            frames.append(await read_frame(reader))
+            writer.close()
+
+        old = await start_server(old_peer, "127.0.0.1", port)
+        client = await listener(IPAddressInfo("127.0.0.1", port),
+                                options).connect()
+        assert await wait_for(client.receive(), 5) == b"plain"
+        assert not client.compressing
+        await client.send(b"x" * 5000, OPCode.Data)
+        await sleep(0.1)
+        assert frames[0] == (128 | OPCode.Extension, b"deflate")
+        assert frames[1] == (128 | OPCode.Data, b"x" * 5000)
+        client.abort()
+        old.close()
+        await old.wait_closed()
+
+        server = listener(IPAddressInfo("127.0.0.1", port + 10), options)
+        server.run()
+        accepted = create_task(server.accept())
+        reader, writer = await open_connection("127.0.0.1", port + 10)
+        writer.write(b"".join(XTCPHandle.pack(b"hello", OPCode.Data)))
+        accepted = await wait_for(accepted, 5)
+        assert await wait_for(accepted.receive(), 5) == b"hello"
+        await accepted.send(b"y" * 5000, OPCode.Data)
+        assert await wait_for(read_frame(reader), 5) == \
+            (128 | OPCode.Data, b"y" * 5000)
+        writer.close()
+        accepted.abort()
+        server.close()
+
+    run(main())
+
+
+@pytest.mark.parametrize("listener, port", [(XTCPListener, 18330),
+                                            (XTCPTransportListener, 18331)])
+def test_protocol_errors_abort(listener, port):
+    async def main():
+        frames = [bytes([128 | 6, 0]),
+                  bytes([128 | OPCode.Data, 127]) + pack("!Q", 1 << 40)]
+        for frame in frames:
+            server = listener(IPAddressInfo("127.0.0.1", port),
+                              XTCPOptions(max_receive_size=1 << 20))
+            server.run()
+            accepted = create_task(server.accept())
+            reader, writer = await open_connection("127.0.0.1", port)
+            writer.write(frame)
+            accepted = await wait_for(accepted, 5)
+            with pytest.raises(ProtocolException):
+                await wait_for(accepted.receive(), 5)
+            assert accepted.closed
+            writer.close()
+            server.close()
+
+    run(main())
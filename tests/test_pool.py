@@ -0,0 +1,73 @@
+from asyncio import get_running_loop, run, sleep, start_server, wait_for
+from XSocket import *
+from XSocket.protocol.inet import *
+import pytest
+
+
+@pytest.mark.parametrize("listener, port", [(XTCPListener, 18310),
+                                            (XTCPTransportListener, 18311)])
+def test_peer_closes_idle_connection(listener, port):
+    async def main():
+        address = IPAddressInfo("127.0.0.1", port)
+        server = Server(listener(address))
+        accepted = get_running_loop().create_future()
+
+        @server.event.on_accept.register
+        async def on_accept(_, e):
+            accepted.set_result(e.client)
+
+        await server.run()
+        pool = ClientPool(listener, min_size=1)
+        await pool.warm(address)
+        idle = await pool.acquire(address)
+        await pool.release(idle)
+        await wait_for((await wait_for(accepted, 5)).close(), 5)
+        for _ in range(100):
+            if idle.closed:
+                break
+            await sleep(0.01)
+        assert idle.closed and pool.idle == 0 and pool.connections == 0
+        handle = await pool.acquire(address)
+        assert handle is not idle and not handle.closed
+        await pool.release(handle)
+        await wait_for(server.close(), 5)
+        await pool.close()
+
+    run(main())
+
+
+def test_close_unused_pool():
+    async def main():
+        pool = ClientPool()
+        await pool.run()
+        await pool.close()
+        assert pool.closed and not pool.running
+
+    run(main())
+
+
+@pytest.mark.parametrize("listener, port", [(XTCPListener, 18312),
+                                            (XTCPTransportListener, 18314)])
+def test_close_aborts_idle_connections_of_every_address(listener, port):
+    async def main():
+        silent = [await start_server(lambda reader, writer: None,
+                                     "127.0.0.1", port + offset)
+                  for offset in range(2)]
+        pool = ClientPool(listener, min_size=2, interval=0.1)
+        addresses = [IPAddressInfo("127.0.0.1", port + offset)
+                     for offset in range(2)]
+        handles = []
+        for address in addresses:
+            await pool.warm(address)
+            handles += [await pool.acquire(address) for _ in range(2)]
+        for handle in handles:
+            await pool.release(handle)
+        await wait_for(pool.close(), 5)
+        assert pool.idle == 0 and pool.connections == 0
+        assert all(handle.closed for handle in handles)
+        assert all(handle._socket.closed for handle in handles)
+        for server in silent:
+            server.close()
+            await server.wait_closed()
+
+    run(main())
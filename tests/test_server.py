@@ -0,0 +1,175 @@
+from asyncio import (Event, Queue, create_task, gather, get_running_loop,
+                     open_connection, run, sleep, wait_for)
+from XSocket import *
+from XSocket.protocol.inet import *
+import pytest
+
+
+async def serve(listener, port, **kwargs):
+    server = Server(listener(IPAddressInfo("127.0.0.1", port)), **kwargs)
+    clients = Queue()
+
+    @server.event.on_accept.register
+    async def on_accept(_, e):
+        e.client.set_write_buffer_limits(65536, 16384)
+        clients.put_nowait(e.client)
+
+    await server.run()
+    return server, clients
+
+
+async def connect(listener, port, **kwargs):
+    client = Client(listener(IPAddressInfo("127.0.0.1", port)), **kwargs)
+    opened = get_running_loop().create_future()
+
+    @client.event.on_open.register
+    async def on_open(_, __):
+        opened.set_result(None)
+
+    await client.run()
+    await wait_for(opened, 5)
+    return client
+
+
+async def stall(port):
+    reader, writer = await open_connection("127.0.0.1", port, limit=1024)
+    return reader, writer
+
+
+async def flood(server):
+    for _ in range(100):
+        result = await wait_for(server.broadcast(bytes(100000)), 5)
+        if result.skipped:
+            return result
+    raise AssertionError("The client never became slow.")
+
+
+@pytest.mark.parametrize("listener, port", [(XTCPListener, 18360),
+                                            (XTCPTransportListener, 18361)])
+def test_slow_consumer_drop(listener, port):
+    async def main():
+        server, clients = await serve(
+            listener, port, slow_consumer_policy=SlowConsumerPolicy.Drop)
+        reader, writer = await stall(port)
+        client = await wait_for(clients.get(), 5)
+        result = await flood(server)
+        assert result.delivered == 0 and result.skipped == 1
+        assert not client.closed
+        writer.close()
+        await server.close()
+
+    run(main())
+
+
+@pytest.mark.parametrize("listener, port", [(XTCPListener, 18362),
+                                            (XTCPTransportListener, 18363)])
+def test_slow_consumer_disconnect(listener, port):
+    async def main():
+        server, clients = await serve(
+            listener, port,
+            slow_consumer_policy=SlowConsumerPolicy.Disconnect)
+        reader, writer = await stall(port)
+        client = await wait_for(clients.get(), 5)
+        closed = Event()
+        client.event.on_close += lambda *_: closed.set()
+        await flood(server)
+        await wait_for(closed.wait(), 5)
+        assert server.connections == 0
+        writer.close()
+        await server.close()
+
+    run(main())
+
+
+@pytest.mark.parametrize("listener, port", [(XTCPListener, 18364),
+                                            (XTCPTransportListener, 18365)])
+def test_slow_consumer_block(listener, port):
+    async def main():
+        server, clients = await serve(
+            listener, port, slow_consumer_policy=SlowConsumerPolicy.Block)
+        reader, writer = await stall(port)
+        client = await wait_for(clients.get(), 5)
+        broadcast = None
+        for _ in range(100):
+            broadcast = create_task(server.broadcast(bytes(100000)))
+            await sleep(0.05)
+            if not broadcast.done():
+                break
+        assert not broadcast.done()
+        while not broadcast.done():
+            await wait_for(reader.read(1 << 20), 5)
+        result = await broadcast
+        assert result.delivered == 1 and result.skipped == 0
+        assert not client.closed
+        writer.close()
+        await server.close()
+
+    run(main())
+
+
+@pytest.mark.parametrize("listener, port", [(XTCPListener, 18366),
+                                            (XTCPTransportListener, 18367)])
+def test_requests_are_correlated(listener, port):
+    async def handler(_, data):
+        if data.startswith(b"slow"):
+            await sleep(0.2)
+        return bytes(data[::-1])
+
+    async def main():
+        server, _ = await serve(listener, port, request_handler=handler)
+        client = await connect(listener, port)
+        slow = create_task(client.request(b"slow"))
+        await sleep(0.01)
+        responses = await gather(*[client.request(b"%d" % index)
+                                   for index in range(100)])
+        assert not slow.done()
+        assert responses == [(b"%d" % index)[::-1] for index in range(100)]
+        assert await slow == b"wols"
+        assert client.pending_requests == 0
+        await client.close()
+        await server.close()
+
+    run(main())
+
+
+@pytest.mark.parametrize("listener, port", [(XTCPListener, 18368),
+                                            (XTCPTransportListener, 18369)])
+def test_send_stream_on_stream(listener, port):
+    async def main():
+        server, _ = await serve(listener, port, streaming=True)
+        received = get_running_loop().create_future()
+        chunks = [bytes([index]) * 100000 for index in range(5)]
+
+        @server.event.on_accept.register
+        async def on_accept(_, e):
+            @e.client.event.on_stream.register
+            async def on_stream(_, s):
+                received.set_result(
+                    bytes().join([chunk async for chunk in s.stream]))
+
+        client = await connect(listener, port)
+        await client.send_stream(chunks)
+        assert await wait_for(received, 5) == bytes().join(chunks)
+        await client.close()
+        await server.close()
+
+    run(main())
+
+
+@pytest.mark.parametrize("listener, port", [(XTCPListener, 18370),
+                                            (XTCPTransportListener, 18371)])
+def test_ping_measures_rtt(listener, port):
+    async def main():
+        server, _ = await serve(listener, port)
+        client = await connect(listener, port)
+        assert client.rtt is None
+        client.ping()
+        for _ in range(100):
+            if client.rtt is not None:
+                break
+            await sleep(0.01)
+        assert 0 < client.rtt < 1 and client.min_rtt <= client.rtt
+        await client.close()
+        await server.close()
+
+    run(main())